@@ -0,0 +1,94 @@
+"""Compare records/sec of the previous and the current JSON log formatter.
+
+The previous formatter converted every timestamp through
+``datetime.fromtimestamp().astimezone()`` and called ``json.dumps`` per
+record. The current one caches the rendered second, reuses one encoder
+and additionally carries the per-update logging context.
+
+Usage::
+
+    python benchmarks/bench_logging.py --records 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import time
+from datetime import UTC, datetime
+from zoneinfo import ZoneInfo
+
+from group_inviter import log_context
+from group_inviter.logging_config import TIMESTAMP_FORMAT, JsonFormatter
+
+
+class PreviousJsonFormatter(logging.Formatter):
+    """The JSON formatter as it was before context enrichment."""
+
+    def __init__(self, *, tzinfo: ZoneInfo) -> None:
+        super().__init__()
+        self._tzinfo = tzinfo
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:  # noqa: N802
+        dt = datetime.fromtimestamp(record.created, tz=UTC).astimezone(self._tzinfo)
+        return dt.strftime(datefmt) if datefmt else dt.isoformat()
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "level": record.levelname,
+            "name": record.name,
+            "message": record.getMessage(),
+            "time": self.formatTime(record, TIMESTAMP_FORMAT),
+        }
+        return json.dumps(data, ensure_ascii=True)
+
+
+def _records(count: int, per_second: int) -> list[logging.LogRecord]:
+    started = time.time()
+    records = []
+    for index in range(count):
+        record = logging.makeLogRecord(
+            {
+                "name": "group_inviter.handlers.invite",
+                "levelno": logging.INFO,
+                "levelname": "INFO",
+                "msg": "Approved join request from %s (%s) for chat %s",
+                "args": (10_000 + index, "User", -100_123),
+            }
+        )
+        record.created = started + index / per_second
+        records.append(record)
+    return records
+
+
+def _rate(formatter: logging.Formatter, records: list[logging.LogRecord]) -> float:
+    started = time.perf_counter()
+    for record in records:
+        formatter.format(record)
+    return len(records) / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--per-second", type=int, default=1000, help="simulated log rate")
+    parser.add_argument("--timezone", default="Europe/Moscow")
+    args = parser.parse_args()
+
+    tzinfo = ZoneInfo(args.timezone)
+    records = _records(args.records, args.per_second)
+    previous = _rate(PreviousJsonFormatter(tzinfo=tzinfo), records)
+    current = _rate(JsonFormatter(tzinfo=tzinfo), records)
+    token = log_context.bind(update_id=1, bot_id=42, chat_id=-100_123, user_id=10_001)
+    try:
+        enriched = _rate(JsonFormatter(tzinfo=tzinfo), records)
+    finally:
+        log_context.reset(token)
+    print(f"previous:          {previous:12.0f} records/s")
+    print(f"current:           {current:12.0f} records/s ({current / previous:4.2f}x)")
+    print(f"current + context: {enriched:12.0f} records/s ({enriched / previous:4.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
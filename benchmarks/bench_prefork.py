@@ -0,0 +1,213 @@
+"""Measure join-request throughput of the webhook mode with 1..N workers.
+
+A local aiohttp server stands in for the Bot API (``getMe``, ``setWebhook``,
+``sendPhoto`` and ``approveChatJoinRequest``). For every worker count the
+benchmark starts ``python -m group_inviter --workers N`` against it, posts a
+burst of ``chat_join_request`` webhook updates and reports how many join
+requests per second were approved end to end.
+
+Postgres is not required: the database points at a closed port and the
+spool absorbs the writes. Pass ``--database-port`` to benchmark against a
+real server instead.
+
+Usage::
+
+    python benchmarks/bench_prefork.py --workers 1 2 4 --updates 4000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import yaml
+from aiohttp import ClientSession, TCPConnector, web
+
+BOT_ID = 4242
+TOKEN = f"{BOT_ID}:BENCHMARK-TOKEN"  # noqa: S105 - fake token for the local stand-in server
+SECRET = "benchmark-secret"  # noqa: S105 - shared with the spawned bot only
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+class StandIn:
+    """Counts the Bot API calls made by all workers."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.get_me = 0
+        self.approved = 0
+        self.approved_event = asyncio.Event()
+        self.target = 0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        await asyncio.sleep(self.latency)
+        result: Any = True
+        if method == "getMe":
+            self.get_me += 1
+            result = {"id": BOT_ID, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+        elif method in {"sendPhoto", "sendMessage"}:
+            result = {"message_id": 1, "date": 0, "chat": {"id": 1, "type": "private"}}
+        elif method == "approveChatJoinRequest":
+            self.approved += 1
+            if self.approved >= self.target:
+                self.approved_event.set()
+        return web.json_response({"ok": True, "result": result})
+
+
+def _write_config(directory: Path, args: argparse.Namespace, api_port: int) -> Path:
+    config = {
+        "telegram": {
+            "bot_token": TOKEN,
+            "webhook": {
+                "enabled": True,
+                "base_url": f"http://127.0.0.1:{args.webhook_port}",
+                "host": "127.0.0.1",
+                "port": args.webhook_port,
+                "secret_token": SECRET,
+            },
+            "session": {"api_base_url": f"http://127.0.0.1:{api_port}"},
+        },
+        "logging": {"level": "WARNING", "directory": str(directory / "logs")},
+        "metrics": {"enabled": True, "host": "127.0.0.1", "port": _free_port()},
+        "database": {
+            "host": "127.0.0.1",
+            "port": args.database_port,
+            "database": "group_inviter",
+            "user": "group_inviter",
+            "password": "group_inviter",
+            "connect_timeout": 1,
+        },
+        "dedup": {"enabled": True},
+        "spool": {"enabled": True, "path": str(directory / "spool" / "join_requests.jsonl")},
+        "loop_monitor": {"enabled": False},
+    }
+    path = directory / "config.yaml"
+    path.write_text(yaml.safe_dump(config), encoding="utf-8")
+    return path
+
+
+def _join_request(update_id: int) -> dict[str, Any]:
+    user = {"id": 10_000 + update_id, "is_bot": False, "first_name": "User"}
+    return {
+        "update_id": update_id,
+        "chat_join_request": {
+            "chat": {"id": -100_123, "type": "supergroup", "title": "Bench"},
+            "from": user,
+            "user_chat_id": user["id"],
+            "date": 0,
+            "invite_link": {
+                "invite_link": "https://t.me/+bench",
+                "creator": {"id": BOT_ID, "is_bot": True, "first_name": "Bench"},
+                "creates_join_request": True,
+                "is_primary": False,
+                "is_revoked": False,
+            },
+        },
+    }
+
+
+async def _wait_for(predicate: Any, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            msg = "timed out waiting for the bot to start"
+            raise TimeoutError(msg)
+        await asyncio.sleep(0.1)
+
+
+async def _measure(
+    args: argparse.Namespace, stand_in: StandIn, api_port: int, workers: int
+) -> float:
+    stand_in.get_me = stand_in.approved = 0
+    stand_in.approved_event.clear()
+    stand_in.target = args.updates
+    with tempfile.TemporaryDirectory(prefix="bench-prefork-") as tmp:
+        config_path = _write_config(Path(tmp), args, api_port)
+        process = subprocess.Popen(  # noqa: S603, ASYNC220 - started once per run
+            [
+                sys.executable,
+                "-m",
+                "group_inviter",
+                "--config",
+                str(config_path),
+                "--workers",
+                str(workers),
+            ],
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        )
+        try:
+            await _wait_for(lambda: stand_in.get_me >= workers, timeout=60)
+            await asyncio.sleep(1.0)  # let the last worker bind the socket
+            url = f"http://127.0.0.1:{args.webhook_port}/webhook/{BOT_ID}"
+            headers = {"X-Telegram-Bot-Api-Secret-Token": SECRET}
+            semaphore = asyncio.Semaphore(args.concurrency)
+            connector = TCPConnector(limit=args.concurrency, force_close=True)
+            async with ClientSession(connector=connector) as client:
+
+                async def post(update_id: int) -> None:
+                    async with (
+                        semaphore,
+                        client.post(
+                            url, json=_join_request(update_id), headers=headers
+                        ) as response,
+                    ):
+                        response.raise_for_status()
+
+                started = time.perf_counter()
+                await asyncio.gather(*(post(update_id) for update_id in range(1, args.updates + 1)))
+                await asyncio.wait_for(stand_in.approved_event.wait(), timeout=300)
+                return args.updates / (time.perf_counter() - started)
+        finally:
+            process.send_signal(signal.SIGTERM)
+            process.wait(timeout=60)
+
+
+async def _run(args: argparse.Namespace) -> None:
+    stand_in = StandIn(args.latency_ms / 1000)
+    app = web.Application()
+    app.router.add_post("/bot{token}/{method}", stand_in.handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    api_port = _free_port()
+    await web.TCPSite(runner, "127.0.0.1", api_port).start()
+    try:
+        print(f"{os.cpu_count()} CPU(s) available")
+        baseline: float | None = None
+        for workers in args.workers:
+            rate = await _measure(args, stand_in, api_port, workers)
+            baseline = baseline or rate
+            print(f"{workers:>3} worker(s): {rate:9.1f} join requests/s ({rate / baseline:4.2f}x)")
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--updates", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=64, help="parallel webhook posts")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--webhook-port", type=int, default=_free_port())
+    parser.add_argument(
+        "--database-port", type=int, default=_free_port(), help="default: closed port"
+    )
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Compare Bot API throughput of the default and tuned aiohttp sessions.
+
+A local aiohttp server stands in for the Bot API and answers
+``approveChatJoinRequest`` after a fixed delay. The benchmark fires a
+burst of concurrent approve calls through each session profile and
+reports the achieved request rate.
+
+Usage::
+
+    python benchmarks/bench_session.py --requests 2000 --latency-ms 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.session.base import BaseSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiohttp import web
+
+from group_inviter.configuration import SessionConfig
+from group_inviter.session import TunedAiohttpSession
+
+TOKEN = "42:BENCHMARK-TOKEN"  # noqa: S105 - fake token for the local stand-in server
+
+
+async def _start_stand_in(latency: float) -> tuple[web.AppRunner, int]:
+    async def approve(_: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        return web.json_response({"ok": True, "result": True})
+
+    app = web.Application()
+    app.router.add_post("/bot{token}/approveChatJoinRequest", approve)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+    return runner, port
+
+
+async def _burst(session: BaseSession, port: int, requests: int) -> float:
+    session.api = TelegramAPIServer.from_base(f"http://127.0.0.1:{port}")
+    bot = Bot(TOKEN, session=session)
+    try:
+        await bot.approve_chat_join_request(chat_id=-1, user_id=0)  # warm-up
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(bot.approve_chat_join_request(chat_id=-1, user_id=i) for i in range(requests))
+        )
+        return requests / (time.perf_counter() - started)
+    finally:
+        await bot.session.close()
+
+
+async def _run(args: argparse.Namespace) -> None:
+    runner, port = await _start_stand_in(args.latency_ms / 1000)
+    profiles: dict[str, BaseSession] = {
+        "default": AiohttpSession(),
+        "tuned": TunedAiohttpSession(
+            SessionConfig(
+                connection_limit=args.limit,
+                limit_per_host=args.limit,
+                keepalive_timeout=args.keepalive,
+            )
+        ),
+    }
+    try:
+        for name, session in profiles.items():
+            rate = await _burst(session, port, args.requests)
+            print(f"{name:>8}: {rate:10.1f} approve calls/s")
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--limit", type=int, default=400, help="tuned connection limit")
+    parser.add_argument("--keepalive", type=float, default=60.0, help="tuned keep-alive (s)")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
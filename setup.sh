@@ -1,9 +1,9 @@
 #!/bin/bash
 set -e
 
-# Create logs directory with proper permissions
-mkdir -p logs
-chmod 777 logs
+# Create logs and spool directories with proper permissions
+mkdir -p logs spool
+chmod 777 logs spool
 
 # Setup Grafana alerting configuration
 CONFIG_FILE="config/config.yaml"
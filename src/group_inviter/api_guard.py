@@ -0,0 +1,102 @@
+"""Request middleware applying timeouts and load shedding to Bot API calls."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Mapping
+
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramNetworkError, TelegramServerError
+from aiogram.methods.base import TelegramType
+
+from .configuration import BotApiConfig
+from .metrics import record_bot_api_failure, record_bot_api_shed, record_circuit_state
+from .resilience import CircuitBreaker, CircuitOpenError
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+    from aiogram.methods import Response, TelegramMethod
+
+LOGGER = logging.getLogger(__name__)
+
+# Long polling manages its own timeout and must never be shed.
+_PASSTHROUGH_METHODS = frozenset({"getUpdates"})
+
+
+class BotApiGuard(BaseRequestMiddleware):
+    """Apply per-method timeout budgets and a shared circuit breaker.
+
+    Network failures, server errors and exhausted budgets count against the
+    breaker; client errors such as a blocked user or a bad request do not.
+    While the circuit is open, methods outside ``critical_methods`` fail
+    immediately with :class:`CircuitOpenError` so that best-effort sends do
+    not pile up, whereas critical calls such as approvals keep trying.
+    """
+
+    def __init__(self, config: BotApiConfig, *, labels: Mapping[int, str] | None = None) -> None:
+        self._config = config
+        # Metrics label per bot id; bots missing here are labelled with their id.
+        self._labels = dict(labels or {})
+        self._critical = frozenset(config.critical_methods)
+        self.breaker = CircuitBreaker(
+            "bot_api", config.breaker, on_state_change=record_circuit_state
+        )
+
+    def timeout_for(self, method_name: str) -> float:
+        return self._config.method_timeouts.get(method_name, self._config.default_timeout)
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        name = method.__api_method__
+        if name in _PASSTHROUGH_METHODS:
+            return await make_request(bot, method)
+
+        # Critical calls bypass an open circuit, but only admitted calls report
+        # back: anything else could settle the half-open probe of another call.
+        admitted = self.breaker.allow_request()
+        if not admitted and name not in self._critical:
+            record_bot_api_shed(name, bot=self._label(bot))
+            msg = f"Bot API circuit is open, shedding {name}"
+            raise CircuitOpenError(msg)
+
+        try:
+            response = await asyncio.wait_for(
+                make_request(bot, method), timeout=self.timeout_for(name)
+            )
+        except TimeoutError:
+            self._record_failure(bot, name, "timeout", admitted=admitted)
+            raise
+        except TelegramServerError:
+            self._record_failure(bot, name, "server_error", admitted=admitted)
+            raise
+        except TelegramNetworkError:
+            self._record_failure(bot, name, "network_error", admitted=admitted)
+            raise
+        except Exception:
+            if admitted:
+                self.breaker.record_success()
+            raise
+        except BaseException:
+            if admitted:
+                self.breaker.release()
+            raise
+        if admitted:
+            self.breaker.record_success()
+        return response
+
+    def _label(self, bot: Bot) -> str:
+        return self._labels.get(bot.id) or str(bot.id)
+
+    def _record_failure(self, bot: Bot, method_name: str, reason: str, *, admitted: bool) -> None:
+        if admitted:
+            self.breaker.record_failure()
+        record_bot_api_failure(method_name, reason, bot=self._label(bot))
+        LOGGER.debug("Bot API call %s failed: %s", method_name, reason)
@@ -3,14 +3,26 @@
 from __future__ import annotations
 
 import logging
+from typing import Callable
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 
+from .api_guard import BotApiGuard
 from .configuration import AppConfig
 from .handlers import register
-from .middlewares import UpdateDumpMiddleware
+from .middlewares import (
+    ConfigMiddleware,
+    HandlerTrackingMiddleware,
+    InFlightMiddleware,
+    LogContextMiddleware,
+    UpdateDedupMiddleware,
+    UpdateDumpMiddleware,
+    UpdateTimingMiddleware,
+)
+from .session import TunedAiohttpSession
+from .shutdown import ShutdownCoordinator
 
 LOGGER = logging.getLogger(__name__)
 
@@ -23,19 +35,59 @@ def _parse_mode_from_string(parse_mode: str) -> ParseMode | None:
         return ParseMode.HTML
 
 
-def create_bot(config: AppConfig) -> Bot:
-    """Build an aiogram Bot instance using configuration."""
+def create_bots(config: AppConfig) -> list[Bot]:
+    """Build one Bot per configured profile, all sharing a single HTTP session."""
 
     default_properties = DefaultBotProperties(
         parse_mode=_parse_mode_from_string(config.telegram.parse_mode),
     )
-    return Bot(token=config.telegram.bot_token, default=default_properties)
+    session = TunedAiohttpSession(config.telegram.session)
+    profiles = config.telegram.profiles()
+    bots = [
+        Bot(token=profile.bot_token, session=session, default=default_properties)
+        for profile in profiles
+    ]
+    labels = {bot.id: profile.label for bot, profile in zip(bots, profiles, strict=True)}
+    session.middleware(BotApiGuard(config.telegram.api, labels=labels))
+    return bots
 
 
-def create_dispatcher() -> Dispatcher:
-    """Create dispatcher and register routers."""
+def create_dispatcher(
+    config: AppConfig | None = None,
+    *,
+    shutdown: ShutdownCoordinator | None = None,
+    config_source: Callable[[], AppConfig] | None = None,
+) -> Dispatcher:
+    """Create dispatcher and register routers.
+
+    ``config_source`` supplies the configuration for each update, which lets
+    a hot reload reach handlers without restarting polling.
+    """
 
     dispatcher = Dispatcher()
+    timing = UpdateTimingMiddleware() if config and config.metrics.update_timing else None
+    if timing is not None:
+        dispatcher.update.outer_middleware(timing)
+    if config_source is not None:
+        dispatcher.update.outer_middleware(ConfigMiddleware(config_source))
+    if shutdown is not None:
+        dispatcher.update.outer_middleware(InFlightMiddleware(shutdown))
+    log_context = LogContextMiddleware()
+    dispatcher.update.outer_middleware(log_context)
+    if config and config.dedup.enabled:
+        dispatcher.update.outer_middleware(
+            UpdateDedupMiddleware(ttl=config.dedup.ttl_seconds, maxsize=config.dedup.max_entries)
+        )
     dispatcher.update.outer_middleware(UpdateDumpMiddleware())
+    tracking = HandlerTrackingMiddleware() if config and config.loop_monitor.enabled else None
+    if tracking is not None:
+        dispatcher.update.outer_middleware(tracking)
+    for name, observer in dispatcher.observers.items():
+        if name not in {"update", "error"}:
+            observer.middleware(log_context)
+            if timing is not None:
+                observer.middleware(timing)
+            if tracking is not None:
+                observer.middleware(tracking)
     register(dispatcher)
     return dispatcher
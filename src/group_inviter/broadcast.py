@@ -0,0 +1,285 @@
+"""Rate-limited, resumable delivery of admin broadcasts to stored users."""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import logging
+import os
+import socket
+from collections import Counter
+from typing import TYPE_CHECKING, Mapping, Sequence
+
+from .configuration import AppConfig
+from .database import BroadcastRecord, BroadcastsRepository, Recipient
+from .metrics import record_broadcast_messages
+from .ratelimit import AsyncRateLimiter
+from .resilience import CircuitOpenError
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+LOGGER = logging.getLogger(__name__)
+
+# Transient failures (flood wait, network, open circuit) retried per recipient.
+_MAX_ATTEMPTS = 5
+_TRANSIENT_PAUSE = 5.0
+
+
+class Broadcaster:
+    """Copy an admin message to every reachable user, page by page.
+
+    Recipients are read in ``telegram_id`` order, ``batch_size`` at a time,
+    and sent with at most ``concurrency`` calls in flight through a token
+    bucket set below the Bot API ceiling, so join approvals keep headroom.
+    Telegram limits each token separately, so every bot has its own bucket,
+    and a flood-wait error pauses only that bot's bucket for its ``retry_after``.
+    After each page the last ``telegram_id`` and the counters are
+    checkpointed in ``broadcasts``, and users the bot cannot reach are
+    recorded in ``user_blocks`` so its later broadcasts skip them. Broadcasts are
+    leased to one process, which renews the lease while a page is being
+    sent and stops as soon as it loses it; a restarted or sibling process
+    resumes any broadcast whose lease expired, re-sending at most one page.
+    Pages are capped at what the rate allows in half a lease.
+    """
+
+    def __init__(
+        self,
+        repository: BroadcastsRepository,
+        bots: Sequence[Bot],
+        config: AppConfig,
+        *,
+        owner: str | None = None,
+        limiters: Mapping[int, AsyncRateLimiter] | None = None,
+    ) -> None:
+        self._repository = repository
+        self._bots = {bot.id: bot for bot in bots}
+        self._app_config = config
+        self._config = config.broadcast
+        self._owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self._limiters = {
+            bot.id: AsyncRateLimiter(self._config.rate, self._config.burst) for bot in bots
+        }
+        self._limiters.update(limiters or {})
+        self._page_size = max(
+            1,
+            min(self._config.batch_size, int(self._config.rate * self._config.lease_seconds / 2)),
+        )
+        self._tasks: dict[int, asyncio.Task[None]] = {}
+
+    def update_config(self, config: AppConfig) -> None:
+        """Use a reloaded ``config`` for admin notifications.
+
+        The ``broadcast`` section itself only takes effect after a restart.
+        """
+
+        self._app_config = config
+
+    @property
+    def active(self) -> list[int]:
+        return sorted(self._tasks)
+
+    async def start(
+        self,
+        bot: Bot,
+        source_chat_id: int,
+        message_id: int,
+        joined_chat_id: int | None = None,
+    ) -> BroadcastRecord:
+        """Record a new broadcast of ``message_id`` and start delivering it."""
+
+        record = await self._repository.create(
+            bot_id=bot.id,
+            source_chat_id=source_chat_id,
+            message_id=message_id,
+            joined_chat_id=joined_chat_id,
+            owner=self._owner,
+            lease_seconds=self._config.lease_seconds,
+        )
+        self._spawn(record)
+        return record
+
+    async def cancel(self, bot: Bot, broadcast_id: int) -> bool:
+        """Cancel ``broadcast_id`` if ``bot`` started it; other bots' broadcasts are left alone."""
+
+        cancelled = await self._repository.cancel(broadcast_id, bot.id)
+        task = self._tasks.get(broadcast_id)
+        if cancelled and task is not None:
+            task.cancel()
+        return cancelled
+
+    async def run(self) -> None:
+        """Resume broadcasts left without an owner until cancelled."""
+
+        try:
+            while True:
+                try:
+                    records = await self._repository.claim_orphaned(
+                        list(self._bots), self._owner, self._config.lease_seconds
+                    )
+                except Exception as exc:
+                    LOGGER.warning("Failed to look for broadcasts to resume: %s", exc)
+                    records = []
+                for record in records:
+                    if record.id not in self._tasks:
+                        LOGGER.info(
+                            "Resuming broadcast %s after user %s", record.id, record.last_user_id
+                        )
+                        self._spawn(record)
+                await asyncio.sleep(self._config.lease_seconds / 2)
+        finally:
+            await self.stop()
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if tasks:
+            try:
+                await self._repository.release(self._owner)
+            except Exception as exc:  # pragma: no cover - best effort on the way out
+                LOGGER.warning("Failed to release broadcast leases: %s", exc)
+
+    def _spawn(self, record: BroadcastRecord) -> None:
+        task = asyncio.create_task(self._deliver(record))
+        self._tasks[record.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(record.id, None))
+
+    async def _deliver(self, record: BroadcastRecord) -> None:
+        bot = self._bots[record.bot_id]
+        try:
+            while page := await self._repository.recipients(
+                record.bot_id, record.last_user_id, record.joined_chat_id, self._page_size
+            ):
+                outcomes = await self._send_leased(bot, record, page)
+                if outcomes is None:
+                    LOGGER.info("Broadcast %s was cancelled or taken over", record.id)
+                    return
+                counts = Counter(outcomes)
+                for outcome, count in counts.items():
+                    record_broadcast_messages(
+                        outcome, count, bot=self._app_config.telegram.label_for(bot.token)
+                    )
+                record = dataclasses.replace(
+                    record,
+                    last_user_id=page[-1].telegram_id,
+                    sent=record.sent + counts["sent"],
+                    blocked=record.blocked + counts["blocked"],
+                    failed=record.failed + counts["failed"],
+                )
+                still_owned = await self._repository.checkpoint(
+                    record,
+                    owner=self._owner,
+                    lease_seconds=self._config.lease_seconds,
+                    blocked_user_ids=[
+                        recipient.telegram_id
+                        for recipient, outcome in zip(page, outcomes, strict=True)
+                        if outcome == "blocked"
+                    ],
+                )
+                if not still_owned:
+                    LOGGER.info("Broadcast %s was cancelled or taken over", record.id)
+                    return
+            await self._repository.finish(record.id, self._owner)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            # The lease runs out and run() (here or in a sibling) resumes it.
+            LOGGER.error("Broadcast %s interrupted: %s", record.id, exc)
+            return
+        LOGGER.info(
+            "Broadcast %s finished: %s sent, %s blocked, %s failed",
+            record.id,
+            record.sent,
+            record.blocked,
+            record.failed,
+        )
+        from .handlers._helpers import notify_admin
+
+        await notify_admin(
+            bot,
+            self._app_config,
+            (
+                f"Рассылка #{record.id} завершена.\n"
+                f"Доставлено: {record.sent}, заблокировали бота: {record.blocked}, "
+                f"ошибок: {record.failed}"
+            ),
+            logger=LOGGER,
+            context="broadcast",
+        )
+
+    async def _send_leased(
+        self, bot: Bot, record: BroadcastRecord, page: Sequence[Recipient]
+    ) -> list[str] | None:
+        """Send ``page`` while renewing the lease; ``None`` once it is lost.
+
+        Flood waits can stretch a page past the lease, and a sibling would
+        then claim the broadcast and send the same page again.
+        """
+
+        sending = asyncio.create_task(self._send_page(bot, record, page))
+        try:
+            while True:
+                done, _ = await asyncio.wait({sending}, timeout=self._config.lease_seconds / 3)
+                if done:
+                    return sending.result()
+                if not await self._repository.renew(
+                    record.id, self._owner, self._config.lease_seconds
+                ):
+                    return None
+        finally:
+            if not sending.done():
+                sending.cancel()
+                await asyncio.gather(sending, return_exceptions=True)
+
+    async def _send_page(
+        self, bot: Bot, record: BroadcastRecord, page: Sequence[Recipient]
+    ) -> list[str]:
+        semaphore = asyncio.Semaphore(self._config.concurrency)
+
+        async def send(recipient: Recipient) -> str:
+            async with semaphore:
+                return await self._send(bot, record, recipient.chat_id)
+
+        return list(await asyncio.gather(*(send(recipient) for recipient in page)))
+
+    async def _send(self, bot: Bot, record: BroadcastRecord, chat_id: int) -> str:
+        from aiogram.exceptions import (
+            TelegramBadRequest,
+            TelegramForbiddenError,
+            TelegramNetworkError,
+            TelegramRetryAfter,
+            TelegramServerError,
+        )
+
+        limiter = self._limiters[bot.id]
+        for _ in range(_MAX_ATTEMPTS):
+            await limiter.acquire()
+            try:
+                await bot.copy_message(
+                    chat_id=chat_id,
+                    from_chat_id=record.source_chat_id,
+                    message_id=record.message_id,
+                )
+            except TelegramRetryAfter as exc:
+                LOGGER.warning("Flood wait during broadcast %s: %ss", record.id, exc.retry_after)
+                limiter.pause(exc.retry_after)
+            except (
+                TelegramNetworkError,
+                TelegramServerError,
+                CircuitOpenError,
+                TimeoutError,
+            ) as exc:
+                LOGGER.debug("Transient broadcast failure for %s: %s", chat_id, exc)
+                limiter.pause(_TRANSIENT_PAUSE)
+            except TelegramForbiddenError:
+                return "blocked"
+            except TelegramBadRequest as exc:
+                if "chat not found" in str(exc).lower():
+                    return "blocked"
+                LOGGER.debug("Broadcast %s to %s rejected: %s", record.id, chat_id, exc)
+                return "failed"
+            else:
+                return "sent"
+        return "failed"
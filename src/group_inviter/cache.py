@@ -0,0 +1,83 @@
+"""Small in-memory caches shared by handlers and middlewares."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Bounded LRU mapping whose entries expire after a fixed time-to-live."""
+
+    def __init__(
+        self,
+        *,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if maxsize < 1:
+            msg = "maxsize must be positive"
+            raise ValueError(msg)
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        entry = self._entries.get(key)  # type: ignore[arg-type]
+        return entry is not None and entry[0] > self._clock()
+
+    def get(self, key: K) -> V | None:
+        """Return a live value and mark it as recently used."""
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        """Store a value, evicting the least recently used entries when full."""
+
+        now = self._clock()
+        self._entries[key] = (now + self._ttl, value)
+        self._entries.move_to_end(key)
+        self._evict(now)
+
+    def add(self, key: K, value: V) -> bool:
+        """Store a value only if the key is absent; return whether it was stored."""
+
+        if key in self:
+            return False
+        self.set(key, value)
+        return True
+
+    def pop(self, key: K) -> V | None:
+        """Remove a key and return its value when it was still live."""
+
+        entry = self._entries.pop(key, None)
+        if entry is None or entry[0] <= self._clock():
+            return None
+        return entry[1]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _evict(self, now: float) -> None:
+        while self._entries:
+            key, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at > now and len(self._entries) <= self._maxsize:
+                break
+            del self._entries[key]
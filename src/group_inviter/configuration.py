@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import os
+from functools import cached_property
 from pathlib import Path
 from typing import Any
 
@@ -16,12 +17,166 @@ class SettingsBase(BaseModel):
     model_config = ConfigDict(protected_namespaces=())
 
 
-class TelegramConfig(SettingsBase):
-    """Telegram-specific settings."""
+class CircuitBreakerConfig(SettingsBase):
+    """Failure-ratio circuit breaker thresholds."""
+
+    window_size: int = Field(20, ge=1)
+    min_calls: int = Field(5, ge=1)
+    failure_ratio: float = Field(0.5, gt=0, le=1)
+    reset_timeout: float = Field(30.0, gt=0)
+
+
+def _default_method_timeouts() -> dict[str, float]:
+    return {
+        "sendMessage": 5.0,
+        "sendPhoto": 10.0,
+        "approveChatJoinRequest": 10.0,
+        "createChatInviteLink": 10.0,
+    }
+
+
+def _default_critical_methods() -> list[str]:
+    return [
+        "approveChatJoinRequest",
+        "declineChatJoinRequest",
+        "createChatInviteLink",
+        "getMe",
+    ]
+
+
+class BotApiConfig(SettingsBase):
+    """Timeout budgets and load shedding for Bot API calls."""
+
+    default_timeout: float = Field(15.0, gt=0)
+    method_timeouts: dict[str, float] = Field(default_factory=_default_method_timeouts)
+    critical_methods: list[str] = Field(default_factory=_default_critical_methods)
+    breaker: CircuitBreakerConfig = Field(default_factory=CircuitBreakerConfig)
+
+
+class SessionConfig(SettingsBase):
+    """HTTP connection pool settings for Bot API requests."""
+
+    connection_limit: int = Field(100, ge=1)
+    limit_per_host: int = Field(0, ge=0)
+    keepalive_timeout: float = Field(30.0, gt=0)
+    dns_cache_ttl: int = Field(3600, ge=0)
+    request_timeout: float = Field(60.0, gt=0)
+    connect_timeout: float = Field(10.0, gt=0)
+    api_base_url: str | None = Field(default=None, min_length=1)
+
 
+class TextsConfig(SettingsBase):
+    """Per-bot message overrides; unset values use the built-in texts."""
+
+    welcome_photo: str | None = Field(default=None, min_length=1)
+    welcome_caption: str | None = Field(default=None, min_length=1)
+
+
+class BotProfileConfig(SettingsBase):
+    """Identity of a single bot served by the process."""
+
+    name: str | None = Field(default=None, min_length=1)
     bot_token: str = Field(..., min_length=10)
+    admin_chat_id: int | None = Field(default=None, ge=1)
+    texts: TextsConfig = Field(default_factory=TextsConfig)
+
+    @property
+    def label(self) -> str:
+        """Name used in metrics and logs; defaults to the numeric bot id."""
+
+        return self.name or self.bot_token.split(":", 1)[0]
+
+
+class WebhookConfig(SettingsBase):
+    """Webhook delivery settings; polling is used when disabled."""
+
+    enabled: bool = Field(False)
+    base_url: str | None = Field(default=None, min_length=1)
+    path: str = Field("/webhook", min_length=1)
+    host: str = Field("0.0.0.0", min_length=1)  # noqa: S104 - served behind a reverse proxy
+    port: int = Field(8080, ge=1, le=65535)
+    secret_token: str | None = Field(default=None, min_length=1)
+    workers: int = Field(1, ge=1)
+
+    @model_validator(mode="after")
+    def validate_base_url(self) -> WebhookConfig:
+        if self.enabled and not self.base_url:
+            msg = "webhook.base_url is required when webhooks are enabled"
+            raise ValueError(msg)
+        if self.workers > 1 and not self.enabled:
+            msg = "webhook.workers > 1 requires webhooks to be enabled"
+            raise ValueError(msg)
+        return self
+
+
+class TelegramConfig(SettingsBase):
+    """Telegram-specific settings.
+
+    A single bot is configured through ``bot_token``/``admin_chat_id``;
+    several bots sharing the process go into ``bots``. Top-level
+    ``admin_chat_id`` and ``texts`` act as defaults for every profile.
+    """
+
+    bot_token: str | None = Field(default=None, min_length=10)
     parse_mode: str = Field("HTML", min_length=1)
     admin_chat_id: int | None = Field(default=None, ge=1)
+    texts: TextsConfig = Field(default_factory=TextsConfig)
+    bots: list[BotProfileConfig] = Field(default_factory=list)
+    api: BotApiConfig = Field(default_factory=BotApiConfig)
+    session: SessionConfig = Field(default_factory=SessionConfig)
+    webhook: WebhookConfig = Field(default_factory=WebhookConfig)
+
+    @model_validator(mode="after")
+    def validate_bots(self) -> TelegramConfig:
+        tokens = [profile.bot_token for profile in self.profiles()]
+        if not tokens:
+            msg = "either telegram.bot_token or telegram.bots must be set"
+            raise ValueError(msg)
+        if len(set(tokens)) != len(tokens):
+            msg = "bot tokens must be unique"
+            raise ValueError(msg)
+        return self
+
+    def profiles(self) -> list[BotProfileConfig]:
+        """Return every bot profile with top-level defaults applied."""
+
+        if not self.bots:
+            if self.bot_token is None:
+                return []
+            return [
+                BotProfileConfig(
+                    bot_token=self.bot_token,
+                    admin_chat_id=self.admin_chat_id,
+                    texts=self.texts,
+                )
+            ]
+        return [
+            profile.model_copy(
+                update={
+                    "admin_chat_id": profile.admin_chat_id or self.admin_chat_id,
+                    "texts": TextsConfig(
+                        welcome_photo=profile.texts.welcome_photo or self.texts.welcome_photo,
+                        welcome_caption=profile.texts.welcome_caption or self.texts.welcome_caption,
+                    ),
+                }
+            )
+            for profile in self.bots
+        ]
+
+    def profile_for(self, bot_token: str) -> BotProfileConfig | None:
+        """Find the profile of the bot owning ``bot_token``."""
+
+        return self.profiles_by_token.get(bot_token)
+
+    def label_for(self, bot_token: str) -> str:
+        """Metrics label of the bot owning ``bot_token``; its numeric id if unknown."""
+
+        profile = self.profile_for(bot_token)
+        return profile.label if profile else bot_token.split(":", 1)[0]
+
+    @cached_property
+    def profiles_by_token(self) -> dict[str, BotProfileConfig]:
+        return {profile.bot_token: profile for profile in self.profiles()}
 
 
 class LoggingConfig(SettingsBase):
@@ -33,6 +188,39 @@ class LoggingConfig(SettingsBase):
     info_filename: str = Field("info.log", min_length=1)
     debug_filename: str = Field("debug.log", min_length=1)
     timezone: str = Field("UTC", min_length=1)
+    max_bytes: int = Field(10 * 1024 * 1024, ge=0)
+    backup_count: int = Field(5, ge=0)
+    compress: bool = Field(True)
+    retention_days: float = Field(30.0, ge=0)
+    retention_max_bytes: int = Field(1024 * 1024 * 1024, ge=0)
+
+
+class ProfilerConfig(SettingsBase):
+    """On-demand sampling profiler served at ``/debug/profile``."""
+
+    enabled: bool = Field(False)
+    sample_interval: float = Field(0.01, gt=0)
+    max_seconds: float = Field(60.0, gt=0)
+
+
+def _default_census_types() -> list[str]:
+    return [
+        "aiogram.types.update.Update",
+        "aiogram.types.message.Message",
+        "aiogram.types.chat_join_request.ChatJoinRequest",
+        "logging.LogRecord",
+        "_asyncio.Task",
+    ]
+
+
+class MemoryConfig(SettingsBase):
+    """Tracemalloc endpoints under ``/debug/memory`` and live object census."""
+
+    enabled: bool = Field(False)
+    traceback_frames: int = Field(10, ge=1)
+    max_snapshots: int = Field(5, ge=2)
+    census_interval: float = Field(60.0, ge=0)
+    census_types: list[str] = Field(default_factory=_default_census_types)
 
 
 class MetricsConfig(SettingsBase):
@@ -41,6 +229,18 @@ class MetricsConfig(SettingsBase):
     enabled: bool = Field(True)
     host: str = Field("127.0.0.1", min_length=1)
     port: int = Field(8000, ge=1, le=65535)
+    debug_token: str | None = Field(default=None, min_length=16)
+    profiler: ProfilerConfig = Field(default_factory=ProfilerConfig)
+    memory: MemoryConfig = Field(default_factory=MemoryConfig)
+    multiprocess_dir: Path | None = Field(default=None)
+    update_timing: bool = Field(True)
+
+    @model_validator(mode="after")
+    def validate_debug_token(self) -> MetricsConfig:
+        if (self.profiler.enabled or self.memory.enabled) and not self.debug_token:
+            msg = "metrics.debug_token is required when debug endpoints are enabled"
+            raise ValueError(msg)
+        return self
 
 
 class DatabaseConfig(SettingsBase):
@@ -53,6 +253,9 @@ class DatabaseConfig(SettingsBase):
     password: str = Field(..., min_length=1)
     min_pool_size: int = Field(1, ge=1)
     max_pool_size: int = Field(10, ge=1)
+    connect_timeout: float = Field(5.0, gt=0)
+    call_timeout: float = Field(2.0, gt=0)
+    breaker: CircuitBreakerConfig = Field(default_factory=CircuitBreakerConfig)
 
     @model_validator(mode="after")
     def validate_pool_limits(self) -> DatabaseConfig:
@@ -62,6 +265,108 @@ class DatabaseConfig(SettingsBase):
         return self
 
 
+class DedupConfig(SettingsBase):
+    """Duplicate update and join request suppression settings."""
+
+    enabled: bool = Field(True)
+    ttl_seconds: float = Field(600.0, gt=0)
+    max_entries: int = Field(10_000, ge=1)
+    persistent: bool = Field(False)
+
+
+class SpoolConfig(SettingsBase):
+    """Local fallback storage used while the database is unavailable."""
+
+    enabled: bool = Field(True)
+    path: Path = Field(Path("spool/join_requests.jsonl"))
+    fsync_batch: int = Field(50, ge=1)
+    fsync_interval: float = Field(1.0, gt=0)
+    replay_interval: float = Field(5.0, gt=0)
+    replay_batch_size: int = Field(500, ge=1)
+    replay_timeout: float = Field(30.0, gt=0)
+
+
+class LoopMonitorConfig(SettingsBase):
+    """Event loop lag histogram and blocked-loop watchdog."""
+
+    enabled: bool = Field(True)
+    interval: float = Field(0.25, gt=0)
+    slow_callback_threshold: float = Field(0.5, gt=0)
+    max_stack_frames: int = Field(25, ge=1)
+
+
+class ShutdownConfig(SettingsBase):
+    """Graceful drain of in-flight updates on stop."""
+
+    drain_timeout: float = Field(20.0, gt=0)
+    redeliver_abandoned: bool = Field(True)
+    abandoned_path: Path = Field(Path("spool/abandoned_updates.jsonl"))
+
+
+class InvitesConfig(SettingsBase):
+    """Lifecycle of invite links created with ``/generate_invite``."""
+
+    default_expire: float | None = Field(default=None, gt=0)
+    default_usage_limit: int | None = Field(default=None, ge=1)
+    rotate: bool = Field(False)
+    revoke_rate: float = Field(20.0, gt=0)
+    revoke_burst: int = Field(5, ge=1)
+    batch_size: int = Field(50, ge=1)
+    retry_delay: float = Field(60.0, gt=0)
+
+
+class MediaConfig(SettingsBase):
+    """Local assets sent by file_id once uploaded (see :mod:`group_inviter.media`)."""
+
+    assets: dict[str, Path] = Field(default_factory=dict)
+    validate_on_startup: bool = Field(True)
+
+
+class BroadcastConfig(SettingsBase):
+    """Pace and checkpointing of admin broadcasts to stored users."""
+
+    rate: float = Field(25.0, gt=0)
+    burst: int = Field(5, ge=1)
+    concurrency: int = Field(8, ge=1)
+    batch_size: int = Field(500, ge=1)
+    lease_seconds: float = Field(60.0, gt=0)
+
+
+class PermissionsConfig(SettingsBase):
+    """Cache of chat administrators and of the bot's own rights."""
+
+    ttl_seconds: float = Field(300.0, gt=0)
+    max_chats: int = Field(1_000, ge=1)
+
+
+class WhoisConfig(SettingsBase):
+    """Admin lookup of stored users by id, username or name."""
+
+    limit: int = Field(10, ge=1, le=50)
+    min_query_length: int = Field(3, ge=1)
+    cache_size: int = Field(256, ge=1)
+    cache_ttl: float = Field(60.0, gt=0)
+
+
+class ReviewConfig(SettingsBase):
+    """Manual review of join requests made through links not created by the bot."""
+
+    enabled: bool = Field(True)
+    page_size: int = Field(8, ge=1, le=20)
+    rate: float = Field(20.0, gt=0)
+    burst: int = Field(5, ge=1)
+    concurrency: int = Field(8, ge=1)
+    batch_size: int = Field(50, ge=1)
+    progress_interval: float = Field(2.0, gt=0)
+
+
+class ReloadConfig(SettingsBase):
+    """Hot reload of the configuration file (SIGHUP always triggers one)."""
+
+    watch: bool = Field(False)
+    watch_interval: float = Field(2.0, gt=0)
+
+
 class AppConfig(SettingsBase):
     """Aggregate application configuration."""
 
@@ -69,6 +374,17 @@ class AppConfig(SettingsBase):
     logging: LoggingConfig = Field(default_factory=LoggingConfig)
     metrics: MetricsConfig = Field(default_factory=MetricsConfig)
     database: DatabaseConfig
+    dedup: DedupConfig = Field(default_factory=DedupConfig)
+    spool: SpoolConfig = Field(default_factory=SpoolConfig)
+    loop_monitor: LoopMonitorConfig = Field(default_factory=LoopMonitorConfig)
+    shutdown: ShutdownConfig = Field(default_factory=ShutdownConfig)
+    invites: InvitesConfig = Field(default_factory=InvitesConfig)
+    media: MediaConfig = Field(default_factory=MediaConfig)
+    broadcast: BroadcastConfig = Field(default_factory=BroadcastConfig)
+    permissions: PermissionsConfig = Field(default_factory=PermissionsConfig)
+    whois: WhoisConfig = Field(default_factory=WhoisConfig)
+    review: ReviewConfig = Field(default_factory=ReviewConfig)
+    reload: ReloadConfig = Field(default_factory=ReloadConfig)
 
 
 DEFAULT_CONFIG_PATH = Path("config/config.yaml")
@@ -88,11 +404,16 @@ def _read_yaml(path: Path) -> dict[str, Any]:
     return data
 
 
+def resolve_config_path(path: Path | None = None) -> Path:
+    """``path`` or, when omitted, ``$GROUP_INVITER_CONFIG`` or the default location."""
+
+    return path or Path(os.environ.get(CONFIG_ENV_VAR, DEFAULT_CONFIG_PATH))
+
+
 def load_config(path: Path | None = None) -> AppConfig:
     """Load configuration from YAML or raise a descriptive error."""
 
-    config_path = path or Path(os.environ.get(CONFIG_ENV_VAR, DEFAULT_CONFIG_PATH))
-    raw_data = _read_yaml(config_path)
+    raw_data = _read_yaml(resolve_config_path(path))
     try:
         return AppConfig.model_validate(raw_data)
     except ValidationError as exc:
@@ -2,16 +2,28 @@
 
 from __future__ import annotations
 
+import logging
+from dataclasses import asdict, astuple, dataclass
 from datetime import UTC, datetime
-
-import asyncpg  # type: ignore[import-untyped]
-from aiogram.types import ChatJoinRequest
+from typing import TYPE_CHECKING, Any, Mapping, Protocol, Sequence
 
 from .configuration import DatabaseConfig
 
+if TYPE_CHECKING:
+    import asyncpg  # type: ignore[import-untyped]
+    from aiogram.types import ChatJoinRequest
+
+LOGGER = logging.getLogger(__name__)
+
+
+async def create_pool(config: DatabaseConfig, *, lazy: bool = False) -> asyncpg.Pool:
+    """Create an asyncpg connection pool based on validated settings.
+
+    A lazy pool opens no connections up front, which lets the bot start
+    while the database is unreachable.
+    """
 
-async def create_pool(config: DatabaseConfig) -> asyncpg.Pool:
-    """Create an asyncpg connection pool based on validated settings."""
+    import asyncpg
 
     return await asyncpg.create_pool(
         host=config.host,
@@ -19,39 +31,396 @@ async def create_pool(config: DatabaseConfig) -> asyncpg.Pool:
         user=config.user,
         password=config.password,
         database=config.database,
-        min_size=config.min_pool_size,
+        min_size=0 if lazy else config.min_pool_size,
         max_size=config.max_pool_size,
+        timeout=config.connect_timeout,
+    )
+
+
+SCHEMA_STATEMENTS: tuple[str, ...] = (
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        telegram_id BIGINT PRIMARY KEY,
+        first_name TEXT,
+        last_name TEXT,
+        username TEXT,
+        phone_number TEXT,
+        language_code TEXT,
+        is_premium BOOLEAN DEFAULT FALSE,
+        is_bot BOOLEAN NOT NULL DEFAULT FALSE,
+        joined_chat_id BIGINT,
+        user_chat_id BIGINT,
+        joined_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_users_joined_chat_id
+        ON users (joined_chat_id)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS processed_join_requests (
+        chat_id BIGINT NOT NULL,
+        user_id BIGINT NOT NULL,
+        processed_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (chat_id, user_id)
     )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS invite_links (
+        invite_link TEXT PRIMARY KEY,
+        bot_id BIGINT NOT NULL,
+        chat_id BIGINT NOT NULL,
+        name TEXT,
+        expire_at TIMESTAMPTZ,
+        expire_after DOUBLE PRECISION,
+        usage_limit INTEGER,
+        usage_count INTEGER NOT NULL DEFAULT 0,
+        rotate BOOLEAN NOT NULL DEFAULT FALSE,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        revoked_at TIMESTAMPTZ
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_invite_links_active
+        ON invite_links (expire_at)
+        WHERE revoked_at IS NULL
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS media_files (
+        bot_id BIGINT NOT NULL,
+        name TEXT NOT NULL,
+        content_hash TEXT NOT NULL,
+        file_id TEXT NOT NULL,
+        uploaded_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (bot_id, name)
+    )
+    """,
+    # Users a bot could not reach during a broadcast; one users table serves every bot.
+    """
+    CREATE TABLE IF NOT EXISTS user_blocks (
+        bot_id BIGINT NOT NULL,
+        telegram_id BIGINT NOT NULL,
+        blocked_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (bot_id, telegram_id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS user_blocks_telegram_id_idx ON user_blocks (telegram_id)",
+    """
+    CREATE TABLE IF NOT EXISTS broadcasts (
+        id BIGSERIAL PRIMARY KEY,
+        bot_id BIGINT NOT NULL,
+        source_chat_id BIGINT NOT NULL,
+        message_id BIGINT NOT NULL,
+        joined_chat_id BIGINT,
+        status TEXT NOT NULL DEFAULT 'running',
+        last_user_id BIGINT NOT NULL DEFAULT 0,
+        sent INTEGER NOT NULL DEFAULT 0,
+        blocked INTEGER NOT NULL DEFAULT 0,
+        failed INTEGER NOT NULL DEFAULT 0,
+        owner TEXT,
+        lease_until TIMESTAMPTZ,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        finished_at TIMESTAMPTZ
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_joins (
+        telegram_id BIGINT NOT NULL,
+        chat_id BIGINT NOT NULL,
+        first_joined_at TIMESTAMPTZ NOT NULL,
+        last_joined_at TIMESTAMPTZ NOT NULL,
+        join_count INTEGER NOT NULL DEFAULT 1,
+        PRIMARY KEY (telegram_id, chat_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS pending_requests (
+        bot_id BIGINT NOT NULL,
+        chat_id BIGINT NOT NULL,
+        user_id BIGINT NOT NULL,
+        first_name TEXT,
+        last_name TEXT,
+        username TEXT,
+        language_code TEXT,
+        is_premium BOOLEAN NOT NULL DEFAULT FALSE,
+        user_chat_id BIGINT,
+        invite_link TEXT,
+        requested_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (bot_id, chat_id, user_id)
+    )
+    """,
+    # Seeds the history from users once; a no-op as soon as the table has rows.
+    """
+    INSERT INTO user_joins (telegram_id, chat_id, first_joined_at, last_joined_at)
+    SELECT telegram_id, joined_chat_id, joined_at, updated_at FROM users
+    WHERE joined_chat_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM user_joins)
+    """,
+)
+
+# Lower-cased "first last" name; the same expression is used by the indexes and by /whois.
+USER_FULL_NAME_SQL = "lower(coalesce(first_name, '') || ' ' || coalesce(last_name, ''))"
+
+# Substring search for /whois; needs the pg_trgm extension (trusted since PostgreSQL 13).
+TRIGRAM_EXTENSION_SQL = "CREATE EXTENSION IF NOT EXISTS pg_trgm"
+TRIGRAM_INDEX_STATEMENTS: tuple[str, ...] = (
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS users_username_trgm_idx
+        ON users USING gin (lower(username) gin_trgm_ops)
+    """,
+    f"""
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS users_full_name_trgm_idx
+        ON users USING gin (({USER_FULL_NAME_SQL}) gin_trgm_ops)
+    """,
+)
+
+# Fallback when pg_trgm cannot be installed: /whois matches prefixes only.
+PREFIX_INDEX_STATEMENTS: tuple[str, ...] = (
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS users_username_prefix_idx
+        ON users (lower(username) text_pattern_ops)
+    """,
+    f"""
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS users_full_name_prefix_idx
+        ON users (({USER_FULL_NAME_SQL}) text_pattern_ops)
+    """,
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS users_last_name_prefix_idx
+        ON users (lower(last_name) text_pattern_ops)
+    """,
+)
+
+SEARCH_INDEX_NAMES: tuple[str, ...] = (
+    "users_username_trgm_idx",
+    "users_full_name_trgm_idx",
+    "users_username_prefix_idx",
+    "users_full_name_prefix_idx",
+    "users_last_name_prefix_idx",
+)
+
+# Indexes left INVALID by an interrupted concurrent build; they are dropped and rebuilt.
+_INVALID_SEARCH_INDEXES_SQL = """
+    SELECT index_class.relname
+    FROM pg_index
+    JOIN pg_class AS index_class ON index_class.oid = pg_index.indexrelid
+    WHERE pg_index.indrelid = 'users'::regclass
+        AND NOT pg_index.indisvalid
+        AND index_class.relname = ANY($1::text[])
+"""
+
+# Advisory lock key held while building the search indexes, so that several
+# processes sharing the database do not build (or drop) them at the same time.
+_SEARCH_INDEX_LOCK_KEY = 4_721_063_901
+
+
+# Settings that only take effect when a new pool is created.
+POOL_SETTINGS = frozenset(
+    {
+        "host",
+        "port",
+        "database",
+        "user",
+        "password",
+        "min_pool_size",
+        "max_pool_size",
+        "connect_timeout",
+    }
+)
+
+
+class SwappablePool:
+    """Stable handle to an asyncpg pool that can be replaced at runtime.
+
+    Repositories keep a reference to this object instead of the pool, so a
+    configuration reload can point every one of them at a new pool at once.
+    Connections acquired before the swap are returned to the old pool.
+    """
+
+    def __init__(self, pool: asyncpg.Pool) -> None:
+        self._pool = pool
+
+    @property
+    def pool(self) -> asyncpg.Pool:
+        return self._pool
+
+    def acquire(self) -> Any:
+        return self._pool.acquire()
+
+    def replace(self, pool: asyncpg.Pool) -> asyncpg.Pool:
+        """Route new acquisitions to ``pool`` and return the previous one."""
+
+        previous, self._pool = self._pool, pool
+        return previous
+
+    async def close(self) -> None:
+        await self._pool.close()
 
 
 async def ensure_schema(pool: asyncpg.Pool) -> None:
-    """Ensure that required database tables are created."""
+    """Ensure that required database tables are created.
+
+    All statements are sent as one script, so verifying an existing schema
+    costs a single round trip. The /whois search indexes are built
+    separately by :func:`ensure_search_indexes`.
+    """
+
+    async with pool.acquire() as connection:
+        await connection.execute(";\n".join(SCHEMA_STATEMENTS))
+
+
+async def ensure_search_indexes(pool: asyncpg.Pool) -> None:
+    """Build the /whois search indexes without blocking writes to ``users``.
+
+    ``CREATE INDEX CONCURRENTLY`` cannot run inside a transaction or a
+    multi-statement script, so every statement is sent on its own. Without
+    the rights to install ``pg_trgm``, prefix indexes are built instead.
+    Returns immediately when another process already holds the build lock.
+    """
+
+    import asyncpg
 
     async with pool.acquire() as connection:
-        await connection.execute(
-            """
-            CREATE TABLE IF NOT EXISTS users (
-                telegram_id BIGINT PRIMARY KEY,
-                first_name TEXT,
-                last_name TEXT,
-                username TEXT,
-                phone_number TEXT,
-                language_code TEXT,
-                is_premium BOOLEAN DEFAULT FALSE,
-                is_bot BOOLEAN NOT NULL DEFAULT FALSE,
-                joined_chat_id BIGINT,
-                user_chat_id BIGINT,
-                joined_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
-            )
-            """
+        if not await connection.fetchval("SELECT pg_try_advisory_lock($1)", _SEARCH_INDEX_LOCK_KEY):
+            LOGGER.info("Search indexes are being built by another process")
+            return
+        try:
+            try:
+                await connection.execute(TRIGRAM_EXTENSION_SQL)
+            except asyncpg.PostgresError as exc:
+                LOGGER.warning("pg_trgm unavailable, /whois falls back to prefix search: %s", exc)
+                statements = PREFIX_INDEX_STATEMENTS
+            else:
+                statements = TRIGRAM_INDEX_STATEMENTS
+            for name in await connection.fetch(_INVALID_SEARCH_INDEXES_SQL, SEARCH_INDEX_NAMES):
+                LOGGER.warning("Rebuilding invalid search index %s", name[0])
+                await connection.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name[0]}"')
+            for statement in statements:
+                await connection.execute(statement)
+        finally:
+            await connection.execute("SELECT pg_advisory_unlock($1)", _SEARCH_INDEX_LOCK_KEY)
+    LOGGER.info("Search indexes are ready")
+
+
+@dataclass(frozen=True, slots=True)
+class UserRecord:
+    """Snapshot of the user fields persisted for an approved join request."""
+
+    telegram_id: int
+    first_name: str | None
+    last_name: str | None
+    username: str | None
+    phone_number: str | None
+    language_code: str | None
+    is_premium: bool
+    is_bot: bool
+    joined_chat_id: int
+    user_chat_id: int | None
+    joined_at: datetime
+    # Bot that approved the request; ``None`` for records spooled by older versions.
+    bot_id: int | None = None
+
+    @classmethod
+    def from_join_request(
+        cls, join_request: ChatJoinRequest, *, bot_id: int | None
+    ) -> UserRecord | None:
+        user = join_request.from_user
+        if user is None:  # pragma: no cover - defensive guard
+            return None
+        return cls(
+            telegram_id=user.id,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            username=user.username,
+            phone_number=getattr(user, "phone_number", None),
+            language_code=user.language_code,
+            is_premium=bool(getattr(user, "is_premium", False)),
+            is_bot=bool(getattr(user, "is_bot", False)),
+            joined_chat_id=join_request.chat.id,
+            user_chat_id=join_request.user_chat_id,
+            joined_at=datetime.now(UTC),
+            bot_id=bot_id,
+        )
+
+    def to_json(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["joined_at"] = self.joined_at.isoformat()
+        return data
+
+    @classmethod
+    def from_json(cls, data: Mapping[str, Any]) -> UserRecord:
+        fields = dict(data)
+        fields["joined_at"] = datetime.fromisoformat(fields["joined_at"])
+        return cls(**fields)
+
+    def as_row(self) -> tuple[Any, ...]:
+        return astuple(self)
+
+
+class JoinRequestStore(Protocol):
+    """Anything able to persist approved join requests."""
+
+    async def record_join_request(self, join_request: ChatJoinRequest, *, bot_id: int) -> None: ...
+
+
+# Approving a request proves the user can be reached by that bot again, so its
+# block is cleared; blocks recorded by other bots stay.
+# A spooled record replayed after a newer live write is stale: it must neither
+# overwrite the newer row nor clear a block recorded after the original join.
+# The history counts a join only when its date lies outside the known range, so
+# re-applying a record (spool replay) is a no-op; a join between the first and
+# last known ones that arrives late is not counted.
+_UPSERT_USER_SQL = """
+    WITH unblocked AS (
+        DELETE FROM user_blocks
+        WHERE bot_id = $12
+            AND telegram_id = $1
+            AND blocked_at <= $11
+            AND NOT EXISTS (
+                SELECT 1 FROM users WHERE telegram_id = $1 AND updated_at > $11
+            )
+    ),
+    upserted AS (
+        INSERT INTO users (
+            telegram_id,
+            first_name,
+            last_name,
+            username,
+            phone_number,
+            language_code,
+            is_premium,
+            is_bot,
+            joined_chat_id,
+            user_chat_id,
+            joined_at,
+            updated_at
         )
-        await connection.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_users_joined_chat_id
-                ON users (joined_chat_id)
-            """
+        VALUES (
+            $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $11
         )
+        ON CONFLICT (telegram_id) DO UPDATE
+        SET
+            first_name = EXCLUDED.first_name,
+            last_name = EXCLUDED.last_name,
+            username = EXCLUDED.username,
+            phone_number = EXCLUDED.phone_number,
+            language_code = EXCLUDED.language_code,
+            is_premium = EXCLUDED.is_premium,
+            is_bot = EXCLUDED.is_bot,
+            joined_chat_id = EXCLUDED.joined_chat_id,
+            user_chat_id = EXCLUDED.user_chat_id,
+            updated_at = EXCLUDED.updated_at
+        WHERE users.updated_at <= EXCLUDED.updated_at
+    )
+    INSERT INTO user_joins (telegram_id, chat_id, first_joined_at, last_joined_at)
+    VALUES ($1, $9, $11, $11)
+    ON CONFLICT (telegram_id, chat_id) DO UPDATE
+    SET
+        first_joined_at = LEAST(user_joins.first_joined_at, EXCLUDED.first_joined_at),
+        last_joined_at = GREATEST(user_joins.last_joined_at, EXCLUDED.last_joined_at),
+        join_count = user_joins.join_count + 1
+    WHERE EXCLUDED.last_joined_at > user_joins.last_joined_at
+        OR EXCLUDED.first_joined_at < user_joins.first_joined_at
+"""
 
 
 class UsersRepository:
@@ -60,58 +429,688 @@ class UsersRepository:
     def __init__(self, pool: asyncpg.Pool) -> None:
         self._pool = pool
 
-    async def record_join_request(self, join_request: ChatJoinRequest) -> None:
-        """Upsert user details whenever a join request is approved."""
+    async def record_join_request(self, join_request: ChatJoinRequest, *, bot_id: int) -> None:
+        """Upsert user details whenever a join request is approved by ``bot_id``."""
 
-        user = join_request.from_user
-        if user is None:  # pragma: no cover - defensive guard
+        record = UserRecord.from_join_request(join_request, bot_id=bot_id)
+        if record is not None:
+            await self.record(record)
+
+    async def record(self, record: UserRecord) -> None:
+        """Upsert a single user record."""
+
+        async with self._pool.acquire() as connection:
+            await connection.execute(_UPSERT_USER_SQL, *record.as_row())
+
+    async def record_many(self, records: Sequence[UserRecord]) -> None:
+        """Upsert a batch of user records in order within one transaction."""
+
+        if not records:
             return
+        async with self._pool.acquire() as connection, connection.transaction():
+            await connection.executemany(_UPSERT_USER_SQL, [record.as_row() for record in records])
+
+
+class ProcessedRequestsRepository:
+    """Shared record of join requests already taken by some bot instance."""
+
+    def __init__(self, pool: asyncpg.Pool) -> None:
+        self._pool = pool
+
+    async def claim(self, chat_id: int, user_id: int, ttl_seconds: float) -> bool:
+        """Mark a request as processed unless a fresh claim already exists."""
+
+        async with self._pool.acquire() as connection:
+            claimed = await connection.fetchval(
+                """
+                INSERT INTO processed_join_requests (chat_id, user_id, processed_at)
+                VALUES ($1, $2, $3)
+                ON CONFLICT (chat_id, user_id) DO UPDATE
+                SET processed_at = EXCLUDED.processed_at
+                WHERE processed_join_requests.processed_at
+                    < EXCLUDED.processed_at - make_interval(secs => $4)
+                RETURNING TRUE
+                """,
+                chat_id,
+                user_id,
+                datetime.now(UTC),
+                float(ttl_seconds),
+            )
+        return bool(claimed)
+
+    async def release(self, chat_id: int, user_id: int) -> None:
+        """Forget a claim so that the request can be processed again."""
+
+        async with self._pool.acquire() as connection:
+            await connection.execute(
+                "DELETE FROM processed_join_requests WHERE chat_id = $1 AND user_id = $2",
+                chat_id,
+                user_id,
+            )
+
+
+@dataclass(frozen=True, slots=True)
+class ManagedInvite:
+    """Invite link whose expiry and usage are enforced by the bot."""
+
+    invite_link: str
+    bot_id: int
+    chat_id: int
+    name: str | None
+    expire_at: datetime | None
+    expire_after: float | None
+    usage_limit: int | None
+    rotate: bool
+    usage_count: int = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return self.usage_limit is not None and self.usage_count >= self.usage_limit
+
+
+_INVITE_COLUMNS = (
+    "invite_link, bot_id, chat_id, name, expire_at, expire_after, usage_limit, rotate, usage_count"
+)
+
+
+def _invite_from_row(row: Mapping[str, Any]) -> ManagedInvite:
+    return ManagedInvite(
+        invite_link=row["invite_link"],
+        bot_id=row["bot_id"],
+        chat_id=row["chat_id"],
+        name=row["name"],
+        expire_at=row["expire_at"],
+        expire_after=row["expire_after"],
+        usage_limit=row["usage_limit"],
+        rotate=row["rotate"],
+        usage_count=row["usage_count"],
+    )
+
+
+class InviteLinksRepository:
+    """Invite links managed by :class:`~group_inviter.invites.InviteLinkScheduler`."""
+
+    def __init__(self, pool: asyncpg.Pool) -> None:
+        self._pool = pool
+
+    async def add(self, invite: ManagedInvite) -> None:
+        async with self._pool.acquire() as connection:
+            await connection.execute(
+                f"""
+                INSERT INTO invite_links ({_INVITE_COLUMNS})
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+                ON CONFLICT (invite_link) DO NOTHING
+                """,  # noqa: S608 - column list is a constant
+                *astuple(invite),
+            )
+
+    async def active(self) -> list[ManagedInvite]:
+        """Links not revoked yet that have an expiry or a usage limit."""
+
+        async with self._pool.acquire() as connection:
+            rows = await connection.fetch(
+                f"""
+                SELECT {_INVITE_COLUMNS} FROM invite_links
+                WHERE revoked_at IS NULL
+                    AND (expire_at IS NOT NULL OR usage_limit IS NOT NULL)
+                """  # noqa: S608 - column list is a constant
+            )
+        return [_invite_from_row(row) for row in rows]
+
+    async def record_usage(self, invite_link: str) -> ManagedInvite | None:
+        """Count one approval through ``invite_link``; ``None`` if it is not managed."""
+
+        async with self._pool.acquire() as connection:
+            row = await connection.fetchrow(
+                f"""
+                UPDATE invite_links SET usage_count = usage_count + 1
+                WHERE invite_link = $1 AND revoked_at IS NULL
+                RETURNING {_INVITE_COLUMNS}
+                """,  # noqa: S608 - column list is a constant
+                invite_link,
+            )
+        return None if row is None else _invite_from_row(row)
+
+    async def exists(self, invite_link: str) -> bool:
+        """Whether ``invite_link`` has a row, revoked or not."""
+
+        async with self._pool.acquire() as connection:
+            found = await connection.fetchval(
+                "SELECT 1 FROM invite_links WHERE invite_link = $1", invite_link
+            )
+        return found is not None
+
+    async def claim(self, invite_links: Sequence[str]) -> list[ManagedInvite]:
+        """Mark links as revoked; only links nobody claimed before are returned.
+
+        Sibling workers may schedule the same link, the row update decides
+        which of them calls ``revokeChatInviteLink``.
+        """
+
+        async with self._pool.acquire() as connection:
+            rows = await connection.fetch(
+                f"""
+                UPDATE invite_links SET revoked_at = $2
+                WHERE invite_link = ANY($1::text[]) AND revoked_at IS NULL
+                RETURNING {_INVITE_COLUMNS}
+                """,  # noqa: S608 - column list is a constant
+                list(invite_links),
+                datetime.now(UTC),
+            )
+        return [_invite_from_row(row) for row in rows]
+
+    async def unclaim(self, invite_links: Sequence[str]) -> None:
+        """Undo :meth:`claim` for links whose revocation failed."""
+
+        async with self._pool.acquire() as connection:
+            await connection.execute(
+                "UPDATE invite_links SET revoked_at = NULL WHERE invite_link = ANY($1::text[])",
+                list(invite_links),
+            )
+
+
+@dataclass(frozen=True, slots=True)
+class MediaFileRecord:
+    """``file_id`` a bot obtained by uploading a local asset."""
+
+    bot_id: int
+    name: str
+    content_hash: str
+    file_id: str
+
+
+class MediaFilesRepository:
+    """Uploaded ``file_id`` cache shared by every process of a deployment."""
+
+    def __init__(self, pool: asyncpg.Pool) -> None:
+        self._pool = pool
 
-        timestamp = datetime.now(UTC)
-        phone_number = getattr(user, "phone_number", None)
+    async def load(self) -> list[MediaFileRecord]:
+        async with self._pool.acquire() as connection:
+            rows = await connection.fetch(
+                "SELECT bot_id, name, content_hash, file_id FROM media_files"
+            )
+        return [MediaFileRecord(**dict(row)) for row in rows]
 
+    async def save(self, record: MediaFileRecord) -> None:
         async with self._pool.acquire() as connection:
             await connection.execute(
                 """
-                INSERT INTO users (
-                    telegram_id,
-                    first_name,
-                    last_name,
-                    username,
-                    phone_number,
-                    language_code,
-                    is_premium,
-                    is_bot,
-                    joined_chat_id,
-                    user_chat_id,
-                    joined_at,
-                    updated_at
+                INSERT INTO media_files (bot_id, name, content_hash, file_id, uploaded_at)
+                VALUES ($1, $2, $3, $4, $5)
+                ON CONFLICT (bot_id, name) DO UPDATE
+                SET content_hash = EXCLUDED.content_hash,
+                    file_id = EXCLUDED.file_id,
+                    uploaded_at = EXCLUDED.uploaded_at
+                """,
+                *astuple(record),
+                datetime.now(UTC),
+            )
+
+    async def forget(self, bot_id: int, name: str) -> None:
+        async with self._pool.acquire() as connection:
+            await connection.execute(
+                "DELETE FROM media_files WHERE bot_id = $1 AND name = $2", bot_id, name
+            )
+
+
+@dataclass(frozen=True, slots=True)
+class BroadcastRecord:
+    """A broadcast and the progress checkpointed so far."""
+
+    id: int
+    bot_id: int
+    source_chat_id: int
+    message_id: int
+    joined_chat_id: int | None
+    last_user_id: int
+    sent: int
+    blocked: int
+    failed: int
+
+
+@dataclass(frozen=True, slots=True)
+class Recipient:
+    telegram_id: int
+    chat_id: int
+
+
+_BROADCAST_COLUMNS = (
+    "id, bot_id, source_chat_id, message_id, joined_chat_id, last_user_id, sent, blocked, failed"
+)
+
+
+class BroadcastsRepository:
+    """Broadcast checkpoints and the recipients they page through.
+
+    Each running broadcast is leased to one owner (process); the lease is
+    renewed with every checkpoint and while a page is being sent, so a
+    broadcast whose owner died is picked up again by whichever process
+    claims it next.
+    """
+
+    def __init__(self, pool: asyncpg.Pool) -> None:
+        self._pool = pool
+
+    async def create(
+        self,
+        *,
+        bot_id: int,
+        source_chat_id: int,
+        message_id: int,
+        joined_chat_id: int | None,
+        owner: str,
+        lease_seconds: float,
+    ) -> BroadcastRecord:
+        async with self._pool.acquire() as connection:
+            row = await connection.fetchrow(
+                f"""
+                INSERT INTO broadcasts (
+                    bot_id, source_chat_id, message_id, joined_chat_id, owner, lease_until
                 )
-                VALUES (
-                    $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $11
+                VALUES ($1, $2, $3, $4, $5, now() + make_interval(secs => $6))
+                RETURNING {_BROADCAST_COLUMNS}
+                """,  # noqa: S608 - column list is a constant
+                bot_id,
+                source_chat_id,
+                message_id,
+                joined_chat_id,
+                owner,
+                float(lease_seconds),
+            )
+        return BroadcastRecord(**dict(row))
+
+    async def claim_orphaned(
+        self, bot_ids: Sequence[int], owner: str, lease_seconds: float
+    ) -> list[BroadcastRecord]:
+        """Take over running broadcasts of ``bot_ids`` whose lease expired."""
+
+        async with self._pool.acquire() as connection:
+            rows = await connection.fetch(
+                f"""
+                UPDATE broadcasts
+                SET owner = $2, lease_until = now() + make_interval(secs => $3)
+                WHERE status = 'running'
+                    AND bot_id = ANY($1::bigint[])
+                    AND (lease_until IS NULL OR lease_until < now())
+                RETURNING {_BROADCAST_COLUMNS}
+                """,  # noqa: S608 - column list is a constant
+                list(bot_ids),
+                owner,
+                float(lease_seconds),
+            )
+        return [BroadcastRecord(**dict(row)) for row in rows]
+
+    async def recipients(
+        self, bot_id: int, after_user_id: int, joined_chat_id: int | None, limit: int
+    ) -> list[Recipient]:
+        """Next page of users ``bot_id`` can reach, in ``telegram_id`` order (keyset pagination)."""
+
+        async with self._pool.acquire() as connection:
+            rows = await connection.fetch(
+                """
+                SELECT telegram_id, user_chat_id FROM users
+                WHERE telegram_id > $2
+                    AND user_chat_id IS NOT NULL
+                    AND ($3::bigint IS NULL OR joined_chat_id = $3)
+                    AND NOT EXISTS (
+                        SELECT 1 FROM user_blocks
+                        WHERE user_blocks.bot_id = $1
+                            AND user_blocks.telegram_id = users.telegram_id
+                    )
+                ORDER BY telegram_id
+                LIMIT $4
+                """,
+                bot_id,
+                after_user_id,
+                joined_chat_id,
+                limit,
+            )
+        return [Recipient(row["telegram_id"], row["user_chat_id"]) for row in rows]
+
+    async def checkpoint(
+        self,
+        record: BroadcastRecord,
+        *,
+        owner: str,
+        lease_seconds: float,
+        blocked_user_ids: Sequence[int] = (),
+    ) -> bool:
+        """Store progress and renew the lease; ``False`` once cancelled or taken over."""
+
+        async with self._pool.acquire() as connection, connection.transaction():
+            if blocked_user_ids:
+                await connection.execute(
+                    """
+                    INSERT INTO user_blocks (bot_id, telegram_id)
+                    SELECT $1, unnest($2::bigint[])
+                    ON CONFLICT (bot_id, telegram_id) DO UPDATE SET blocked_at = now()
+                    """,
+                    record.bot_id,
+                    list(blocked_user_ids),
+                )
+            updated = await connection.fetchval(
+                """
+                UPDATE broadcasts
+                SET last_user_id = $3, sent = $4, blocked = $5, failed = $6,
+                    lease_until = now() + make_interval(secs => $7)
+                WHERE id = $1 AND owner = $2 AND status = 'running'
+                RETURNING TRUE
+                """,
+                record.id,
+                owner,
+                record.last_user_id,
+                record.sent,
+                record.blocked,
+                record.failed,
+                float(lease_seconds),
+            )
+        return bool(updated)
+
+    async def renew(self, broadcast_id: int, owner: str, lease_seconds: float) -> bool:
+        """Extend the lease of ``owner``; ``False`` once cancelled or taken over."""
+
+        async with self._pool.acquire() as connection:
+            renewed = await connection.fetchval(
+                """
+                UPDATE broadcasts SET lease_until = now() + make_interval(secs => $3)
+                WHERE id = $1 AND owner = $2 AND status = 'running'
+                RETURNING TRUE
+                """,
+                broadcast_id,
+                owner,
+                float(lease_seconds),
+            )
+        return bool(renewed)
+
+    async def finish(self, broadcast_id: int, owner: str) -> None:
+        async with self._pool.acquire() as connection:
+            await connection.execute(
+                """
+                UPDATE broadcasts SET status = 'finished', finished_at = now(), owner = NULL
+                WHERE id = $1 AND owner = $2 AND status = 'running'
+                """,
+                broadcast_id,
+                owner,
+            )
+
+    async def release(self, owner: str) -> None:
+        """Expire the leases of ``owner`` so the next process resumes at once."""
+
+        async with self._pool.acquire() as connection:
+            await connection.execute(
+                "UPDATE broadcasts SET lease_until = NULL WHERE owner = $1 AND status = 'running'",
+                owner,
+            )
+
+    async def cancel(self, broadcast_id: int, bot_id: int) -> bool:
+        """Cancel a running broadcast, provided it was started through ``bot_id``."""
+
+        async with self._pool.acquire() as connection:
+            cancelled = await connection.fetchval(
+                """
+                UPDATE broadcasts SET status = 'cancelled', finished_at = now(), owner = NULL
+                WHERE id = $1 AND bot_id = $2 AND status = 'running'
+                RETURNING TRUE
+                """,
+                broadcast_id,
+                bot_id,
+            )
+        return bool(cancelled)
+
+
+@dataclass(frozen=True, slots=True)
+class UserMatch:
+    """A stored user found by ``/whois``."""
+
+    telegram_id: int
+    first_name: str | None
+    last_name: str | None
+    username: str | None
+    joined_chat_id: int | None
+    joined_at: datetime
+    updated_at: datetime
+    blocked_at: datetime | None
+
+
+@dataclass(frozen=True, slots=True)
+class JoinHistoryEntry:
+    """Approved joins of one user to one chat."""
+
+    telegram_id: int
+    chat_id: int
+    first_joined_at: datetime
+    last_joined_at: datetime
+    join_count: int
+
+
+_USER_MATCH_COLUMNS = (
+    "telegram_id, first_name, last_name, username, joined_chat_id, joined_at, updated_at,"
+    " (SELECT max(blocked_at) FROM user_blocks"
+    " WHERE user_blocks.telegram_id = users.telegram_id) AS blocked_at"
+)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class UserLookupRepository:
+    """Indexed lookups of stored users and their join history."""
+
+    def __init__(self, pool: asyncpg.Pool) -> None:
+        self._pool = pool
+
+    async def trigram_available(self) -> bool:
+        """Whether the trigram indexes (and so substring search) exist."""
+
+        async with self._pool.acquire() as connection:
+            return bool(
+                await connection.fetchval(
+                    "SELECT to_regclass('users_full_name_trgm_idx') IS NOT NULL"
                 )
-                ON CONFLICT (telegram_id) DO UPDATE
-                SET
-                    first_name = EXCLUDED.first_name,
-                    last_name = EXCLUDED.last_name,
-                    username = EXCLUDED.username,
-                    phone_number = EXCLUDED.phone_number,
-                    language_code = EXCLUDED.language_code,
-                    is_premium = EXCLUDED.is_premium,
-                    is_bot = EXCLUDED.is_bot,
-                    joined_chat_id = EXCLUDED.joined_chat_id,
-                    user_chat_id = EXCLUDED.user_chat_id,
-                    updated_at = EXCLUDED.updated_at
+            )
+
+    async def by_id(self, telegram_id: int) -> list[UserMatch]:
+        async with self._pool.acquire() as connection:
+            rows = await connection.fetch(
+                f"SELECT {_USER_MATCH_COLUMNS} FROM users WHERE telegram_id = $1",  # noqa: S608 - column list is a constant
+                telegram_id,
+            )
+        return [UserMatch(**dict(row)) for row in rows]
+
+    async def search(self, query: str, limit: int, *, substring: bool) -> list[UserMatch]:
+        """Users whose username or name contains (or starts with) lower-case ``query``.
+
+        Each predicate matches an index expression from
+        :data:`TRIGRAM_INDEX_STATEMENTS` or :data:`PREFIX_INDEX_STATEMENTS`.
+        Exact username matches come first, then the most recently seen users.
+        """
+
+        pattern = _escape_like(query) + "%"
+        if substring:
+            pattern = "%" + pattern
+            where = f"lower(username) LIKE $1 OR {USER_FULL_NAME_SQL} LIKE $1"
+        else:
+            where = (
+                f"lower(username) LIKE $1 OR {USER_FULL_NAME_SQL} LIKE $1"
+                " OR lower(last_name) LIKE $1"
+            )
+        async with self._pool.acquire() as connection:
+            rows = await connection.fetch(
+                f"""
+                SELECT {_USER_MATCH_COLUMNS} FROM users
+                WHERE {where}
+                ORDER BY lower(username) = $2 DESC NULLS LAST, updated_at DESC
+                LIMIT $3
+                """,  # noqa: S608 - built from constant fragments only
+                pattern,
+                query,
+                limit,
+            )
+        return [UserMatch(**dict(row)) for row in rows]
+
+    async def history(self, telegram_ids: Sequence[int]) -> list[JoinHistoryEntry]:
+        """Join history of ``telegram_ids``, most recent join first."""
+
+        if not telegram_ids:
+            return []
+        async with self._pool.acquire() as connection:
+            rows = await connection.fetch(
+                """
+                SELECT telegram_id, chat_id, first_joined_at, last_joined_at, join_count
+                FROM user_joins
+                WHERE telegram_id = ANY($1::bigint[])
+                ORDER BY last_joined_at DESC
                 """,
-                user.id,
-                user.first_name,
-                user.last_name,
-                user.username,
-                phone_number,
-                user.language_code,
-                bool(getattr(user, "is_premium", False)),
-                bool(getattr(user, "is_bot", False)),
-                join_request.chat.id,
-                join_request.user_chat_id,
-                timestamp,
+                list(telegram_ids),
+            )
+        return [JoinHistoryEntry(**dict(row)) for row in rows]
+
+
+@dataclass(frozen=True, slots=True)
+class PendingRequest:
+    """A join request held for manual review."""
+
+    bot_id: int
+    chat_id: int
+    user_id: int
+    first_name: str | None
+    last_name: str | None
+    username: str | None
+    language_code: str | None
+    is_premium: bool
+    user_chat_id: int | None
+    invite_link: str | None
+    requested_at: datetime
+
+    @classmethod
+    def from_join_request(cls, bot_id: int, join_request: ChatJoinRequest) -> PendingRequest:
+        user = join_request.from_user
+        invite = join_request.invite_link
+        return cls(
+            bot_id=bot_id,
+            chat_id=join_request.chat.id,
+            user_id=user.id,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            username=user.username,
+            language_code=user.language_code,
+            is_premium=bool(user.is_premium),
+            user_chat_id=join_request.user_chat_id,
+            invite_link=invite.invite_link if invite else None,
+            requested_at=join_request.date,
+        )
+
+    def to_user_record(self, joined_at: datetime) -> UserRecord:
+        return UserRecord(
+            telegram_id=self.user_id,
+            first_name=self.first_name,
+            last_name=self.last_name,
+            username=self.username,
+            phone_number=None,
+            language_code=self.language_code,
+            is_premium=self.is_premium,
+            is_bot=False,
+            joined_chat_id=self.chat_id,
+            user_chat_id=self.user_chat_id,
+            joined_at=joined_at,
+            bot_id=self.bot_id,
+        )
+
+
+_PENDING_COLUMNS = (
+    "bot_id, chat_id, user_id, first_name, last_name, username, language_code, is_premium,"
+    " user_chat_id, invite_link, requested_at"
+)
+_INSERT_PENDING_SQL = f"""
+    INSERT INTO pending_requests ({_PENDING_COLUMNS})
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
+    ON CONFLICT (bot_id, chat_id, user_id) DO UPDATE
+    SET
+        first_name = EXCLUDED.first_name,
+        last_name = EXCLUDED.last_name,
+        username = EXCLUDED.username,
+        user_chat_id = EXCLUDED.user_chat_id,
+        invite_link = EXCLUDED.invite_link
+"""  # noqa: S608 - column list is a constant
+
+
+class PendingRequestsRepository:
+    """Join requests waiting for an administrator's decision.
+
+    Requests are taken (deleted and returned) before Telegram is asked to
+    resolve them, so two admins or workers never act on the same request;
+    requests that failed for a transient reason are put back.
+    """
+
+    def __init__(self, pool: asyncpg.Pool) -> None:
+        self._pool = pool
+
+    async def add_many(self, requests: Sequence[PendingRequest]) -> None:
+        if not requests:
+            return
+        async with self._pool.acquire() as connection:
+            await connection.executemany(
+                _INSERT_PENDING_SQL, [astuple(request) for request in requests]
+            )
+
+    async def summary(self, bot_id: int) -> list[tuple[int, int]]:
+        """``(chat_id, pending count)`` of every chat with held requests."""
+
+        async with self._pool.acquire() as connection:
+            rows = await connection.fetch(
+                """
+                SELECT chat_id, count(*) AS pending FROM pending_requests
+                WHERE bot_id = $1
+                GROUP BY chat_id
+                ORDER BY chat_id
+                """,
+                bot_id,
+            )
+        return [(row["chat_id"], row["pending"]) for row in rows]
+
+    async def page(
+        self, bot_id: int, chat_id: int, offset: int, limit: int
+    ) -> list[PendingRequest]:
+        """Held requests of ``chat_id``, oldest first."""
+
+        async with self._pool.acquire() as connection:
+            rows = await connection.fetch(
+                f"""
+                SELECT {_PENDING_COLUMNS} FROM pending_requests
+                WHERE bot_id = $1 AND chat_id = $2
+                ORDER BY requested_at, user_id
+                OFFSET $3 LIMIT $4
+                """,  # noqa: S608 - column list is a constant
+                bot_id,
+                chat_id,
+                offset,
+                limit,
+            )
+        return [PendingRequest(**dict(row)) for row in rows]
+
+    async def take(
+        self, bot_id: int, chat_id: int, *, user_id: int | None = None, limit: int = 1
+    ) -> list[PendingRequest]:
+        """Remove and return up to ``limit`` requests of ``chat_id`` (or one user's)."""
+
+        async with self._pool.acquire() as connection:
+            rows = await connection.fetch(
+                f"""
+                DELETE FROM pending_requests
+                WHERE (bot_id, chat_id, user_id) IN (
+                    SELECT bot_id, chat_id, user_id FROM pending_requests
+                    WHERE bot_id = $1 AND chat_id = $2 AND ($3::bigint IS NULL OR user_id = $3)
+                    ORDER BY requested_at, user_id
+                    LIMIT $4
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING {_PENDING_COLUMNS}
+                """,  # noqa: S608 - column list is a constant
+                bot_id,
+                chat_id,
+                user_id,
+                limit,
             )
+        return [PendingRequest(**dict(row)) for row in rows]
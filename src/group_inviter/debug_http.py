@@ -0,0 +1,156 @@
+"""Token-protected debug endpoints mounted on the metrics server."""
+
+from __future__ import annotations
+
+import hmac
+from typing import Any, Callable, Iterable
+from urllib.parse import parse_qs
+
+from .configuration import MetricsConfig
+from .metrics import WsgiApp
+
+StartResponse = Callable[..., Any]
+
+
+def respond(
+    start_response: StartResponse,
+    status: str,
+    body: str,
+    *,
+    content_type: str = "text/plain; charset=utf-8",
+) -> Iterable[bytes]:
+    payload = body.encode("utf-8")
+    start_response(status, [("Content-Type", content_type), ("Content-Length", str(len(payload)))])
+    return [payload]
+
+
+def query_params(environ: dict[str, Any]) -> dict[str, str]:
+    """Return the last value of every query string parameter."""
+
+    parsed = parse_qs(environ.get("QUERY_STRING", ""))
+    return {key: values[-1] for key, values in parsed.items()}
+
+
+def _presented_token(environ: dict[str, Any]) -> str:
+    header = str(environ.get("HTTP_AUTHORIZATION", ""))
+    scheme, _, credentials = header.partition(" ")
+    if scheme.lower() == "bearer":
+        return credentials.strip()
+    return str(environ.get("HTTP_X_DEBUG_TOKEN", ""))
+
+
+def protected(app: WsgiApp, token: str) -> WsgiApp:
+    """Require ``Authorization: Bearer <token>`` (or ``X-Debug-Token``) for ``app``."""
+
+    expected = token.encode("utf-8")
+
+    def guarded(environ: dict[str, Any], start_response: StartResponse) -> Iterable[bytes]:
+        presented = _presented_token(environ).encode("utf-8")
+        if not hmac.compare_digest(presented, expected):
+            return respond(start_response, "401 Unauthorized", "Unauthorized\n")
+        return app(environ, start_response)
+
+    return guarded
+
+
+def _profile_app(config: MetricsConfig) -> WsgiApp:
+    from .profiling import StackSampler, render_collapsed
+
+    sampler = StackSampler(interval=config.profiler.sample_interval)
+    max_seconds = config.profiler.max_seconds
+
+    def app(environ: dict[str, Any], start_response: StartResponse) -> Iterable[bytes]:
+        try:
+            seconds = float(query_params(environ).get("seconds", "10"))
+        except ValueError:
+            return respond(start_response, "400 Bad Request", "seconds must be a number\n")
+        if not 0 < seconds <= max_seconds:
+            return respond(
+                start_response, "400 Bad Request", f"seconds must be in (0, {max_seconds}]\n"
+            )
+        stacks = sampler.sample(seconds)
+        if stacks is None:
+            return respond(start_response, "409 Conflict", "A profile is already running\n")
+        return respond(start_response, "200 OK", render_collapsed(stacks))
+
+    return app
+
+
+def _memory_routes(config: MetricsConfig) -> dict[str, WsgiApp]:
+    from .memory import SnapshotNotFoundError, TracemallocController
+
+    controller = TracemallocController(
+        max_snapshots=config.memory.max_snapshots,
+        frames=config.memory.traceback_frames,
+    )
+
+    def _limit(params: dict[str, str]) -> int:
+        return max(1, min(int(params.get("limit", "25")), 500))
+
+    def start(environ: dict[str, Any], start_response: StartResponse) -> Iterable[bytes]:
+        frames = query_params(environ).get("frames")
+        try:
+            message = controller.start(int(frames) if frames else None)
+        except ValueError:
+            return respond(start_response, "400 Bad Request", "frames must be an integer\n")
+        return respond(start_response, "200 OK", message)
+
+    def stop(environ: dict[str, Any], start_response: StartResponse) -> Iterable[bytes]:
+        return respond(start_response, "200 OK", controller.stop())
+
+    def snapshot(environ: dict[str, Any], start_response: StartResponse) -> Iterable[bytes]:
+        name = query_params(environ).get("name") or f"s{len(controller.names()) + 1}"
+        try:
+            message = controller.snapshot(name)
+        except RuntimeError as exc:
+            return respond(start_response, "409 Conflict", f"{exc}\n")
+        return respond(start_response, "200 OK", message)
+
+    def top(environ: dict[str, Any], start_response: StartResponse) -> Iterable[bytes]:
+        params = query_params(environ)
+        names = controller.names()
+        name = params.get("name") or (names[-1] if names else "")
+        try:
+            body = controller.top(
+                name, limit=_limit(params), group_by=params.get("group_by", "lineno")
+            )
+        except SnapshotNotFoundError:
+            return respond(start_response, "404 Not Found", f"unknown snapshot '{name}'\n")
+        except ValueError as exc:
+            return respond(start_response, "400 Bad Request", f"{exc}\n")
+        return respond(start_response, "200 OK", body)
+
+    def diff(environ: dict[str, Any], start_response: StartResponse) -> Iterable[bytes]:
+        params = query_params(environ)
+        names = controller.names()
+        base = params.get("base") or (names[-2] if len(names) > 1 else "")
+        name = params.get("name") or (names[-1] if names else "")
+        try:
+            body = controller.diff(
+                base, name, limit=_limit(params), group_by=params.get("group_by", "lineno")
+            )
+        except SnapshotNotFoundError as exc:
+            return respond(start_response, "404 Not Found", f"unknown snapshot {exc}\n")
+        except ValueError as exc:
+            return respond(start_response, "400 Bad Request", f"{exc}\n")
+        return respond(start_response, "200 OK", body)
+
+    return {
+        "/debug/memory/start": start,
+        "/debug/memory/stop": stop,
+        "/debug/memory/snapshot": snapshot,
+        "/debug/memory/top": top,
+        "/debug/memory/diff": diff,
+    }
+
+
+def build_debug_routes(config: MetricsConfig) -> dict[str, WsgiApp]:
+    """Create the enabled debug endpoints, each behind the debug token."""
+
+    routes: dict[str, WsgiApp] = {}
+    if config.profiler.enabled:
+        routes["/debug/profile"] = _profile_app(config)
+    if config.memory.enabled:
+        routes.update(_memory_routes(config))
+    token = config.debug_token or ""
+    return {path: protected(app, token) for path, app in routes.items()}
@@ -0,0 +1,84 @@
+"""Suppression of duplicate join requests."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from .cache import TTLCache
+from .configuration import DedupConfig
+from .database import ProcessedRequestsRepository
+from .resilience import CircuitBreaker
+
+LOGGER = logging.getLogger(__name__)
+
+
+class JoinRequestDeduplicator:
+    """Remember recently processed (chat_id, user_id) pairs.
+
+    The in-memory cache answers repeats within a single process. When a
+    repository is attached, claims are also recorded in Postgres so that
+    restarts and sibling instances see the same history. Database lookups
+    share the repository circuit breaker and fall back to memory-only
+    decisions while it is open.
+    """
+
+    def __init__(
+        self,
+        config: DedupConfig,
+        repository: ProcessedRequestsRepository | None = None,
+        *,
+        breaker: CircuitBreaker | None = None,
+        call_timeout: float | None = None,
+    ) -> None:
+        self._ttl = config.ttl_seconds
+        self._recent: TTLCache[tuple[int, int], bool] = TTLCache(
+            maxsize=config.max_entries,
+            ttl=config.ttl_seconds,
+        )
+        self._repository = repository
+        self._breaker = breaker
+        self._call_timeout = call_timeout
+
+    async def claim(self, chat_id: int, user_id: int) -> bool:
+        """Return ``True`` if the caller should process this request."""
+
+        key = (chat_id, user_id)
+        if not self._recent.add(key, True):
+            return False
+        if self._repository is None:
+            return True
+        if self._breaker and not self._breaker.allow_request():
+            return True
+        try:
+            claimed = await asyncio.wait_for(
+                self._repository.claim(chat_id, user_id, self._ttl),
+                timeout=self._call_timeout,
+            )
+        except Exception as exc:  # pragma: no cover - database errors
+            if self._breaker:
+                self._breaker.record_failure()
+            LOGGER.warning("Failed to persist join request claim for %s: %s", key, exc)
+            return True
+        except BaseException:
+            if self._breaker:
+                self._breaker.release()
+            raise
+        if self._breaker:
+            self._breaker.record_success()
+        return claimed
+
+    async def release(self, chat_id: int, user_id: int) -> None:
+        """Allow a request to be retried after processing failed."""
+
+        self._recent.pop((chat_id, user_id))
+        if self._repository is None:
+            return
+        try:
+            await asyncio.wait_for(
+                self._repository.release(chat_id, user_id), timeout=self._call_timeout
+            )
+        except Exception as exc:  # pragma: no cover - database errors
+            LOGGER.warning(
+                "Failed to release join request claim for %s: %s", (chat_id, user_id), exc
+            )
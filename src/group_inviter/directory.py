@@ -0,0 +1,93 @@
+"""Admin lookup of stored users and their join history."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from .cache import TTLCache
+from .configuration import WhoisConfig
+from .database import JoinHistoryEntry, UserLookupRepository, UserMatch
+from .metrics import record_whois_lookup
+
+# How long a missing trigram index is trusted before asking Postgres again.
+_TRIGRAM_RECHECK_SECONDS = 300.0
+
+
+@dataclass(frozen=True, slots=True)
+class WhoisResult:
+    user: UserMatch
+    joins: tuple[JoinHistoryEntry, ...]
+
+
+class UserDirectory:
+    """Answer ``/whois`` queries from the users table.
+
+    A numeric query is a Telegram id; anything else is matched against
+    usernames and names through the trigram indexes, or the prefix
+    indexes where ``pg_trgm`` is not installed. Results are kept in a
+    small LRU for ``cache_ttl`` seconds, so repeating a lookup while
+    handling a ticket does not touch the database.
+    """
+
+    def __init__(
+        self,
+        repository: UserLookupRepository,
+        config: WhoisConfig,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._repository = repository
+        self._config = config
+        self._clock = clock
+        self._cache: TTLCache[str, tuple[WhoisResult, ...]] = TTLCache(
+            maxsize=config.cache_size, ttl=config.cache_ttl
+        )
+        self._substring = False
+        self._trigram_checked_at: float | None = None
+
+    def _trigram_recheck_due(self) -> bool:
+        """Whether to look for the trigram indexes, which are built after startup."""
+
+        if self._substring:
+            return False
+        checked_at = self._trigram_checked_at
+        return checked_at is None or self._clock() - checked_at >= _TRIGRAM_RECHECK_SECONDS
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return query.strip().removeprefix("@").lower()
+
+    async def lookup(self, query: str) -> tuple[WhoisResult, ...]:
+        """Users matching ``query`` with their joins; ``ValueError`` if it is too short."""
+
+        started_at = time.perf_counter()
+        normalized = self.normalize(query)
+        if not normalized.isdigit() and len(normalized) < self._config.min_query_length:
+            msg = f"query must have at least {self._config.min_query_length} characters"
+            raise ValueError(msg)
+        cached = self._cache.get(normalized)
+        if cached is not None:
+            record_whois_lookup("cache", time.perf_counter() - started_at)
+            return cached
+
+        if normalized.isdigit():
+            users = await self._repository.by_id(int(normalized))
+        else:
+            if self._trigram_recheck_due():
+                self._substring = await self._repository.trigram_available()
+                self._trigram_checked_at = self._clock()
+            users = await self._repository.search(
+                normalized, self._config.limit, substring=self._substring
+            )
+        history = await self._repository.history([user.telegram_id for user in users])
+        results = tuple(
+            WhoisResult(
+                user, tuple(entry for entry in history if entry.telegram_id == user.telegram_id)
+            )
+            for user in users
+        )
+        self._cache.set(normalized, results)
+        record_whois_lookup("database", time.perf_counter() - started_at)
+        return results
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from aiogram import Dispatcher
 
-from . import errors, invite, lifecycle, start
+from . import broadcast, errors, invite, lifecycle, review, start, whois
 
 __all__ = ["register"]
 
@@ -14,5 +14,8 @@ def register(dp: Dispatcher) -> None:
 
     dp.include_router(errors.router)
     dp.include_router(invite.router)
+    dp.include_router(broadcast.router)
+    dp.include_router(whois.router)
+    dp.include_router(review.router)
     dp.include_router(lifecycle.router)
     dp.include_router(start.router)
@@ -6,8 +6,9 @@ import logging
 from typing import Any, Mapping
 
 from aiogram import Bot
+from aiogram.types import CallbackQuery, Message
 
-from ..configuration import AppConfig
+from ..configuration import AppConfig, BotProfileConfig
 
 
 def extract_config(source: Mapping[str, Any] | None) -> AppConfig | None:
@@ -19,6 +20,20 @@ def extract_config(source: Mapping[str, Any] | None) -> AppConfig | None:
     return config if isinstance(config, AppConfig) else None
 
 
+def resolve_profile(config: AppConfig, bot: Bot) -> BotProfileConfig:
+    """Return the profile of ``bot``, falling back to the first configured one."""
+
+    profile = config.telegram.profile_for(getattr(bot, "token", ""))
+    return profile or config.telegram.profiles()[0]
+
+
+def is_admin(event: Message | CallbackQuery, profile: BotProfileConfig) -> bool:
+    """Whether ``event`` comes from the administrator of ``profile``."""
+
+    admin_id = profile.admin_chat_id
+    return bool(admin_id and event.from_user and event.from_user.id == admin_id)
+
+
 async def notify_admin(
     bot: Bot,
     config: AppConfig,
@@ -27,9 +42,9 @@ async def notify_admin(
     logger: logging.Logger,
     context: str,
 ) -> None:
-    """Send a best-effort notification to the configured administrator."""
+    """Send a best-effort notification to the administrator of ``bot``."""
 
-    admin_chat_id = config.telegram.admin_chat_id
+    admin_chat_id = resolve_profile(config, bot).admin_chat_id
     if not admin_chat_id:
         return
     try:
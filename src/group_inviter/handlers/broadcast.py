@@ -0,0 +1,95 @@
+"""Handlers for admin broadcasts to stored users."""
+
+from __future__ import annotations
+
+import logging
+
+from aiogram import Bot, Router
+from aiogram.enums import ChatType
+from aiogram.filters import Command
+from aiogram.filters.command import CommandObject
+from aiogram.types import Message
+
+from ..broadcast import Broadcaster
+from ..configuration import AppConfig
+from ._helpers import is_admin, resolve_profile
+
+LOGGER = logging.getLogger(__name__)
+router = Router()
+
+
+@router.message(Command("broadcast"))
+async def handle_broadcast(
+    message: Message,
+    bot: Bot,
+    config: AppConfig,
+    command: CommandObject,
+    broadcaster: Broadcaster | None = None,
+) -> None:
+    """Copy the replied-to message to every stored user (optionally of one chat)."""
+
+    if not is_admin(message, resolve_profile(config, bot)):
+        await message.answer("Эта команда доступна только администратору.")
+        return
+
+    if message.chat.type != ChatType.PRIVATE:
+        await message.answer("Рассылку можно запустить только из приватного чата с ботом.")
+        return
+
+    if broadcaster is None:
+        await message.answer("Рассылка недоступна: нет подключения к базе данных.")
+        return
+
+    source = message.reply_to_message
+    if source is None:
+        await message.answer(
+            "Ответьте командой /broadcast [chat_id] на сообщение, которое нужно разослать."
+        )
+        return
+
+    joined_chat_id: int | None = None
+    if command.args:
+        try:
+            joined_chat_id = int(command.args.strip())
+        except ValueError:
+            await message.answer("Некорректный ID чата. Используйте числовой идентификатор.")
+            return
+
+    try:
+        record = await broadcaster.start(bot, message.chat.id, source.message_id, joined_chat_id)
+    except Exception as exc:  # pragma: no cover - database errors
+        LOGGER.warning("Failed to start broadcast: %s", exc)
+        await message.answer("Не удалось запустить рассылку. Попробуйте позже.")
+        return
+
+    await message.answer(f"Рассылка #{record.id} запущена. Отменить: /broadcast_cancel {record.id}")
+
+
+@router.message(Command("broadcast_cancel"))
+async def handle_broadcast_cancel(
+    message: Message,
+    bot: Bot,
+    config: AppConfig,
+    command: CommandObject,
+    broadcaster: Broadcaster | None = None,
+) -> None:
+    """Stop a running broadcast by its number."""
+
+    if not is_admin(message, resolve_profile(config, bot)):
+        await message.answer("Эта команда доступна только администратору.")
+        return
+
+    if broadcaster is None:
+        await message.answer("Рассылка недоступна: нет подключения к базе данных.")
+        return
+
+    try:
+        broadcast_id = int((command.args or "").strip())
+    except ValueError:
+        await message.answer("Укажите номер рассылки: /broadcast_cancel &lt;id&gt;.")
+        return
+
+    if await broadcaster.cancel(bot, broadcast_id):
+        await message.answer(f"Рассылка #{broadcast_id} остановлена.")
+    else:
+        await message.answer(f"Рассылка #{broadcast_id} не найдена или уже завершена.")
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from datetime import datetime
 
@@ -12,40 +13,69 @@ from aiogram.filters.command import CommandObject
 from aiogram.types import ChatInviteLink, ChatJoinRequest, Message
 from aiogram.utils.text_decorations import html_decoration as html
 
-from ..configuration import AppConfig
-from ..database import UsersRepository
-from ..metrics import record_join_request_approval
-from ._helpers import notify_admin
+from ..configuration import AppConfig, BotProfileConfig
+from ..database import JoinRequestStore
+from ..dedup import JoinRequestDeduplicator
+from ..invites import InviteLinkScheduler, InviteOptions
+from ..media import MediaRegistry
+from ..metrics import record_duplicate, record_join_request_approval
+from ..permissions import ChatAdminCache, ChatRights
+from ..review import ReviewQueue
+from ..timeline import mark_stage
+from ._helpers import is_admin, notify_admin, resolve_profile
 from .texts import AQUA_STUDIO_PHOTO, AQUA_STUDIO_PROMO
 
 LOGGER = logging.getLogger(__name__)
 router = Router()
 
 
-def _is_admin(message: Message, config: AppConfig) -> bool:
-    admin_id = config.telegram.admin_chat_id
-    return bool(admin_id and message.from_user and message.from_user.id == admin_id)
+_GENERATE_INVITE_USAGE = (
+    "/generate_invite &lt;chat_id&gt; [expire=12h] [limit=50] [rotate|norotate]"
+)
 
 
-def _format_invite_message(invite: ChatInviteLink) -> str:
+def _format_invite_message(invite: ChatInviteLink, options: InviteOptions | None = None) -> str:
     name = invite.name or datetime.now().isoformat(timespec="seconds")
-    return (
-        "Создана новая пригласительная ссылка:\n"
-        f"{html.quote(invite.invite_link)}\n"
-        f"Название: {html.quote(name)}"
-    )
+    lines = [
+        "Создана новая пригласительная ссылка:",
+        html.quote(invite.invite_link),
+        f"Название: {html.quote(name)}",
+    ]
+    if invite.expire_date:
+        lines.append(f"Действует до: {invite.expire_date.isoformat(timespec='minutes')}")
+    if options and options.usage_limit:
+        lines.append(f"Лимит одобрений: {options.usage_limit}")
+    if options and options.rotate:
+        lines.append("После истечения ссылка будет заменена автоматически.")
+    return "\n".join(lines)
 
 
 def _is_bot_generated_invite(invite: ChatInviteLink | None) -> bool:
     return bool(invite and invite.creator and invite.creator.is_bot)
 
 
-async def _notify_user_of_approval(bot: Bot, join_request: ChatJoinRequest) -> None:
-    """Best-effort delivery of the welcome message to the user."""
+async def _notify_user_of_approval(
+    bot: Bot,
+    join_request: ChatJoinRequest,
+    profile: BotProfileConfig | None = None,
+    media: MediaRegistry | None = None,
+) -> None:
+    """Best-effort delivery of the welcome message to the user.
+
+    ``texts.welcome_photo`` may name an asset of the media registry, which
+    is then sent by its cached file_id; any other value goes to Telegram as is.
+    """
 
+    texts = profile.texts if profile else None
+    photo = (texts and texts.welcome_photo) or AQUA_STUDIO_PHOTO
+    caption = (texts and texts.welcome_caption) or AQUA_STUDIO_PROMO
     try:
-        await bot.send_photo(join_request.user_chat_id, photo=AQUA_STUDIO_PHOTO,
-                             caption=AQUA_STUDIO_PROMO, parse_mode="HTML")
+        if media is not None and photo in media:
+            await media.send_photo(bot, join_request.user_chat_id, photo,
+                                   caption=caption, parse_mode="HTML")
+        else:
+            await bot.send_photo(join_request.user_chat_id, photo=photo,
+                                 caption=caption, parse_mode="HTML")
         return
     except Exception as exc:  # pragma: no cover - depends on user privacy settings
         LOGGER.debug(
@@ -62,10 +92,21 @@ async def handle_generate_invite(
     bot: Bot,
     config: AppConfig,
     command: CommandObject,
+    invite_scheduler: InviteLinkScheduler | None = None,
+    chat_admins: ChatAdminCache | None = None,
 ) -> None:
-    """Allow administrator to generate invite links that require approval."""
+    """Allow administrators to generate invite links that require approval.
+
+    Besides the configured administrator, admins of the target chat with
+    the "invite users" right may use the command, provided the bot already
+    knows it manages that chat. Both that check and the bot's own rights
+    come from ``chat_admins`` instead of a Bot API call.
+    Optional ``expire=``, ``limit=`` and ``rotate`` arguments (defaults in
+    ``invites``) hand the link over to the lifecycle scheduler.
+    """
 
-    if not _is_admin(message, config):
+    configured_admin = is_admin(message, resolve_profile(config, bot))
+    if not configured_admin and chat_admins is None:
         await message.answer("Эта команда доступна только администратору.")
         return
 
@@ -74,27 +115,74 @@ async def handle_generate_invite(
         return
 
     if not command.args:
-        await message.answer(f"Укажите ID чата: /generate_invite {html.quote('<chat_id>')}.")
+        await message.answer(f"Укажите ID чата: {_GENERATE_INVITE_USAGE}.")
         return
 
+    chat_arg, *option_args = command.args.split()
     try:
-        target_chat_id = int(command.args.strip())
+        target_chat_id = int(chat_arg)
     except ValueError:
         await message.answer("Некорректный ID чата. Используйте числовой идентификатор.")
         return
 
+    # Anyone can message the bot; only known chats are worth a getChatAdministrators call.
+    if not configured_admin and not (
+        chat_admins is not None and chat_admins.is_managed(bot.id, target_chat_id)
+    ):
+        await message.answer(
+            "Эта команда доступна только администраторам чата с правом приглашать участников."
+        )
+        return
+
+    rights: ChatRights | None = None
+    if chat_admins is not None:
+        try:
+            rights = await chat_admins.rights(bot, target_chat_id)
+        except Exception as exc:  # pragma: no cover - network errors
+            LOGGER.warning("Failed to look up administrators of %s: %s", target_chat_id, exc)
+    user_id = message.from_user.id if message.from_user else None
+    if not configured_admin and not (
+        rights is not None and user_id is not None and rights.can_manage_invites(user_id)
+    ):
+        await message.answer(
+            "Эта команда доступна только администраторам чата с правом приглашать участников."
+        )
+        return
+    if rights is not None and not rights.bot_can_invite:
+        await message.answer(
+            "Бот не может создавать ссылки в этом чате: выдайте ему права администратора "
+            "с разрешением приглашать участников."
+        )
+        return
+
     try:
-        invite = await bot.create_chat_invite_link(
-            chat_id=target_chat_id,
-            creates_join_request=True,
-            name=f"Bot invite {datetime.now().isoformat(timespec='seconds')}",
+        options = InviteOptions.parse(option_args, config.invites)
+    except ValueError as exc:
+        await message.answer(
+            f"Некорректные параметры ({html.quote(str(exc))}). Формат: {_GENERATE_INVITE_USAGE}."
         )
+        return
+
+    name = f"Bot invite {datetime.now().isoformat(timespec='seconds')}"
+    try:
+        if invite_scheduler is not None:
+            invite = await invite_scheduler.create(bot, target_chat_id, options, name=name)
+        else:
+            invite = await bot.create_chat_invite_link(
+                chat_id=target_chat_id,
+                creates_join_request=True,
+                name=name,
+            )
     except Exception as exc:  # pragma: no cover - network errors
         LOGGER.warning("Failed to create invite link: %s", exc)
+        if chat_admins is not None:
+            chat_admins.invalidate(bot.id, target_chat_id)
         await message.answer("Не удалось создать ссылку. Убедитесь, что бот имеет права администратора.")
         return
 
-    await message.answer(_format_invite_message(invite), parse_mode="HTML")
+    await message.answer(
+        _format_invite_message(invite, options if invite_scheduler else None), parse_mode="HTML"
+    )
 
 
 @router.chat_join_request()
@@ -102,12 +190,39 @@ async def handle_join_request(
     join_request: ChatJoinRequest,
     bot: Bot,
     config: AppConfig,
-    user_repository: UsersRepository,
+    user_repository: JoinRequestStore,
+    join_request_dedup: JoinRequestDeduplicator | None = None,
+    invite_scheduler: InviteLinkScheduler | None = None,
+    media_registry: MediaRegistry | None = None,
+    review_queue: ReviewQueue | None = None,
+    chat_admins: ChatAdminCache | None = None,
 ) -> None:
-    """Automatically approve join requests for links created by the bot."""
+    """Automatically approve join requests for links created by the bot.
+
+    Requests that came through other links are held in the review queue
+    (``/pending``) when it is enabled.
+    """
+
+    if chat_admins is not None:
+        # Join requests only reach bots that administer the chat.
+        chat_admins.mark_managed(bot.id, join_request.chat.id)
 
     invite = join_request.invite_link
     if not _is_bot_generated_invite(invite):
+        if review_queue is not None and config.review.enabled:
+            try:
+                await review_queue.hold(bot, join_request)
+            except Exception as exc:  # pragma: no cover - database errors
+                LOGGER.warning(
+                    "Failed to hold join request from %s: %s", join_request.from_user.id, exc
+                )
+            else:
+                LOGGER.info(
+                    "Held join request from %s for chat %s for review",
+                    join_request.from_user.id,
+                    join_request.chat.id,
+                )
+                return
         LOGGER.debug(
             "Ignoring join request from %s (%s) for chat %s via external link",
             join_request.from_user.id,
@@ -116,28 +231,52 @@ async def handle_join_request(
         )
         return
 
-    await _notify_user_of_approval(bot, join_request)
+    chat_id = join_request.chat.id
+    user_id = join_request.from_user.id
+    profile = resolve_profile(config, bot)
+    if join_request_dedup and not await join_request_dedup.claim(chat_id, user_id):
+        LOGGER.info("Skipping repeated join request from %s for chat %s", user_id, chat_id)
+        record_duplicate("join_request", bot=profile.label)
+        return
 
     try:
-        await bot.approve_chat_join_request(join_request.chat.id, join_request.from_user.id)
+        await _notify_user_of_approval(bot, join_request, profile, media_registry)
+        mark_stage("dm_sent")
+        await bot.approve_chat_join_request(chat_id, user_id)
     except Exception as exc:  # pragma: no cover - network errors
         LOGGER.warning(
             "Failed to approve join request from %s: %s",
-            join_request.from_user.id,
+            user_id,
             exc,
         )
+        if join_request_dedup:
+            await join_request_dedup.release(chat_id, user_id)
         return
+    except asyncio.CancelledError:
+        # Cancelled by the shutdown drain; the update is redelivered on the next start.
+        if join_request_dedup:
+            await join_request_dedup.release(chat_id, user_id)
+        raise
+    mark_stage("approved")
 
     try:
-        await user_repository.record_join_request(join_request)
+        await user_repository.record_join_request(join_request, bot_id=bot.id)
     except Exception as exc:  # pragma: no cover - database errors
         LOGGER.warning(
             "Failed to persist join request for %s: %s",
             join_request.from_user.id,
             exc,
         )
+    else:
+        mark_stage("persisted")
+
+    if invite_scheduler is not None and invite is not None:
+        try:
+            await invite_scheduler.record_usage(invite.invite_link)
+        except Exception as exc:  # pragma: no cover - database errors
+            LOGGER.warning("Failed to count usage of %s: %s", invite.invite_link, exc)
 
-    record_join_request_approval(join_request.from_user.id)
+    record_join_request_approval(join_request.from_user.id, bot=profile.label)
 
     LOGGER.info(
         "Approved join request from %s (%s) for chat %s",
@@ -4,11 +4,15 @@ from __future__ import annotations
 
 import logging
 from datetime import UTC, datetime
-from typing import Any
+from typing import Any, Sequence
 
 from aiogram import Router
 from aiogram.client.bot import Bot
+from aiogram.enums import ChatMemberStatus
+from aiogram.types import ChatMemberUpdated
 
+from ..configuration import AppConfig
+from ..permissions import ChatAdminCache
 from ._helpers import extract_config, notify_admin
 
 LOGGER = logging.getLogger(__name__)
@@ -21,6 +25,16 @@ def _timestamp_label() -> str:
     return datetime.now(UTC).isoformat()
 
 
+async def _notify_all(
+    bot: Bot, data: dict[str, Any], config: AppConfig, message: str, context: str
+) -> None:
+    """Notify the administrator of every bot served by the dispatcher."""
+
+    bots: Sequence[Bot] = data.get("bots") or (bot,)
+    for current in bots:
+        await notify_admin(current, config, message, logger=LOGGER, context=context)
+
+
 @router.startup()
 async def notify_startup(bot: Bot, **data: Any) -> None:
     """Send a notification to the administrator when the bot starts."""
@@ -30,7 +44,7 @@ async def notify_startup(bot: Bot, **data: Any) -> None:
         return
 
     message = f"Bot started successfully at {_timestamp_label()}."
-    await notify_admin(bot, config, message, logger=LOGGER, context="startup")
+    await _notify_all(bot, data, config, message, "startup")
 
 
 @router.shutdown()
@@ -42,4 +56,26 @@ async def notify_shutdown(bot: Bot, **data: Any) -> None:
         return
 
     message = f"Bot stopped at {_timestamp_label()}."
-    await notify_admin(bot, config, message, logger=LOGGER, context="shutdown")
+    await _notify_all(bot, data, config, message, "shutdown")
+
+
+@router.my_chat_member()
+async def handle_my_chat_member(
+    update: ChatMemberUpdated, bot: Bot, chat_admins: ChatAdminCache | None = None
+) -> None:
+    """Forget cached rights of a chat and whether the bot manages it on a status change."""
+
+    LOGGER.info(
+        "Bot %s status in chat %s changed: %s -> %s",
+        bot.id,
+        update.chat.id,
+        update.old_chat_member.status,
+        update.new_chat_member.status,
+    )
+    if chat_admins is not None:
+        chat_admins.invalidate(bot.id, update.chat.id)
+        chat_admins.mark_managed(
+            bot.id,
+            update.chat.id,
+            managed=update.new_chat_member.status == ChatMemberStatus.ADMINISTRATOR,
+        )
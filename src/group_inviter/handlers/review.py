@@ -0,0 +1,268 @@
+"""Handlers for the review queue of held join requests."""
+
+from __future__ import annotations
+
+import logging
+from typing import Literal
+
+from aiogram import Bot, F, Router
+from aiogram.enums import ChatType
+from aiogram.filters import Command
+from aiogram.filters.callback_data import CallbackData
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup, Message
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+from aiogram.utils.text_decorations import html_decoration as html
+
+from ..configuration import AppConfig
+from ..database import PendingRequest
+from ..review import BulkProgress, ReviewQueue
+from ._helpers import is_admin, resolve_profile
+
+LOGGER = logging.getLogger(__name__)
+router = Router()
+
+_OUTCOME_TEXT = {
+    "approved": "Заявка одобрена.",
+    "declined": "Заявка отклонена.",
+    "gone": "Заявка уже обработана в Telegram.",
+    "failed": "Не удалось обработать заявку, она осталась в очереди.",
+}
+
+
+class PendingCallback(CallbackData, prefix="pending"):
+    """Inline keyboard actions of the ``/pending`` screens."""
+
+    action: Literal["chats", "chat", "one", "ask_all", "all"]
+    chat_id: int = 0
+    user_id: int = 0
+    page: int = 0
+    approve: bool = True
+
+
+def _requester(request: PendingRequest) -> str:
+    name = " ".join(part for part in (request.first_name, request.last_name) if part)
+    return name or (f"@{request.username}" if request.username else str(request.user_id))
+
+
+async def _render_chats(queue: ReviewQueue, bot: Bot) -> tuple[str, InlineKeyboardMarkup | None]:
+    chats = await queue.summary(bot.id)
+    if not chats:
+        return "Заявок на рассмотрении нет.", None
+    builder = InlineKeyboardBuilder()
+    for chat_id, pending in chats:
+        builder.button(
+            text=f"Чат {chat_id}: {pending}",
+            callback_data=PendingCallback(action="chat", chat_id=chat_id),
+        )
+    builder.adjust(1)
+    total = sum(pending for _, pending in chats)
+    return f"Заявок на рассмотрении: {total}. Выберите чат:", builder.as_markup()
+
+
+async def _render_chat(
+    queue: ReviewQueue, bot: Bot, chat_id: int, page: int, page_size: int
+) -> tuple[str, InlineKeyboardMarkup]:
+    pending = dict(await queue.summary(bot.id)).get(chat_id, 0)
+    pages = max(1, -(-pending // page_size))
+    page = min(max(page, 0), pages - 1)
+    requests = await queue.page(bot.id, chat_id, page, page_size)
+    builder = InlineKeyboardBuilder()
+    lines = [f"Чат <code>{chat_id}</code>: заявок {pending}, страница {page + 1}/{pages}"]
+    for number, request in enumerate(requests, start=page * page_size + 1):
+        username = f" @{html.quote(request.username)}" if request.username else ""
+        lines.append(
+            f"{number}. {html.quote(_requester(request))}{username}"
+            f" — {request.requested_at.isoformat(sep=' ', timespec='minutes')}"
+        )
+        for approve, mark in ((True, "✅"), (False, "❌")):
+            builder.button(
+                text=f"{mark} {number}",
+                callback_data=PendingCallback(
+                    action="one",
+                    chat_id=chat_id,
+                    user_id=request.user_id,
+                    page=page,
+                    approve=approve,
+                ),
+            )
+    sizes = [2] * len(requests)
+    navigation = [
+        ("◀", page - 1) if page > 0 else None,
+        ("▶", page + 1) if page + 1 < pages else None,
+    ]
+    for text, target in filter(None, navigation):
+        builder.button(
+            text=text, callback_data=PendingCallback(action="chat", chat_id=chat_id, page=target)
+        )
+    if any(navigation):
+        sizes.append(sum(1 for item in navigation if item))
+    if pending:
+        for approve, text in ((True, f"✅ Одобрить все ({pending})"), (False, "❌ Отклонить все")):
+            builder.button(
+                text=text,
+                callback_data=PendingCallback(action="ask_all", chat_id=chat_id, approve=approve),
+            )
+        sizes.append(2)
+    builder.button(text="↩ К списку чатов", callback_data=PendingCallback(action="chats"))
+    sizes.append(1)
+    builder.adjust(*sizes)
+    return "\n".join(lines), builder.as_markup()
+
+
+def _format_progress(progress: BulkProgress) -> str:
+    verb = "Одобрение" if progress.approve else "Отклонение"
+    if not progress.finished:
+        return (
+            f"{verb} заявок в чате <code>{progress.chat_id}</code>: "
+            f"{progress.processed}/{progress.total}…"
+        )
+    done = "одобрено" if progress.approve else "отклонено"
+    text = f"{verb} заявок в чате <code>{progress.chat_id}</code> завершено: {done} {progress.resolved}"
+    if progress.gone:
+        text += f", уже обработаны ранее: {progress.gone}"
+    if progress.failed:
+        text += f", ошибок: {progress.failed} (остались в очереди)"
+    return text + "."
+
+
+@router.message(Command("pending"))
+async def handle_pending(
+    message: Message,
+    bot: Bot,
+    config: AppConfig,
+    review_queue: ReviewQueue | None = None,
+) -> None:
+    """Show chats with join requests held for review."""
+
+    if not is_admin(message, resolve_profile(config, bot)):
+        await message.answer("Эта команда доступна только администратору.")
+        return
+
+    if message.chat.type != ChatType.PRIVATE:
+        await message.answer("Очередь заявок доступна только в приватном чате с ботом.")
+        return
+
+    if review_queue is None:
+        await message.answer("Очередь заявок недоступна: нет подключения к базе данных.")
+        return
+
+    text, markup = await _render_chats(review_queue, bot)
+    await message.answer(text, reply_markup=markup)
+
+
+@router.callback_query(PendingCallback.filter(F.action.in_({"chats", "chat"})))
+async def handle_pending_navigation(
+    callback: CallbackQuery,
+    callback_data: PendingCallback,
+    bot: Bot,
+    config: AppConfig,
+    review_queue: ReviewQueue | None = None,
+) -> None:
+    """Switch between the chat list and the pages of one chat."""
+
+    if review_queue is None or not is_admin(callback, resolve_profile(config, bot)):
+        await callback.answer("Недоступно.", show_alert=True)
+        return
+    if not isinstance(callback.message, Message):
+        await callback.answer()
+        return
+    if callback_data.action == "chats":
+        text, markup = await _render_chats(review_queue, bot)
+    else:
+        text, markup = await _render_chat(
+            review_queue, bot, callback_data.chat_id, callback_data.page, config.review.page_size
+        )
+    await callback.message.edit_text(text, reply_markup=markup, parse_mode="HTML")
+    await callback.answer()
+
+
+@router.callback_query(PendingCallback.filter(F.action == "one"))
+async def handle_pending_decision(
+    callback: CallbackQuery,
+    callback_data: PendingCallback,
+    bot: Bot,
+    config: AppConfig,
+    review_queue: ReviewQueue | None = None,
+) -> None:
+    """Approve or decline a single held request and refresh the page."""
+
+    if review_queue is None or not is_admin(callback, resolve_profile(config, bot)):
+        await callback.answer("Недоступно.", show_alert=True)
+        return
+    outcome = await review_queue.resolve(
+        bot, callback_data.chat_id, callback_data.user_id, approve=callback_data.approve
+    )
+    await callback.answer(
+        _OUTCOME_TEXT[outcome] if outcome else "Заявка уже обработана.",
+        show_alert=outcome == "failed",
+    )
+    if isinstance(callback.message, Message):
+        text, markup = await _render_chat(
+            review_queue, bot, callback_data.chat_id, callback_data.page, config.review.page_size
+        )
+        await callback.message.edit_text(text, reply_markup=markup, parse_mode="HTML")
+
+
+@router.callback_query(PendingCallback.filter(F.action.in_({"ask_all", "all"})))
+async def handle_pending_bulk(
+    callback: CallbackQuery,
+    callback_data: PendingCallback,
+    bot: Bot,
+    config: AppConfig,
+    review_queue: ReviewQueue | None = None,
+) -> None:
+    """Confirm, then approve or decline every held request of a chat.
+
+    The job runs in the background and reports its progress by editing
+    this one message.
+    """
+
+    if review_queue is None or not is_admin(callback, resolve_profile(config, bot)):
+        await callback.answer("Недоступно.", show_alert=True)
+        return
+    message = callback.message
+    if not isinstance(message, Message):
+        await callback.answer()
+        return
+    chat_id = callback_data.chat_id
+    pending = dict(await review_queue.summary(bot.id)).get(chat_id, 0)
+    verb = "Одобрить" if callback_data.approve else "Отклонить"
+
+    if callback_data.action == "ask_all":
+        builder = InlineKeyboardBuilder()
+        builder.button(
+            text=f"{verb} {pending}",
+            callback_data=PendingCallback(
+                action="all", chat_id=chat_id, approve=callback_data.approve
+            ),
+        )
+        builder.button(text="Отмена", callback_data=PendingCallback(action="chat", chat_id=chat_id))
+        await message.edit_text(
+            f"{verb} все заявки в чате <code>{chat_id}</code> ({pending})?",
+            reply_markup=builder.as_markup(),
+            parse_mode="HTML",
+        )
+        await callback.answer()
+        return
+
+    back = InlineKeyboardBuilder()
+    back.button(text="↩ К списку чатов", callback_data=PendingCallback(action="chats"))
+
+    async def report(progress: BulkProgress) -> None:
+        await message.edit_text(
+            _format_progress(progress),
+            reply_markup=back.as_markup() if progress.finished else None,
+            parse_mode="HTML",
+        )
+
+    if review_queue.running(bot.id, chat_id):
+        await callback.answer("Заявки этого чата уже обрабатываются.", show_alert=True)
+        return
+    # Shown before the job starts, so it cannot overwrite the job's own reports.
+    await report(BulkProgress(chat_id, callback_data.approve, pending))
+    if not review_queue.start_bulk(
+        bot, chat_id, pending, approve=callback_data.approve, progress=report
+    ):
+        await callback.answer("Заявки этого чата уже обрабатываются.", show_alert=True)
+        return
+    await callback.answer()
@@ -2,21 +2,23 @@
 
 from __future__ import annotations
 
-from aiogram import Router
+from aiogram import Bot, Router
 from aiogram.filters import CommandStart
 from aiogram.types import Message
 
+from ..configuration import AppConfig
 from ..metrics import START_HANDLER_CALLS
+from ._helpers import resolve_profile
 
 router = Router()
 
 
 @router.message(CommandStart())
-async def handle_start(message: Message) -> None:
+async def handle_start(message: Message, bot: Bot, config: AppConfig) -> None:
     """Greet the user when /start is received."""
 
     user_id = message.from_user.id if message.from_user and message.from_user.id else "unknown"
-    START_HANDLER_CALLS.labels(user_id=str(user_id)).inc()
+    START_HANDLER_CALLS.labels(bot=resolve_profile(config, bot).label, user_id=str(user_id)).inc()
     await message.answer(
         "👋 Привет! Я готов помочь тебе управлять приглашениями в группы. \n\n"
         "👨‍💻 by @mr_baloo"
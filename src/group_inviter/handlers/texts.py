@@ -1,5 +1,7 @@
 """Text templates for handlers."""
 
+# Fallback file_id, valid for the original bot only; configure ``media.assets``
+# and point ``texts.welcome_photo`` at an asset name to send a local file instead.
 AQUA_STUDIO_PHOTO = "AgACAgIAAxkBAAIBIWj2obG_EIXt-h29uTl9FO8dWN6BAALz_TEbPfGwS_FXH2RKJ9sYAQADAgADeAADNgQ"
 
 AQUA_STUDIO_PROMO = """Привет, на связи АКВАСТУДИЯ! 🔥💧
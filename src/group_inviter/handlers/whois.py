@@ -0,0 +1,91 @@
+"""Handler for the admin user lookup."""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+
+from aiogram import Bot, Router
+from aiogram.enums import ChatType
+from aiogram.filters import Command
+from aiogram.filters.command import CommandObject
+from aiogram.types import Message
+from aiogram.utils.text_decorations import html_decoration as html
+
+from ..configuration import AppConfig
+from ..directory import UserDirectory, WhoisResult
+from ._helpers import is_admin, resolve_profile
+
+LOGGER = logging.getLogger(__name__)
+router = Router()
+
+
+def _timestamp(value: datetime) -> str:
+    return value.isoformat(sep=" ", timespec="minutes")
+
+
+def _format_result(result: WhoisResult) -> str:
+    user = result.user
+    name = " ".join(part for part in (user.first_name, user.last_name) if part) or "—"
+    header = f"<b>{html.quote(name)}</b>"
+    if user.username:
+        header += f" @{html.quote(user.username)}"
+    header += f" (id <code>{user.telegram_id}</code>)"
+    lines = [header]
+    if user.blocked_at:
+        lines.append(f"Заблокировал бота: {_timestamp(user.blocked_at)}")
+    joins = result.joins
+    if not joins and user.joined_chat_id is not None:
+        lines.append(f"Чат <code>{user.joined_chat_id}</code>: {_timestamp(user.joined_at)}")
+    for join in joins:
+        line = f"Чат <code>{join.chat_id}</code>: {_timestamp(join.first_joined_at)}"
+        if join.join_count > 1:
+            line += f", последний раз {_timestamp(join.last_joined_at)} ({join.join_count} раз)"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+@router.message(Command("whois"))
+async def handle_whois(
+    message: Message,
+    bot: Bot,
+    config: AppConfig,
+    command: CommandObject,
+    user_directory: UserDirectory | None = None,
+) -> None:
+    """Find stored users by id, @username or part of the name."""
+
+    if not is_admin(message, resolve_profile(config, bot)):
+        await message.answer("Эта команда доступна только администратору.")
+        return
+
+    if message.chat.type != ChatType.PRIVATE:
+        await message.answer("Искать пользователей можно только в приватном чате с ботом.")
+        return
+
+    if user_directory is None:
+        await message.answer("Поиск недоступен: нет подключения к базе данных.")
+        return
+
+    if not command.args:
+        await message.answer("Формат: /whois &lt;id | @username | имя&gt;")
+        return
+
+    try:
+        results = await user_directory.lookup(command.args)
+    except ValueError:
+        await message.answer(
+            f"Запрос слишком короткий: нужно хотя бы {config.whois.min_query_length} символа."
+        )
+        return
+    except Exception as exc:  # pragma: no cover - database errors
+        LOGGER.warning("User lookup failed: %s", exc)
+        await message.answer("Не удалось выполнить поиск. Попробуйте позже.")
+        return
+
+    if not results:
+        await message.answer("Никого не нашлось.")
+        return
+    await message.answer(
+        "\n\n".join(_format_result(result) for result in results), parse_mode="HTML"
+    )
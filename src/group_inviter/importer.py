@@ -0,0 +1,302 @@
+"""Bulk import of member lists into the ``users`` table (``start-bot import``)."""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import logging
+import sys
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, AsyncIterator, Callable
+
+from .configuration import AppConfig
+
+if TYPE_CHECKING:
+    import asyncpg  # type: ignore[import-untyped]
+
+LOGGER = logging.getLogger(__name__)
+
+IMPORT_COLUMNS: tuple[str, ...] = (
+    "telegram_id",
+    "first_name",
+    "last_name",
+    "username",
+    "phone_number",
+    "language_code",
+    "is_premium",
+    "is_bot",
+    "joined_chat_id",
+    "user_chat_id",
+    "joined_at",
+)
+_HEADER_ALIASES = {"id": "telegram_id", "user_id": "telegram_id", "chat_id": "joined_chat_id"}
+_INT_COLUMNS = frozenset({"telegram_id", "joined_chat_id", "user_chat_id"})
+_BOOL_COLUMNS = frozenset({"is_premium", "is_bot"})
+_TRUE_VALUES = frozenset({"1", "true", "t", "yes", "y"})
+# Columns filled from the import only while the stored value is still NULL.
+_FILL_COLUMNS = (
+    "first_name",
+    "last_name",
+    "username",
+    "phone_number",
+    "language_code",
+    "joined_chat_id",
+    "user_chat_id",
+)
+
+_CREATE_STAGING_SQL = """
+    CREATE TEMPORARY TABLE IF NOT EXISTS users_import (
+        telegram_id BIGINT NOT NULL,
+        first_name TEXT,
+        last_name TEXT,
+        username TEXT,
+        phone_number TEXT,
+        language_code TEXT,
+        is_premium BOOLEAN,
+        is_bot BOOLEAN,
+        joined_chat_id BIGINT,
+        user_chat_id BIGINT,
+        joined_at TIMESTAMPTZ NOT NULL
+    )
+"""
+
+_MERGE_SQL = f"""
+    WITH merged AS (
+        INSERT INTO users ({", ".join(IMPORT_COLUMNS)}, updated_at)
+        SELECT DISTINCT ON (telegram_id)
+            telegram_id, first_name, last_name, username, phone_number, language_code,
+            COALESCE(is_premium, FALSE), COALESCE(is_bot, FALSE),
+            joined_chat_id, user_chat_id, joined_at, $1
+        FROM users_import
+        ORDER BY telegram_id, joined_at
+        ON CONFLICT (telegram_id) DO UPDATE
+        SET
+            {", ".join(f"{column} = COALESCE(users.{column}, EXCLUDED.{column})" for column in _FILL_COLUMNS)},
+            joined_at = LEAST(users.joined_at, EXCLUDED.joined_at),
+            updated_at = EXCLUDED.updated_at
+        WHERE {" OR ".join(f"(users.{column} IS NULL AND EXCLUDED.{column} IS NOT NULL)" for column in _FILL_COLUMNS)}
+            OR EXCLUDED.joined_at < users.joined_at
+        RETURNING (xmax = 0) AS inserted
+    )
+    SELECT
+        count(*) FILTER (WHERE inserted) AS inserted,
+        count(*) FILTER (WHERE NOT inserted) AS updated
+    FROM merged
+"""  # noqa: S608 - built from constant column names only
+
+# Adds imported memberships to the /whois join history.
+_HISTORY_SQL = """
+    INSERT INTO user_joins (telegram_id, chat_id, first_joined_at, last_joined_at)
+    SELECT telegram_id, joined_chat_id, min(joined_at), max(joined_at)
+    FROM users_import
+    WHERE joined_chat_id IS NOT NULL
+    GROUP BY telegram_id, joined_chat_id
+    ON CONFLICT (telegram_id, chat_id) DO UPDATE
+    SET first_joined_at = LEAST(user_joins.first_joined_at, EXCLUDED.first_joined_at)
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class ImportProgress:
+    """Rows streamed into the staging table so far."""
+
+    read: int
+    rejected: int
+    elapsed: float
+
+
+@dataclass(frozen=True, slots=True)
+class ImportReport:
+    """Outcome of a finished import."""
+
+    read: int
+    rejected: int
+    inserted: int
+    updated: int
+    copy_seconds: float
+    merge_seconds: float
+
+
+class CsvUserReader:
+    """Convert CSV rows into staging table records, one bounded batch at a time.
+
+    The header names columns of ``users`` (``id`` and ``user_id`` are
+    accepted for ``telegram_id``, ``chat_id`` for ``joined_chat_id``);
+    unknown columns are ignored. Rows without a numeric id are rejected.
+    """
+
+    def __init__(
+        self,
+        stream: IO[str],
+        *,
+        chat_id: int | None = None,
+        joined_at: datetime | None = None,
+    ) -> None:
+        self._reader = csv.reader(stream)
+        self._chat_id = chat_id
+        self._joined_at = joined_at or datetime.now(UTC)
+        self.read = 0
+        self.rejected = 0
+        header = next(self._reader, None)
+        if header is None:
+            msg = "CSV file is empty"
+            raise ValueError(msg)
+        names = [_HEADER_ALIASES.get(name.strip().lower(), name.strip().lower()) for name in header]
+        if "telegram_id" not in names:
+            msg = "CSV header must contain a telegram_id (or id/user_id) column"
+            raise ValueError(msg)
+        self._positions = {
+            column: names.index(column) for column in IMPORT_COLUMNS if column in names
+        }
+
+    def _convert(self, row: list[str]) -> tuple[Any, ...]:
+        values: list[Any] = []
+        for column in IMPORT_COLUMNS:
+            position = self._positions.get(column)
+            raw = row[position].strip() if position is not None and position < len(row) else ""
+            value: Any
+            if not raw:
+                value = None
+            elif column in _INT_COLUMNS:
+                value = int(raw)
+            elif column in _BOOL_COLUMNS:
+                value = raw.lower() in _TRUE_VALUES
+            elif column == "joined_at":
+                value = datetime.fromisoformat(raw)
+                if value.tzinfo is None:
+                    value = value.replace(tzinfo=UTC)
+            else:
+                value = raw
+            values.append(value)
+        record = dict(zip(IMPORT_COLUMNS, values, strict=True))
+        if record["telegram_id"] is None:
+            msg = "missing telegram_id"
+            raise ValueError(msg)
+        if record["joined_chat_id"] is None:
+            record["joined_chat_id"] = self._chat_id
+        if record["joined_at"] is None:
+            record["joined_at"] = self._joined_at
+        return tuple(record.values())
+
+    def batch(self, size: int) -> list[tuple[Any, ...]]:
+        """Up to ``size`` converted records; an empty list at end of file."""
+
+        records: list[tuple[Any, ...]] = []
+        for row in self._reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            self.read += 1
+            try:
+                records.append(self._convert(row))
+            except ValueError as exc:
+                self.rejected += 1
+                if self.rejected <= 10:
+                    LOGGER.warning("Skipping CSV line %s: %s", self._reader.line_num, exc)
+            if len(records) >= size:
+                break
+        return records
+
+
+async def _stream(
+    reader: CsvUserReader,
+    batch_size: int,
+    progress: Callable[[ImportProgress], None],
+    started_at: float,
+) -> AsyncIterator[tuple[Any, ...]]:
+    while batch := await asyncio.to_thread(reader.batch, batch_size):
+        for record in batch:
+            yield record
+        progress(ImportProgress(reader.read, reader.rejected, time.perf_counter() - started_at))
+
+
+async def import_users(
+    pool: asyncpg.Pool,
+    reader: CsvUserReader,
+    *,
+    batch_size: int = 10_000,
+    progress: Callable[[ImportProgress], None] = lambda _: None,
+) -> ImportReport:
+    """Stream ``reader`` into a staging table, then merge it into ``users``.
+
+    ``COPY`` into an unindexed temporary table runs without touching
+    ``users``; the merge is a single ``INSERT ... ON CONFLICT`` in its own
+    short transaction. Existing rows only gain values they are missing, and
+    rows without any change are not rewritten.
+    """
+
+    started_at = time.perf_counter()
+    async with pool.acquire() as connection:
+        await connection.execute(_CREATE_STAGING_SQL)
+        try:
+            await connection.execute("TRUNCATE users_import")
+            await connection.copy_records_to_table(
+                "users_import",
+                records=_stream(reader, batch_size, progress, started_at),
+                columns=IMPORT_COLUMNS,
+            )
+            copied_at = time.perf_counter()
+            async with connection.transaction():
+                row = await connection.fetchrow(_MERGE_SQL, datetime.now(UTC))
+                await connection.execute(_HISTORY_SQL)
+            merged_at = time.perf_counter()
+        finally:
+            await connection.execute("DROP TABLE IF EXISTS users_import")
+    return ImportReport(
+        read=reader.read,
+        rejected=reader.rejected,
+        inserted=row["inserted"],
+        updated=row["updated"],
+        copy_seconds=copied_at - started_at,
+        merge_seconds=merged_at - copied_at,
+    )
+
+
+def _print_progress(progress: ImportProgress) -> None:
+    rate = progress.read / progress.elapsed if progress.elapsed else 0.0
+    print(
+        f"\rread {progress.read:,} rows ({progress.rejected:,} rejected, {rate:,.0f} rows/s)",
+        end="",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+async def run_import(
+    config: AppConfig,
+    path: Path,
+    *,
+    chat_id: int | None = None,
+    batch_size: int = 10_000,
+) -> ImportReport:
+    """Import the CSV file at ``path`` using the configured database."""
+
+    from .database import create_pool, ensure_schema, ensure_search_indexes
+
+    pool = await create_pool(config.database)
+    try:
+        await ensure_schema(pool)
+        with path.open(encoding="utf-8-sig", newline="") as stream:
+            reader = CsvUserReader(stream, chat_id=chat_id)
+            report = await import_users(
+                pool, reader, batch_size=batch_size, progress=_print_progress
+            )
+        # A first import into an empty table is faster before the indexes exist.
+        await ensure_search_indexes(pool)
+    finally:
+        await pool.close()
+    print(file=sys.stderr)
+    LOGGER.info(
+        "Imported %s: %s rows read, %s rejected, %s inserted, %s updated "
+        "(copy %.1fs, merge %.1fs)",
+        path,
+        report.read,
+        report.rejected,
+        report.inserted,
+        report.updated,
+        report.copy_seconds,
+        report.merge_seconds,
+    )
+    return report
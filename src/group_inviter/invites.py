@@ -0,0 +1,343 @@
+"""Expiry, usage limits and rotation of bot-created invite links."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import re
+import time
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Callable, Iterable, Mapping, Sequence
+
+from .cache import TTLCache
+from .configuration import AppConfig, InvitesConfig
+from .database import InviteLinksRepository, ManagedInvite
+from .metrics import record_invite_link_event
+from .ratelimit import AsyncRateLimiter
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+    from aiogram.types import ChatInviteLink
+
+LOGGER = logging.getLogger(__name__)
+
+_DURATION_RE = re.compile(r"^(\d+(?:\.\d+)?)([smhd]?)$")
+_DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+# Bounds of the cache of links known to have no invite_links row.
+_UNMANAGED_CACHE_SIZE = 10_000
+_UNMANAGED_TTL = 3600.0
+
+
+def parse_duration(text: str) -> float:
+    """Seconds in ``text`` such as ``90``, ``30m``, ``12h`` or ``7d``."""
+
+    match = _DURATION_RE.match(text.strip().lower())
+    if match is None or float(match.group(1)) <= 0:
+        msg = f"Invalid duration: {text!r}"
+        raise ValueError(msg)
+    return float(match.group(1)) * _DURATION_UNITS[match.group(2)]
+
+
+@dataclass(frozen=True, slots=True)
+class InviteOptions:
+    """Lifecycle requested for a new invite link."""
+
+    expire_after: float | None = None
+    usage_limit: int | None = None
+    rotate: bool = False
+
+    @classmethod
+    def parse(cls, tokens: Iterable[str], defaults: InvitesConfig) -> InviteOptions:
+        """Parse ``expire=12h``, ``limit=50``, ``rotate`` and ``norotate`` tokens."""
+
+        expire_after = defaults.default_expire
+        usage_limit = defaults.default_usage_limit
+        rotate = defaults.rotate
+        for token in tokens:
+            key, _, value = token.partition("=")
+            key = key.lower()
+            if key == "expire" and value:
+                expire_after = None if value.lower() == "never" else parse_duration(value)
+            elif key == "limit" and value:
+                usage_limit = None if value.lower() == "none" else int(value)
+                if usage_limit is not None and usage_limit < 1:
+                    msg = "limit must be positive"
+                    raise ValueError(msg)
+            elif key in {"rotate", "norotate"} and not value:
+                rotate = key == "rotate"
+            else:
+                msg = f"Unknown option: {token!r}"
+                raise ValueError(msg)
+        if rotate and expire_after is None and usage_limit is None:
+            msg = "rotate needs an expiry or a usage limit"
+            raise ValueError(msg)
+        return cls(expire_after=expire_after, usage_limit=usage_limit, rotate=rotate)
+
+
+class InviteLinkScheduler:
+    """Revoke or rotate managed links when they expire or run out of uses.
+
+    Deadlines live in a min-heap and :meth:`run` sleeps until the earliest
+    one, so idle links cost nothing. Links reaching their usage limit are
+    queued by :meth:`record_usage` and handled immediately. Revocations go
+    out in batches of ``batch_size`` paced by a token bucket per bot, and every
+    batch is first claimed in Postgres so that sibling workers never revoke
+    (or rotate) the same link twice. After a restart :meth:`run` rebuilds
+    the heap from the ``invite_links`` table.
+    """
+
+    def __init__(
+        self,
+        repository: InviteLinksRepository,
+        bots: Sequence[Bot],
+        config: AppConfig,
+        *,
+        limiters: Mapping[int, AsyncRateLimiter] | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._repository = repository
+        self._bots = {bot.id: bot for bot in bots}
+        self._app_config = config
+        self._config = config.invites
+        self._limiters = {
+            bot.id: AsyncRateLimiter(self._config.revoke_rate, self._config.revoke_burst)
+            for bot in bots
+        }
+        self._limiters.update(limiters or {})
+        self._clock = clock
+        self._heap: list[tuple[float, int, str]] = []
+        self._deadlines: dict[str, float] = {}
+        self._due: dict[str, None] = {}
+        # Links known to have no lifecycle row; their approvals skip the database.
+        self._unmanaged: TTLCache[str, bool] = TTLCache(
+            maxsize=_UNMANAGED_CACHE_SIZE, ttl=_UNMANAGED_TTL
+        )
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+
+    def update_config(self, config: AppConfig) -> None:
+        """Use a reloaded ``config`` for admin notifications.
+
+        The ``invites`` section itself only takes effect after a restart.
+        """
+
+        self._app_config = config
+
+    @property
+    def scheduled(self) -> int:
+        return len(self._deadlines)
+
+    def next_deadline(self) -> float | None:
+        while self._heap and self._deadlines.get(self._heap[0][2]) != self._heap[0][0]:
+            heapq.heappop(self._heap)  # superseded or already handled
+        return self._heap[0][0] if self._heap else None
+
+    def schedule(self, invite: ManagedInvite) -> None:
+        """Track ``invite`` until its expiry; exhausted links are queued at once."""
+
+        if invite.exhausted:
+            self._due[invite.invite_link] = None
+            self._wakeup.set()
+            return
+        if invite.expire_at is None:
+            return
+        deadline = invite.expire_at.timestamp()
+        earliest = self.next_deadline()
+        self._deadlines[invite.invite_link] = deadline
+        heapq.heappush(self._heap, (deadline, next(self._sequence), invite.invite_link))
+        if earliest is None or deadline < earliest:
+            self._wakeup.set()
+
+    async def create(
+        self,
+        bot: Bot,
+        chat_id: int,
+        options: InviteOptions,
+        *,
+        name: str | None = None,
+    ) -> ChatInviteLink:
+        """Create a join-request link with ``options`` and start tracking it.
+
+        Telegram refuses ``member_limit`` on links that create join
+        requests, so the usage limit is counted by the bot on approval.
+        """
+
+        expire_at = (
+            None
+            if options.expire_after is None
+            else datetime.fromtimestamp(self._clock(), UTC)
+            + timedelta(seconds=options.expire_after)
+        )
+        invite = await bot.create_chat_invite_link(
+            chat_id=chat_id,
+            creates_join_request=True,
+            name=name,
+            expire_date=expire_at,
+        )
+        if options.expire_after is None and options.usage_limit is None:
+            return invite
+        managed = ManagedInvite(
+            invite_link=invite.invite_link,
+            bot_id=bot.id,
+            chat_id=chat_id,
+            name=name,
+            expire_at=expire_at,
+            expire_after=options.expire_after,
+            usage_limit=options.usage_limit,
+            rotate=options.rotate,
+        )
+        try:
+            await self._repository.add(managed)
+        except Exception as exc:
+            # The link exists already; Telegram still enforces its expire_date.
+            LOGGER.warning("Failed to persist invite link %s: %s", invite.invite_link, exc)
+            return invite
+        self.schedule(managed)
+        return invite
+
+    async def record_usage(self, invite_link: str) -> None:
+        """Count an approval through ``invite_link`` and queue it once exhausted."""
+
+        if invite_link in self._unmanaged:
+            return
+        invite = await self._repository.record_usage(invite_link)
+        if invite is None:
+            # Also None while a revocation holds the row; only absent links are cached.
+            if not await self._repository.exists(invite_link):
+                self._unmanaged.set(invite_link, True)
+        elif invite.exhausted:
+            self._deadlines.pop(invite_link, None)
+            self._due[invite_link] = None
+            self._wakeup.set()
+
+    async def rebuild(self) -> None:
+        """Load every active link from the database."""
+
+        invites = await self._repository.active()
+        for invite in invites:
+            self.schedule(invite)
+        LOGGER.info("Tracking %s managed invite link(s)", len(invites))
+
+    async def run(self) -> None:
+        """Rebuild state, then revoke links as their deadlines pass."""
+
+        while True:
+            try:
+                await self.rebuild()
+                break
+            except Exception as exc:
+                LOGGER.warning("Failed to load managed invite links, retrying: %s", exc)
+                await asyncio.sleep(self._config.retry_delay)
+        while True:
+            await self._wait()
+            self._collect_expired()
+            while self._due:
+                batch = list(itertools.islice(self._due, self._config.batch_size))
+                for invite_link in batch:
+                    del self._due[invite_link]
+                await self.process(batch)
+
+    async def _wait(self) -> None:
+        self._wakeup.clear()
+        if self._due:
+            return
+        deadline = self.next_deadline()
+        timeout = None if deadline is None else max(deadline - self._clock(), 0.0)
+        if timeout == 0:
+            return
+        with suppress(TimeoutError):
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+
+    def _collect_expired(self) -> None:
+        now = self._clock()
+        while (deadline := self.next_deadline()) is not None and deadline <= now:
+            _, _, invite_link = heapq.heappop(self._heap)
+            del self._deadlines[invite_link]
+            self._due[invite_link] = None
+
+    async def process(self, invite_links: Sequence[str]) -> None:
+        """Revoke a batch of links, rotating those configured to."""
+
+        for invite_link in invite_links:
+            self._deadlines.pop(invite_link, None)
+        try:
+            claimed = await self._repository.claim(invite_links)
+        except Exception as exc:
+            LOGGER.warning("Failed to claim %s invite link(s): %s", len(invite_links), exc)
+            self._retry_later(invite_links)
+            return
+        failed: list[ManagedInvite] = []
+        for invite in claimed:
+            bot = self._bots.get(invite.bot_id)
+            if bot is None:
+                LOGGER.warning(
+                    "Invite link %s belongs to bot %s, which is not configured",
+                    invite.invite_link,
+                    invite.bot_id,
+                )
+                continue
+            if not await self._revoke(bot, invite):
+                failed.append(invite)
+                continue
+            reason = "usage" if invite.exhausted else "expired"
+            record_invite_link_event(reason, bot=self._app_config.telegram.label_for(bot.token))
+            LOGGER.info("Revoked invite link %s (%s)", invite.invite_link, reason)
+            if invite.rotate:
+                await self._rotate(bot, invite)
+        if failed:
+            links = [invite.invite_link for invite in failed]
+            try:
+                await self._repository.unclaim(links)
+            except Exception as exc:  # pragma: no cover - database errors
+                LOGGER.warning("Failed to release %s invite link(s): %s", len(links), exc)
+            self._retry_later(links)
+
+    async def _revoke(self, bot: Bot, invite: ManagedInvite) -> bool:
+        from aiogram.exceptions import TelegramBadRequest
+
+        try:
+            async with self._limiters[bot.id]:
+                await bot.revoke_chat_invite_link(invite.chat_id, invite.invite_link)
+        except TelegramBadRequest as exc:
+            # Already expired, revoked or the chat is gone: nothing left to revoke.
+            LOGGER.info("Invite link %s could not be revoked: %s", invite.invite_link, exc)
+        except Exception as exc:
+            LOGGER.warning("Failed to revoke invite link %s: %s", invite.invite_link, exc)
+            return False
+        return True
+
+    async def _rotate(self, bot: Bot, invite: ManagedInvite) -> None:
+        from .handlers._helpers import notify_admin
+
+        label = self._app_config.telegram.label_for(bot.token)
+        options = InviteOptions(
+            expire_after=invite.expire_after, usage_limit=invite.usage_limit, rotate=True
+        )
+        try:
+            async with self._limiters[bot.id]:
+                replacement = await self.create(bot, invite.chat_id, options, name=invite.name)
+        except Exception as exc:
+            LOGGER.warning("Failed to rotate invite link for chat %s: %s", invite.chat_id, exc)
+            record_invite_link_event("rotation_failed", bot=label)
+            return
+        record_invite_link_event("rotated", bot=label)
+        await notify_admin(
+            bot,
+            self._app_config,
+            (
+                f"Ссылка для чата {invite.chat_id} заменена:\n"
+                f"{invite.invite_link} → {replacement.invite_link}"
+            ),
+            logger=LOGGER,
+            context="invite-rotation",
+        )
+
+    def _retry_later(self, invite_links: Iterable[str]) -> None:
+        deadline = self._clock() + self._config.retry_delay
+        for invite_link in invite_links:
+            self._deadlines[invite_link] = deadline
+            heapq.heappush(self._heap, (deadline, next(self._sequence), invite_link))
@@ -0,0 +1,29 @@
+"""Per-update logging context carried in a context variable."""
+
+from __future__ import annotations
+
+from contextvars import ContextVar, Token
+from typing import Any, Mapping
+
+_EMPTY: Mapping[str, Any] = {}
+_CONTEXT: ContextVar[Mapping[str, Any]] = ContextVar("group_inviter_log_context", default=_EMPTY)
+
+
+def current() -> Mapping[str, Any]:
+    """Fields bound for the running task; empty outside update handling."""
+
+    return _CONTEXT.get()
+
+
+def bind(**fields: Any) -> Token[Mapping[str, Any]]:
+    """Add ``fields`` (``None`` values are skipped) on top of the current context."""
+
+    merged = {
+        **_CONTEXT.get(),
+        **{key: value for key, value in fields.items() if value is not None},
+    }
+    return _CONTEXT.set(merged)
+
+
+def reset(token: Token[Mapping[str, Any]]) -> None:
+    _CONTEXT.reset(token)
@@ -2,49 +2,86 @@
 
 from __future__ import annotations
 
+import glob
+import gzip
 import json
 import logging
+import os
+import queue
+import shutil
+import threading
+import time
 from datetime import UTC, datetime, tzinfo
 from logging import LogRecord
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
+from typing import Callable, Iterable
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
+from . import log_context
 from .configuration import LoggingConfig
 
 LOGGER = logging.getLogger(__name__)
 
 TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
 FILENAME_TIMESTAMP_FORMAT = "%Y%m%dT%H%M%S%z"
+ROTATED_TIMESTAMP_FORMAT = "%Y%m%dT%H%M%S%f"
+COMPRESSED_SUFFIX = ".gz"
+
+_MAINTENANCE: LogMaintenance | None = None
 
 
 class TimezoneAwareFormatter(logging.Formatter):
-    """Formatter that renders timestamps in a specific timezone."""
+    """Formatter that renders timestamps in a specific timezone.
+
+    Explicit ``datefmt`` formats have at most second resolution, so the
+    rendered string is cached until the second changes.
+    """
 
     def __init__(self, *, tzinfo: tzinfo, fmt: str | None = None, datefmt: str | None = None):
         super().__init__(fmt=fmt, datefmt=datefmt)
         self._tzinfo = tzinfo
+        self._time_cache: tuple[int, str, str] = (-1, "", "")
 
     def formatTime(self, record: LogRecord, datefmt: str | None = None) -> str:  # noqa: N802
-        dt = datetime.fromtimestamp(record.created, tz=UTC).astimezone(self._tzinfo)
-        if datefmt:
-            return dt.strftime(datefmt)
-        return dt.isoformat()
+        if not datefmt:
+            return (
+                datetime.fromtimestamp(record.created, tz=UTC).astimezone(self._tzinfo).isoformat()
+            )
+        second = int(record.created)
+        cached_second, cached_format, rendered = self._time_cache
+        if second != cached_second or datefmt != cached_format:
+            dt = datetime.fromtimestamp(second, tz=UTC).astimezone(self._tzinfo)
+            rendered = dt.strftime(datefmt)
+            self._time_cache = (second, datefmt, rendered)
+        return rendered
+
+
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=True, separators=(",", ":"), default=str)
 
 
 class JsonFormatter(TimezoneAwareFormatter):
-    """Format log records as JSON without extra dependencies."""
+    """Format log records as JSON without extra dependencies.
+
+    Identifiers bound by :mod:`group_inviter.log_context` (update, chat,
+    user, bot and handler) are added to every record.
+    """
 
-    def format(self, record: LogRecord) -> str:  # pragma: no cover - formatting glue
+    def format(self, record: LogRecord) -> str:
         data = {
             "level": record.levelname,
             "name": record.name,
             "message": record.getMessage(),
             "time": self.formatTime(record, TIMESTAMP_FORMAT),
         }
+        context = log_context.current()
+        if context:
+            data.update(context)
         if record.exc_info:
-            data["exc_info"] = self.formatException(record.exc_info)
-        return json.dumps(data, ensure_ascii=True)
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+            data["exc_info"] = record.exc_text
+        return _JSON_ENCODER.encode(data)
 
 
 def _resolve_timezone(name: str) -> tzinfo:
@@ -57,14 +94,163 @@ def _resolve_timezone(name: str) -> tzinfo:
         return UTC
 
 
-def _make_rotating_handler(path: Path, level: int, tzinfo: tzinfo) -> logging.Handler:
+def _compress(path: Path) -> None:
+    """Gzip ``path`` next to itself and remove the original."""
+
+    target = path.with_name(path.name + COMPRESSED_SUFFIX)
+    partial = target.with_name(target.name + ".tmp")
+    with path.open("rb") as source, gzip.open(partial, "wb", compresslevel=6) as destination:
+        shutil.copyfileobj(source, destination, 1024 * 1024)
+    os.replace(partial, target)
+    path.unlink()
+
+
+def _family_files(log_dir: Path, filename: str) -> list[Path]:
+    """Files of every run of one configured log file: active, rotated and compressed."""
+
+    relative = Path(filename)
+    stem = relative.stem if relative.suffix else relative.name
+    directory = (log_dir / relative).parent
+    if not directory.is_dir():
+        return []
+    return [
+        path
+        for path in directory.glob(f"{glob.escape(stem)}-*")
+        if path.is_file() and not path.name.endswith(".tmp")
+    ]
+
+
+class LogMaintenance:
+    """Compress rotated log files and apply retention on a background thread.
+
+    Rotation itself only renames the full file, so the thread that emitted
+    the record (usually the event loop) never waits for gzip or for
+    directory scans.
+    """
+
+    def __init__(self, config: LoggingConfig, active: Iterable[Path]) -> None:
+        self._config = config
+        self._active = {path.resolve() for path in active}
+        self._jobs: queue.SimpleQueue[Callable[[], None] | None] = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="log-maintenance", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+        self._jobs.put(self._tidy_previous_runs)
+
+    def stop(self) -> None:
+        self._jobs.put(None)
+
+    def rotated(self, path: Path, base: Path, backup_count: int) -> None:
+        """Schedule compression of a freshly rotated file and backup pruning."""
+
+        self._jobs.put(lambda: self._after_rotation(path, base, backup_count))
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until queued work is done; ``False`` on timeout."""
+
+        if not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._jobs.put(done.set)
+        return done.wait(timeout)
+
+    def _run(self) -> None:
+        while (job := self._jobs.get()) is not None:
+            try:
+                job()
+            except Exception:  # pragma: no cover - never let maintenance kill the thread
+                LOGGER.exception("Log maintenance job failed")
+
+    def _files(self) -> list[Path]:
+        directory = self._config.directory
+        return _family_files(directory, self._config.info_filename) + _family_files(
+            directory, self._config.debug_filename
+        )
+
+    def _tidy_previous_runs(self) -> None:
+        if self._config.compress:
+            for path in self._files():
+                if path.suffix != COMPRESSED_SUFFIX and path.resolve() not in self._active:
+                    _compress(path)
+        self._apply_retention()
+
+    def _after_rotation(self, path: Path, base: Path, backup_count: int) -> None:
+        if self._config.compress and path.exists():
+            _compress(path)
+        backups = sorted(base.parent.glob(f"{glob.escape(base.name)}.*"))
+        backups = [backup for backup in backups if not backup.name.endswith(".tmp")]
+        for stale in backups[: max(len(backups) - backup_count, 0)]:
+            stale.unlink(missing_ok=True)
+        self._apply_retention()
+
+    def _apply_retention(self) -> None:
+        max_age = self._config.retention_days * 86400
+        max_bytes = self._config.retention_max_bytes
+        if not max_age and not max_bytes:
+            return
+        stats = {path: path.stat() for path in self._files()}
+        candidates = sorted(
+            (path for path in stats if path.resolve() not in self._active),
+            key=lambda path: stats[path].st_mtime,
+        )
+        now = time.time()
+        total = sum(stat.st_size for stat in stats.values())
+        for path in candidates:
+            expired = bool(max_age) and now - stats[path].st_mtime > max_age
+            over_budget = bool(max_bytes) and total > max_bytes
+            if not (expired or over_budget):
+                continue
+            path.unlink(missing_ok=True)
+            total -= stats[path].st_size
+
+
+class CompressingRotatingFileHandler(RotatingFileHandler):
+    """Size-based rotation that hands rotated files to :class:`LogMaintenance`.
+
+    Rotated files get a timestamp suffix instead of the ``.1``..``.N``
+    shuffle, so pending compression never races with renames.
+    """
+
+    def __init__(
+        self,
+        filename: Path,
+        *,
+        max_bytes: int,
+        backup_count: int,
+        maintenance: LogMaintenance,
+    ) -> None:
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self._maintenance = maintenance
+
+    def doRollover(self) -> None:  # noqa: N802
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        base = Path(self.baseFilename)
+        if base.exists():
+            stamp = datetime.now(UTC).strftime(ROTATED_TIMESTAMP_FORMAT)
+            rotated = base.with_name(f"{base.name}.{stamp}")
+            os.replace(base, rotated)
+            self._maintenance.rotated(rotated, base, self.backupCount)
+        if not self.delay:
+            self.stream = self._open()
+
+
+def _make_rotating_handler(
+    path: Path,
+    level: int,
+    tzinfo: tzinfo,
+    config: LoggingConfig,
+    maintenance: LogMaintenance,
+) -> logging.Handler:
     """Create a rotating file handler with unified formatting."""
 
-    handler = RotatingFileHandler(
+    handler = CompressingRotatingFileHandler(
         path,
-        maxBytes=10 * 1024 * 1024,  # 10 MB
-        backupCount=5,
-        encoding="utf-8",
+        max_bytes=config.max_bytes,
+        backup_count=config.backup_count,
+        maintenance=maintenance,
     )
     handler.setLevel(level)
     handler.setFormatter(
@@ -77,6 +263,12 @@ def _make_rotating_handler(path: Path, level: int, tzinfo: tzinfo) -> logging.Ha
     return handler
 
 
+def wait_for_log_maintenance(timeout: float | None = None) -> bool:
+    """Wait for pending compression/retention work, e.g. before exiting."""
+
+    return _MAINTENANCE is None or _MAINTENANCE.wait(timeout)
+
+
 def _timestamped_log_path(log_dir: Path, filename: str, run_dt: datetime) -> Path:
     """Attach a run-specific timestamp to the configured filename."""
 
@@ -92,6 +284,12 @@ def _timestamped_log_path(log_dir: Path, filename: str, run_dt: datetime) -> Pat
     return log_dir / relative
 
 
+def set_logging_level(config: LoggingConfig) -> None:
+    """Apply ``config.level`` to the root logger without touching its handlers."""
+
+    logging.getLogger().setLevel(getattr(logging, config.level.upper(), logging.INFO))
+
+
 def configure_logging(config: LoggingConfig) -> None:
     """Configure standard library logging based on settings."""
 
@@ -119,8 +317,12 @@ def configure_logging(config: LoggingConfig) -> None:
     debug_path = _timestamped_log_path(log_dir, config.debug_filename, run_started_at)
     info_path.parent.mkdir(parents=True, exist_ok=True)
     debug_path.parent.mkdir(parents=True, exist_ok=True)
-    info_handler = _make_rotating_handler(info_path, logging.INFO, tzinfo)
-    debug_handler = _make_rotating_handler(debug_path, logging.DEBUG, tzinfo)
+    global _MAINTENANCE
+    if _MAINTENANCE is not None:
+        _MAINTENANCE.stop()
+    maintenance = LogMaintenance(config, (info_path, debug_path))
+    info_handler = _make_rotating_handler(info_path, logging.INFO, tzinfo, config, maintenance)
+    debug_handler = _make_rotating_handler(debug_path, logging.DEBUG, tzinfo, config, maintenance)
     handlers.extend([info_handler, debug_handler])
 
     logging.basicConfig(
@@ -128,3 +330,5 @@ def configure_logging(config: LoggingConfig) -> None:
         handlers=handlers,
         force=True,
     )
+    maintenance.start()
+    _MAINTENANCE = maintenance
@@ -0,0 +1,144 @@
+"""Event loop lag measurement and blocked-loop reporting."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+from contextlib import suppress
+from dataclasses import dataclass
+
+from .configuration import LoopMonitorConfig
+from .metrics import observe_loop_lag, record_loop_stall
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class HandlerStep:
+    """What an update-processing task is currently doing."""
+
+    update_type: str
+    handler: str | None = None
+
+
+_STEPS: weakref.WeakKeyDictionary[asyncio.Task[object], HandlerStep] = weakref.WeakKeyDictionary()
+
+
+def track_update(update_type: str) -> None:
+    """Remember the update type handled by the current task."""
+
+    task = asyncio.current_task()
+    if task is not None:
+        _STEPS[task] = HandlerStep(update_type=update_type)
+
+
+def track_handler(handler: str) -> None:
+    """Remember which handler the current task has entered."""
+
+    task = asyncio.current_task()
+    if task is None:
+        return
+    step = _STEPS.get(task)
+    if step is None:
+        _STEPS[task] = HandlerStep(update_type="unknown", handler=handler)
+    else:
+        step.handler = handler
+
+
+def describe_task(task: asyncio.Task[object] | None) -> str:
+    if task is None:
+        return "no running task"
+    step = _STEPS.get(task)
+    if step is None:
+        return f"task {task.get_name()}"
+    return f"task {task.get_name()} update={step.update_type} handler={step.handler or '-'}"
+
+
+class LoopMonitor:
+    """Measure scheduling lag and report callbacks that hold the loop too long.
+
+    A coroutine on the monitored loop sleeps for ``interval`` and records
+    how late it wakes up into a histogram. A watchdog thread checks the
+    coroutine's heartbeat; when the loop has not ticked for longer than
+    ``slow_callback_threshold`` it captures the loop thread's stack (capped
+    at ``max_stack_frames``) together with the running task's update type
+    and handler, so the culprit is caught while it still blocks. This works
+    without asyncio debug mode.
+    """
+
+    def __init__(self, config: LoopMonitorConfig) -> None:
+        self._config = config
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._heartbeat = time.monotonic()
+        self._task: asyncio.Task[None] | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._measure(), name="loop-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    async def _measure(self) -> None:
+        loop = asyncio.get_running_loop()
+        interval = self._config.interval
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            observe_loop_lag(max(loop.time() - expected, 0.0))
+            self._heartbeat = time.monotonic()
+
+    def _watch(self) -> None:
+        threshold = self._config.slow_callback_threshold
+        allowance = self._config.interval + threshold
+        reported_heartbeat: float | None = None
+        while not self._stop.wait(threshold / 2):
+            heartbeat = self._heartbeat
+            stalled_for = time.monotonic() - heartbeat
+            if stalled_for < allowance or heartbeat == reported_heartbeat:
+                continue
+            reported_heartbeat = heartbeat
+            record_loop_stall()
+            LOGGER.warning(
+                "Event loop blocked for %.3fs (%s); stack:\n%s",
+                stalled_for - self._config.interval,
+                self._describe_running_task(),
+                self._loop_stack(),
+            )
+
+    def _describe_running_task(self) -> str:
+        if self._loop is None:
+            return "no loop"
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:  # pragma: no cover - loop closed under us
+            return "no running task"
+        return describe_task(task)
+
+    def _loop_stack(self) -> str:
+        frame = sys._current_frames().get(self._loop_thread_id or 0)
+        if frame is None:
+            return "  <loop thread not found>"
+        frames = traceback.extract_stack(frame)[-self._config.max_stack_frames :]
+        return "".join(traceback.format_list(frames)).rstrip()
@@ -2,20 +2,38 @@
 
 from __future__ import annotations
 
+import argparse
 import asyncio
 import logging
+from contextlib import suppress
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Awaitable, Sequence, TypeVar, cast
 
-from aiogram import Bot
+from .configuration import AppConfig, load_config, resolve_config_path
+from .startup import StartupTimer
 
-from .bot import create_bot, create_dispatcher
-from .configuration import load_config
-from .database import UsersRepository, create_pool, ensure_schema
-from .logging_config import configure_logging
-from .metrics import start_metrics_server
+if TYPE_CHECKING:
+    import asyncpg  # type: ignore[import-untyped]
+    from aiogram import Bot, Dispatcher
+
+    from .database import SwappablePool
+    from .loop_monitor import LoopMonitor
+    from .reload import ConfigReloader
+    from .shutdown import ShutdownCoordinator
+    from .spool import JoinRequestSpool
 
 LOGGER = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Upper bound for finishing pending log compression before the process exits.
+_LOG_MAINTENANCE_TIMEOUT = 5.0
+
+# How often prefork workers refresh their HTTP connection counts for the supervisor.
+_CONNECTION_GAUGE_INTERVAL = 5.0
+
 
 async def _notify_admin(bot: Bot, chat_id: int | None, message: str) -> None:
     if not chat_id:
@@ -30,23 +48,364 @@ async def _notify_admin(bot: Bot, chat_id: int | None, message: str) -> None:
         )
 
 
-async def _run_async(config_path: Path | None = None) -> None:
-    config = load_config(config_path)
-    configure_logging(config.logging)
-    if config.metrics.enabled:
-        start_metrics_server(config.metrics.host, config.metrics.port, logger=LOGGER)
+@dataclass
+class _Runtime:
+    """Resources created during bootstrap, released by :func:`_shutdown`."""
 
-    bot = create_bot(config)
-    dispatcher = create_dispatcher()
-    dispatcher.workflow_data.update({"config": config})
+    config: AppConfig
+    bots: list[Bot] = field(default_factory=list)
+    dispatcher: Dispatcher | None = None
+    pool: SwappablePool | None = None
+    spool: JoinRequestSpool | None = None
+    loop_monitor: LoopMonitor | None = None
+    shutdown: ShutdownCoordinator | None = None
+    worker: int | None = None
+    config_path: Path | None = None
+    reloader: ConfigReloader | None = None
+    tasks: list[asyncio.Task[None]] = field(default_factory=list)
+
+
+async def _open_database(config: AppConfig) -> tuple[asyncpg.Pool, bool]:
+    """Create the pool; return it together with whether the schema is ready.
+
+    With the spool enabled an unreachable database is not fatal: a lazy pool
+    is returned instead and schema creation is deferred to the first write.
+    """
+
+    from .database import create_pool, ensure_schema
 
-    pool = None
     try:
         pool = await create_pool(config.database)
-        await ensure_schema(pool)
-        dispatcher.workflow_data.update({"user_repository": UsersRepository(pool)})
-        LOGGER.info("Starting polling")
-        await dispatcher.start_polling(bot)
+    except Exception as exc:
+        if not config.spool.enabled:
+            raise
+        LOGGER.warning("Database unavailable at startup, spooling join requests: %s", exc)
+        return await create_pool(config.database, lazy=True), False
+    await ensure_schema(pool)
+    return pool, True
+
+
+async def _check_bots(bots: Sequence[Bot]) -> None:
+    """Validate every token with ``getMe``; aiogram caches the result for polling."""
+
+    users = await asyncio.gather(*(bot.me() for bot in bots))
+    for user in users:
+        LOGGER.info("Authorized as @%s (id=%s)", user.username, user.id)
+
+
+async def _build_search_indexes(pool: asyncpg.Pool) -> None:
+    """Build the /whois indexes in the background; until then searches scan ``users``."""
+
+    from .database import ensure_search_indexes
+
+    try:
+        await ensure_search_indexes(pool)
+    except Exception as exc:
+        LOGGER.warning("Failed to build the /whois search indexes: %s", exc)
+
+
+async def _prepare_deferred_schema(
+    runtime: _Runtime, pool: SwappablePool, *, build_indexes: bool
+) -> None:
+    """Create the schema once Postgres is back, then start the /whois index build."""
+
+    from .database import ensure_schema
+
+    await ensure_schema(pool)
+    if build_indexes:
+        runtime.tasks.append(asyncio.create_task(_build_search_indexes(pool.pool)))
+
+
+async def _open_spool(config: AppConfig) -> JoinRequestSpool | None:
+    if not config.spool.enabled:
+        return None
+    from .spool import JoinRequestSpool
+
+    spool = JoinRequestSpool(config.spool)
+    await spool.open()
+    return spool
+
+
+def _publish_config(runtime: _Runtime, config: AppConfig) -> None:
+    """Make a reloaded configuration visible to handlers and the runtime."""
+
+    runtime.config = config
+    if runtime.dispatcher is not None:
+        runtime.dispatcher.workflow_data["config"] = config
+
+
+async def _timed(timer: StartupTimer, name: str, awaitable: Awaitable[T]) -> T:
+    with timer.phase(name):
+        return await awaitable
+
+
+async def _bootstrap(
+    runtime: _Runtime, timer: StartupTimer, *, check_startup: bool = False
+) -> None:
+    """Create every runtime resource, overlapping the network-bound steps.
+
+    With ``check_startup`` the resources are created and timed, but nothing
+    with side effects outside the process starts: no metrics server, signal
+    handlers or background tasks, so the check can run next to a live bot.
+    """
+
+    config = runtime.config
+    serve = not check_startup
+    with timer.phase("imports"):
+        from .bot import create_bots, create_dispatcher
+        from .broadcast import Broadcaster
+        from .database import (
+            BroadcastsRepository,
+            InviteLinksRepository,
+            MediaFilesRepository,
+            PendingRequestsRepository,
+            ProcessedRequestsRepository,
+            SwappablePool,
+            UserLookupRepository,
+            UsersRepository,
+        )
+        from .dedup import JoinRequestDeduplicator
+        from .directory import UserDirectory
+        from .invites import InviteLinkScheduler
+        from .media import MediaRegistry
+        from .metrics import record_circuit_state, start_metrics_server
+        from .permissions import ChatAdminCache
+        from .prefork import process_config
+        from .reload import ConfigReloader
+        from .resilience import CircuitBreaker
+        from .review import ReviewQueue
+        from .shutdown import ShutdownCoordinator
+        from .spool import SpoolingUsersRepository
+
+    # Prefork workers leave /metrics to the supervisor, which aggregates them.
+    if serve and config.metrics.enabled and runtime.worker is None:
+        with timer.phase("metrics"):
+            from .debug_http import build_debug_routes
+
+            start_metrics_server(
+                config.metrics.host,
+                config.metrics.port,
+                logger=LOGGER,
+                routes=build_debug_routes(config.metrics),
+            )
+    if serve and config.metrics.enabled and config.metrics.memory.census_interval:
+        from .memory import run_object_census
+
+        runtime.tasks.append(
+            asyncio.create_task(
+                run_object_census(
+                    config.metrics.memory.census_types,
+                    config.metrics.memory.census_interval,
+                )
+            )
+        )
+
+    if serve and config.metrics.enabled and runtime.worker is not None:
+        from .session import run_connection_gauge
+
+        runtime.tasks.append(asyncio.create_task(run_connection_gauge(_CONNECTION_GAUGE_INTERVAL)))
+
+    if serve and config.loop_monitor.enabled:
+        from .loop_monitor import LoopMonitor
+
+        runtime.loop_monitor = LoopMonitor(config.loop_monitor)
+        runtime.loop_monitor.start()
+
+    with timer.phase("bots"):
+        runtime.bots = create_bots(config)
+
+    # Pool warm-up, schema verification, token checks and spool recovery are
+    # independent; run them concurrently and build the dispatcher meanwhile.
+    with timer.phase("connect"):
+        pending: list[asyncio.Task[Any]] = [
+            asyncio.create_task(_timed(timer, "database", _open_database(config))),
+            asyncio.create_task(_timed(timer, "get_me", _check_bots(runtime.bots))),
+            asyncio.create_task(_timed(timer, "spool", _open_spool(config))),
+        ]
+        await asyncio.sleep(0)
+        with timer.phase("dispatcher"):
+            runtime.shutdown = ShutdownCoordinator(config.shutdown)
+            dispatcher = create_dispatcher(
+                config, shutdown=runtime.shutdown, config_source=lambda: runtime.config
+            )
+            dispatcher.workflow_data.update({"config": config})
+            runtime.dispatcher = dispatcher
+        database, bots_checked, spool = await asyncio.gather(*pending, return_exceptions=True)
+    if not isinstance(database, BaseException):
+        runtime.pool = SwappablePool(database[0])
+    if not isinstance(spool, BaseException):
+        runtime.spool = spool
+    for outcome in (database, bots_checked, spool):
+        if isinstance(outcome, BaseException):
+            raise outcome
+    schema_ready = cast("tuple[asyncpg.Pool, bool]", database)[1]
+    pool = cast("SwappablePool", runtime.pool)
+
+    with timer.phase("wiring"):
+        # Index builds on a large users table take a while; one process is enough.
+        build_indexes = serve and runtime.worker in (None, 0)
+        breaker = CircuitBreaker(
+            "database", config.database.breaker, on_state_change=record_circuit_state
+        )
+        users_repository = UsersRepository(pool)
+        if runtime.spool is not None:
+            spooling_repository = SpoolingUsersRepository(
+                users_repository,
+                runtime.spool,
+                breaker,
+                call_timeout=config.database.call_timeout,
+                config=config.spool,
+                prepare=(
+                    None
+                    if schema_ready
+                    else partial(
+                        _prepare_deferred_schema, runtime, pool, build_indexes=build_indexes
+                    )
+                ),
+            )
+            if serve:
+                runtime.tasks.append(asyncio.create_task(spooling_repository.run_replay()))
+            dispatcher.workflow_data.update({"user_repository": spooling_repository})
+        else:
+            dispatcher.workflow_data.update({"user_repository": users_repository})
+        if config.dedup.enabled:
+            dedup_repository = (
+                ProcessedRequestsRepository(pool) if config.dedup.persistent else None
+            )
+            dedup = JoinRequestDeduplicator(
+                config.dedup,
+                dedup_repository,
+                breaker=breaker,
+                call_timeout=config.database.call_timeout,
+            )
+            dispatcher.workflow_data.update({"join_request_dedup": dedup})
+        invite_scheduler = InviteLinkScheduler(InviteLinksRepository(pool), runtime.bots, config)
+        if serve:
+            runtime.tasks.append(asyncio.create_task(invite_scheduler.run()))
+        dispatcher.workflow_data.update({"invite_scheduler": invite_scheduler})
+        media_registry = MediaRegistry(config.media, MediaFilesRepository(pool))
+        if serve:
+            runtime.tasks.append(media_registry.start(runtime.bots))
+        dispatcher.workflow_data.update({"media_registry": media_registry})
+        broadcaster = Broadcaster(BroadcastsRepository(pool), runtime.bots, config)
+        if serve:
+            runtime.tasks.append(asyncio.create_task(broadcaster.run()))
+        dispatcher.workflow_data.update({"broadcaster": broadcaster})
+        dispatcher.workflow_data.update({"chat_admins": ChatAdminCache(config.permissions)})
+        user_directory = UserDirectory(UserLookupRepository(pool), config.whois)
+        dispatcher.workflow_data.update({"user_directory": user_directory})
+        review_queue = ReviewQueue(
+            PendingRequestsRepository(pool),
+            config.review,
+            users=users_repository,
+            labels={
+                bot.id: profile.label
+                for bot, profile in zip(runtime.bots, config.telegram.profiles(), strict=True)
+            },
+        )
+        if serve:
+            runtime.tasks.append(asyncio.create_task(review_queue.run()))
+        dispatcher.workflow_data.update({"review_queue": review_queue})
+        if build_indexes and schema_ready:
+            runtime.tasks.append(asyncio.create_task(_build_search_indexes(pool.pool)))
+
+    if serve:
+        reloader = ConfigReloader(
+            resolve_config_path(runtime.config_path),
+            config,
+            pool=pool,
+            transform=(
+                None
+                if runtime.worker is None
+                else partial(process_config, name=f"worker-{runtime.worker}")
+            ),
+        )
+        reloader.subscribe(partial(_publish_config, runtime))
+        reloader.subscribe(invite_scheduler.update_config)
+        reloader.subscribe(broadcaster.update_config)
+        reloader.install_signal_handler()
+        if config.reload.watch:
+            runtime.tasks.append(asyncio.create_task(reloader.watch(config.reload.watch_interval)))
+        runtime.reloader = reloader
+
+
+async def _serve(runtime: _Runtime) -> None:
+    dispatcher = runtime.dispatcher
+    assert dispatcher is not None  # noqa: S101 - guaranteed by _bootstrap
+    if runtime.shutdown is not None:
+        await runtime.shutdown.redeliver(dispatcher, runtime.bots)
+    webhook = runtime.config.telegram.webhook
+    if webhook.enabled:
+        from .webhook import run_webhook
+
+        await run_webhook(
+            dispatcher,
+            runtime.bots,
+            webhook,
+            reuse_port=runtime.worker is not None,
+            register=runtime.worker in (None, 0),
+            drain=runtime.shutdown.drain if runtime.shutdown else None,
+        )
+    else:
+        LOGGER.info("Starting polling for %s bot(s)", len(runtime.bots))
+        # Sessions stay open so in-flight handlers can finish during the drain.
+        await dispatcher.start_polling(*runtime.bots, close_bot_session=False)
+
+
+async def _shutdown(runtime: _Runtime) -> None:
+    """Drain in-flight updates, flush buffered writers, then release resources."""
+
+    if runtime.reloader is not None:
+        runtime.reloader.remove_signal_handler()
+    if runtime.shutdown is not None:
+        await runtime.shutdown.drain()
+        await runtime.shutdown.save_abandoned()
+    for task in runtime.tasks:
+        task.cancel()
+    for task in runtime.tasks:
+        with suppress(asyncio.CancelledError):
+            await task
+    if runtime.loop_monitor is not None:
+        await runtime.loop_monitor.stop()
+    if runtime.spool is not None:
+        await runtime.spool.close()
+    if runtime.pool is not None:
+        await runtime.pool.close()
+    if runtime.bots:
+        # All bots share one session, closing it once releases every connection.
+        await runtime.bots[0].session.close()
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+    from .logging_config import wait_for_log_maintenance
+
+    await asyncio.to_thread(wait_for_log_maintenance, _LOG_MAINTENANCE_TIMEOUT)
+
+
+async def _run_async(
+    config: AppConfig,
+    timer: StartupTimer,
+    *,
+    check_startup: bool = False,
+    report_json: bool = False,
+    worker: int | None = None,
+    config_path: Path | None = None,
+) -> None:
+    with timer.phase("logging"):
+        from .logging_config import configure_logging
+
+        configure_logging(config.logging)
+
+    runtime = _Runtime(config=config, worker=worker, config_path=config_path)
+    try:
+        await _bootstrap(runtime, timer, check_startup=check_startup)
+        from .metrics import record_startup_phases
+
+        record_startup_phases(timer.phases, timer.total)
+        LOGGER.info("Startup finished in %.3fs", timer.total)
+        if check_startup:
+            print(timer.to_json() if report_json else timer.render())
+            return
+        await _serve(runtime)
     except asyncio.CancelledError:
         raise
     except Exception as exc:
@@ -54,28 +413,129 @@ async def _run_async(config_path: Path | None = None) -> None:
             "Bot runtime stopped due to an exception",
             exc_info=(type(exc), exc, exc.__traceback__),
         )
-        await _notify_admin(
-            bot,
-            config.telegram.admin_chat_id,
-            f"Bot runtime stopped due to an error:\n{type(exc).__name__}: {exc}",
-        )
+        if not check_startup:
+            for bot, profile in zip(runtime.bots, config.telegram.profiles(), strict=False):
+                await _notify_admin(
+                    bot,
+                    profile.admin_chat_id,
+                    f"Bot runtime stopped due to an error:\n{type(exc).__name__}: {exc}",
+                )
         raise
     finally:
-        if pool is not None:
-            await pool.close()
-        await bot.session.close()
+        await _shutdown(runtime)
+
+
+def main(
+    config_path: str | None = None,
+    *,
+    check_startup: bool = False,
+    report_json: bool = False,
+    workers: int | None = None,
+    worker: int | None = None,
+) -> None:
+    """Entrypoint for synchronous execution.
 
+    With more than one worker (``workers`` or ``telegram.webhook.workers``)
+    this process becomes the prefork supervisor; ``worker`` is the index
+    passed to each spawned worker.
+    """
 
-def main(config_path: str | None = None) -> None:
-    """Entrypoint for synchronous execution."""
+    timer = StartupTimer()
+    with timer.phase("config"):
+        config = load_config(Path(config_path) if config_path else None)
+    worker_count = workers or config.telegram.webhook.workers
+    if worker is None and worker_count > 1 and not check_startup:
+        from .prefork import run_prefork
+
+        run_prefork(config_path, config, worker_count)
+        return
+    if worker is not None:
+        from .prefork import process_config
+
+        config = process_config(config, f"worker-{worker}")
 
     try:
-        asyncio.run(_run_async(Path(config_path) if config_path else None))
+        asyncio.run(
+            _run_async(
+                config,
+                timer,
+                check_startup=check_startup,
+                report_json=report_json,
+                worker=worker,
+                config_path=Path(config_path) if config_path else None,
+            )
+        )
     except KeyboardInterrupt:  # pragma: no cover - CLI nicety
         LOGGER.info("Bot stopped via keyboard interrupt")
 
 
-def entrypoint() -> None:
+def _parse_args(argv: Sequence[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="start-bot", description="Run the group inviter bot.")
+    parser.add_argument(
+        "--config",
+        default=None,
+        help="path to config.yaml (defaults to $GROUP_INVITER_CONFIG or config/config.yaml)",
+    )
+    parser.add_argument(
+        "--check-startup",
+        action="store_true",
+        help="bootstrap every resource, print per-phase startup timings and exit",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="print --check-startup timings as JSON",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="number of prefork webhook worker processes (overrides telegram.webhook.workers)",
+    )
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    import_parser = commands.add_parser(
+        "import", help="bulk-load members from a CSV file into the users table"
+    )
+    import_parser.add_argument("csv", type=Path, help="CSV file with a telegram_id column")
+    import_parser.add_argument(
+        "--config", default=argparse.SUPPRESS, help="path to config.yaml (same as above)"
+    )
+    import_parser.add_argument(
+        "--chat-id",
+        type=int,
+        default=None,
+        help="joined_chat_id for rows that do not carry one",
+    )
+    import_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=10_000,
+        help="rows read from the file per batch (bounds memory use)",
+    )
+    return parser.parse_args(argv)
+
+
+def _import(args: argparse.Namespace) -> None:
+    from .importer import run_import
+    from .logging_config import configure_logging
+
+    config = load_config(Path(args.config) if args.config else None)
+    configure_logging(config.logging)
+    asyncio.run(
+        run_import(config, args.csv, chat_id=args.chat_id, batch_size=max(args.batch_size, 1))
+    )
+
+
+def entrypoint(argv: Sequence[str] | None = None) -> None:
     """Console script wrapper expected by pyproject."""
 
-    main()
+    args = _parse_args(argv)
+    if args.command == "import":
+        _import(args)
+        return
+    main(
+        args.config,
+        check_startup=args.check_startup,
+        report_json=args.json,
+        workers=args.workers,
+    )
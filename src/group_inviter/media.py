@@ -0,0 +1,173 @@
+"""Registry of local media assets and the file_ids Telegram assigned to them."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Mapping, Sequence
+
+from .configuration import MediaConfig
+from .database import MediaFileRecord, MediaFilesRepository
+from .metrics import record_media_upload
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+    from aiogram.types import Message
+
+LOGGER = logging.getLogger(__name__)
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        while chunk := fh.read(_HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _hash_assets(assets: Mapping[str, Path]) -> dict[str, str]:
+    hashes: dict[str, str] = {}
+    for name, path in assets.items():
+        try:
+            hashes[name] = _hash_file(path)
+        except OSError as exc:
+            LOGGER.warning("Media asset %r is unavailable: %s", name, exc)
+    return hashes
+
+
+def _is_invalid_file_id(exc: Exception) -> bool:
+    return "file identifier" in str(exc).lower()
+
+
+class MediaRegistry:
+    """Send configured assets by ``file_id``, uploading each one once per bot.
+
+    File ids are bot-specific, so the cache is keyed by bot id and asset
+    name, kept in memory and mirrored to the ``media_files`` table. Every
+    entry carries the SHA-256 of the file it was uploaded from: replacing
+    the file (or pointing the asset at another one) triggers a fresh
+    upload. A ``wrong file identifier`` error drops the entry and re-uploads
+    transparently.
+    """
+
+    def __init__(self, config: MediaConfig, repository: MediaFilesRepository | None = None) -> None:
+        self._config = config
+        self._repository = repository
+        self._hashes: dict[str, str] = {}
+        self._file_ids: dict[tuple[int, str], MediaFileRecord] = {}
+        self._stale: dict[tuple[int, str], str] = {}
+        self._locks: dict[tuple[int, str], asyncio.Lock] = {}
+        self._preparing: asyncio.Task[None] | None = None
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._config.assets
+
+    def file_id(self, bot_id: int, name: str) -> str | None:
+        record = self._file_ids.get((bot_id, name))
+        return None if record is None else record.file_id
+
+    def start(self, bots: Sequence[Bot]) -> asyncio.Task[None]:
+        """Run :meth:`prepare` in the background; sends wait for it."""
+
+        self._preparing = asyncio.create_task(self.prepare(bots))
+        return self._preparing
+
+    async def prepare(self, bots: Sequence[Bot]) -> None:
+        """Hash the assets, load cached file ids and drop invalid ones."""
+
+        self._hashes = await asyncio.to_thread(_hash_assets, self._config.assets)
+        if self._repository is None:
+            return
+        try:
+            records = await self._repository.load()
+        except Exception as exc:
+            LOGGER.warning("Failed to load cached media file ids: %s", exc)
+            return
+        for record in records:
+            key = (record.bot_id, record.name)
+            if self._hashes.get(record.name) == record.content_hash:
+                self._file_ids[key] = record
+            else:
+                self._stale[key] = "changed"
+        if self._config.validate_on_startup:
+            await self._validate(bots)
+        LOGGER.info("Loaded %s cached media file id(s)", len(self._file_ids))
+
+    async def _validate(self, bots: Sequence[Bot]) -> None:
+        from aiogram.exceptions import TelegramBadRequest
+
+        by_id = {bot.id: bot for bot in bots}
+        for key, record in list(self._file_ids.items()):
+            bot = by_id.get(record.bot_id)
+            if bot is None:
+                continue
+            try:
+                await bot.get_file(record.file_id)
+            except TelegramBadRequest as exc:
+                LOGGER.warning("Cached file id of %r is no longer valid: %s", record.name, exc)
+                await self._discard(key, record)
+            except Exception as exc:  # pragma: no cover - network errors
+                LOGGER.debug("Could not validate file id of %r: %s", record.name, exc)
+
+    async def _discard(self, key: tuple[int, str], record: MediaFileRecord) -> None:
+        if self._file_ids.get(key) is not record:
+            return  # already replaced by a concurrent upload
+        del self._file_ids[key]
+        self._stale[key] = "invalid"
+        if self._repository is not None:
+            try:
+                await self._repository.forget(*key)
+            except Exception as exc:  # pragma: no cover - database errors
+                LOGGER.warning("Failed to forget file id of %r: %s", record.name, exc)
+
+    async def send_photo(self, bot: Bot, chat_id: int, name: str, **kwargs: Any) -> Message:
+        """Send asset ``name`` as a photo, uploading it if ``bot`` has no file id yet."""
+
+        from aiogram.exceptions import TelegramBadRequest
+
+        if self._preparing is not None and not self._preparing.done():
+            await asyncio.shield(self._preparing)
+        key = (bot.id, name)
+        record = self._file_ids.get(key)
+        if record is not None:
+            try:
+                return await bot.send_photo(chat_id, photo=record.file_id, **kwargs)
+            except TelegramBadRequest as exc:
+                if not _is_invalid_file_id(exc):
+                    raise
+                LOGGER.warning("File id of %r was rejected, uploading again: %s", name, exc)
+                await self._discard(key, record)
+
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            current = self._file_ids.get(key)
+            if current is not None:  # uploaded while this call waited for the lock
+                return await bot.send_photo(chat_id, photo=current.file_id, **kwargs)
+            return await self._upload(bot, chat_id, name, **kwargs)
+
+    async def _upload(self, bot: Bot, chat_id: int, name: str, **kwargs: Any) -> Message:
+        from aiogram.types import FSInputFile
+
+        path = self._config.assets[name]
+        content_hash = self._hashes.get(name)
+        if content_hash is None:
+            content_hash = await asyncio.to_thread(_hash_file, path)
+        message = await bot.send_photo(chat_id, photo=FSInputFile(path), **kwargs)
+        key = (bot.id, name)
+        record_media_upload(self._stale.pop(key, "missing"))
+        if not message.photo:  # pragma: no cover - Telegram always returns sizes
+            return message
+        record = MediaFileRecord(
+            bot_id=bot.id, name=name, content_hash=content_hash, file_id=message.photo[-1].file_id
+        )
+        self._file_ids[key] = record
+        LOGGER.info("Uploaded media asset %r for bot %s", name, bot.id)
+        if self._repository is not None:
+            try:
+                await self._repository.save(record)
+            except Exception as exc:
+                LOGGER.warning("Failed to store file id of %r: %s", name, exc)
+        return message
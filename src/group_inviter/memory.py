@@ -0,0 +1,121 @@
+"""Memory diagnostics: tracemalloc snapshots and live object census."""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+import logging
+import threading
+import tracemalloc
+from collections import Counter, OrderedDict
+from typing import Iterable
+
+from .metrics import set_live_objects
+
+LOGGER = logging.getLogger(__name__)
+
+_IGNORED_FILES = (
+    tracemalloc.__file__,
+    "<frozen importlib._bootstrap>",
+    "<frozen importlib._bootstrap_external>",
+    "<unknown>",
+)
+
+
+class SnapshotNotFoundError(KeyError):
+    """Raised when a named snapshot does not exist."""
+
+
+class TracemallocController:
+    """Start/stop tracemalloc and keep a bounded set of named snapshots."""
+
+    def __init__(self, *, max_snapshots: int, frames: int) -> None:
+        self._max_snapshots = max_snapshots
+        self._frames = frames
+        self._snapshots: OrderedDict[str, tracemalloc.Snapshot] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int | None = None) -> str:
+        if tracemalloc.is_tracing():
+            return "tracemalloc is already tracing\n"
+        tracemalloc.start(frames or self._frames)
+        return f"tracemalloc started with {tracemalloc.get_traceback_limit()} frame(s)\n"
+
+    def stop(self) -> str:
+        """Stop tracing; snapshots stay available until replaced."""
+
+        if not tracemalloc.is_tracing():
+            return "tracemalloc is not tracing\n"
+        tracemalloc.stop()
+        return "tracemalloc stopped\n"
+
+    def snapshot(self, name: str) -> str:
+        if not tracemalloc.is_tracing():
+            msg = "tracemalloc is not tracing, start it first"
+            raise RuntimeError(msg)
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, pattern) for pattern in _IGNORED_FILES]
+        )
+        with self._lock:
+            self._snapshots[name] = snapshot
+            self._snapshots.move_to_end(name)
+            while len(self._snapshots) > self._max_snapshots:
+                self._snapshots.popitem(last=False)
+        return (
+            f"snapshot '{name}' taken: traced={current / 1024:.1f} KiB "
+            f"peak={peak / 1024:.1f} KiB\n"
+        )
+
+    def names(self) -> list[str]:
+        with self._lock:
+            return list(self._snapshots)
+
+    def top(self, name: str, *, limit: int, group_by: str = "lineno") -> str:
+        stats = self._get(name).statistics(group_by)
+        return _render(f"top {limit} allocation sites in '{name}'", stats[:limit])
+
+    def diff(self, base: str, name: str, *, limit: int, group_by: str = "lineno") -> str:
+        stats = self._get(name).compare_to(self._get(base), group_by)
+        return _render(f"top {limit} changes from '{base}' to '{name}'", stats[:limit])
+
+    def _get(self, name: str) -> tracemalloc.Snapshot:
+        with self._lock:
+            try:
+                return self._snapshots[name]
+            except KeyError:
+                raise SnapshotNotFoundError(name) from None
+
+
+def _render(title: str, stats: Iterable[tracemalloc.Statistic | tracemalloc.StatisticDiff]) -> str:
+    lines = [title]
+    lines.extend(str(stat) for stat in stats)
+    return "\n".join(lines) + "\n"
+
+
+def count_live_objects(type_names: Iterable[str]) -> dict[str, int]:
+    """Count objects tracked by the GC whose qualified type name is requested."""
+
+    wanted = set(type_names)
+    counts: Counter[str] = Counter()
+    for obj in gc.get_objects():
+        cls = type(obj)
+        qualified = f"{cls.__module__}.{cls.__qualname__}"
+        if qualified in wanted:
+            counts[qualified] += 1
+    return {name: counts.get(name, 0) for name in wanted}
+
+
+async def run_object_census(type_names: list[str], interval: float) -> None:
+    """Publish live object counts for ``type_names`` every ``interval`` seconds."""
+
+    while True:
+        counts = await asyncio.to_thread(count_live_objects, type_names)
+        for type_name, count in counts.items():
+            set_live_objects(type_name, count)
+        LOGGER.debug("Live object census: %s", counts)
+        await asyncio.sleep(interval)
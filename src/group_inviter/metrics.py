@@ -3,9 +3,23 @@
 from __future__ import annotations
 
 import logging
-from threading import Lock
+from threading import Lock, Thread
+from typing import Any, Callable, Iterable, Iterator, Mapping
+from wsgiref.simple_server import WSGIRequestHandler, make_server
 
-from prometheus_client import Counter, start_http_server
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    make_wsgi_app,
+    multiprocess,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.exposition import ThreadingWSGIServer
+from prometheus_client.registry import Collector
 
 LOGGER = logging.getLogger(__name__)
 
@@ -15,40 +29,429 @@ _SERVER_LOCK = Lock()
 START_HANDLER_CALLS = Counter(
     "group_inviter_start_handler_calls_total",
     "Number of times the /start handler has been executed.",
-    ("user_id",),
+    ("bot", "user_id"),
 )
 
 APPROVED_JOIN_REQUESTS = Counter(
     "group_inviter_join_requests_approved_total",
     "Number of chat join requests approved by the bot.",
-    ("user_id",),
+    ("bot", "user_id"),
 )
 
 UNHANDLED_UPDATES = Counter(
     "group_inviter_updates_unhandled_total",
     "Number of updates that were not processed by any handler.",
+    ("bot",),
+)
+
+DUPLICATES_SKIPPED = Counter(
+    "group_inviter_duplicates_skipped_total",
+    "Number of redelivered updates or repeated join requests that were skipped.",
+    ("bot", "kind"),
+)
+
+SPOOLED_JOIN_REQUESTS = Gauge(
+    "group_inviter_spooled_join_requests",
+    "Number of join request records waiting in the disk spool for replay.",
+    multiprocess_mode="livesum",
+)
+
+CIRCUIT_STATE = Gauge(
+    "group_inviter_circuit_state",
+    "Circuit breaker state (0 = closed, 1 = half-open, 2 = open).",
+    ("circuit",),
+    multiprocess_mode="max",
+)
+
+BOT_API_SHED_REQUESTS = Counter(
+    "group_inviter_bot_api_shed_total",
+    "Number of non-critical Bot API calls rejected while the circuit was open.",
+    ("bot", "method"),
+)
+
+BOT_API_FAILURES = Counter(
+    "group_inviter_bot_api_failures_total",
+    "Number of Bot API calls that failed due to timeouts or service errors.",
+    ("bot", "method", "reason"),
+)
+
+HTTP_CONNECT_SECONDS = Histogram(
+    "group_inviter_http_connect_seconds",
+    "Time spent establishing new connections to the Bot API.",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+LIVE_OBJECTS = Gauge(
+    "group_inviter_live_objects",
+    "Number of live objects of selected types tracked by the garbage collector.",
+    ("type",),
+    multiprocess_mode="livesum",
+)
+
+LOOP_LAG_SECONDS = Histogram(
+    "group_inviter_event_loop_lag_seconds",
+    "Delay between when a monitor tick was scheduled and when it ran.",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+LOOP_STALLS = Counter(
+    "group_inviter_event_loop_stalls_total",
+    "Number of times the event loop was blocked longer than the slow-callback threshold.",
+)
+
+DRAINED_UPDATES = Counter(
+    "group_inviter_shutdown_updates_total",
+    "In-flight updates seen by the shutdown drain, by outcome (drained or abandoned).",
+    ("outcome",),
+)
+
+STARTUP_PHASE_SECONDS = Gauge(
+    "group_inviter_startup_phase_seconds",
+    "Duration of each startup phase of the current process.",
+    ("phase",),
+    multiprocess_mode="max",
+)
+
+INVITE_LINK_EVENTS = Counter(
+    "group_inviter_invite_links_total",
+    "Managed invite link lifecycle events (expired, usage, rotated, rotation_failed).",
+    ("bot", "event"),
+)
+
+MEDIA_UPLOADS = Counter(
+    "group_inviter_media_uploads_total",
+    "Uploads of local media assets, by reason (missing, changed or invalid file_id).",
+    ("reason",),
 )
 
+CONFIG_RELOADS = Counter(
+    "group_inviter_config_reloads_total",
+    "Configuration reload attempts, by outcome (success or failure).",
+    ("outcome",),
+)
 
-def start_metrics_server(host: str, port: int, *, logger: logging.Logger | None = None) -> None:
-    """Expose Prometheus metrics if not already running."""
+CONFIG_RELOAD_SECONDS = Histogram(
+    "group_inviter_config_reload_seconds",
+    "Time taken to re-read, validate and apply the configuration file.",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+BROADCAST_MESSAGES = Counter(
+    "group_inviter_broadcast_messages_total",
+    "Broadcast deliveries, by outcome (sent, blocked, failed).",
+    ("bot", "outcome"),
+)
+
+CHAT_ADMIN_LOOKUPS = Counter(
+    "group_inviter_chat_admin_lookups_total",
+    "Chat administrator lookups, by cache result (hit, miss).",
+    ("result",),
+)
+
+WHOIS_SECONDS = Histogram(
+    "group_inviter_whois_seconds",
+    "Duration of /whois lookups, by source (cache, database).",
+    ("source",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+REVIEW_EVENTS = Counter(
+    "group_inviter_review_requests_total",
+    "Join requests held for review and their outcomes (held, approved, declined, gone, failed).",
+    ("bot", "event"),
+)
+
+UPDATE_DELIVERY_LAG_SECONDS = Histogram(
+    "group_inviter_update_delivery_lag_seconds",
+    "Time between the date Telegram stamped on an update and its receipt by the bot.",
+    ("bot", "update_type"),
+    buckets=(0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0),
+)
+
+UPDATE_STAGE_SECONDS = Histogram(
+    "group_inviter_update_stage_seconds",
+    "Time from the previous handling stage of an update to the given one "
+    "(handler, dm_sent, approved, persisted, done).",
+    ("update_type", "stage"),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+ConnectionCountsSource = Callable[[], Callable[[], tuple[int, int]] | None]
+
+
+class _ConnectionPoolCollector(Collector):
+    """Report active and idle HTTP connections of registered sessions."""
+
+    def __init__(self) -> None:
+        self._sources: list[ConnectionCountsSource] = []
+
+    def add(self, source: ConnectionCountsSource) -> None:
+        self._sources.append(source)
+
+    def counts(self) -> tuple[int, int]:
+        """Sum ``(active, idle)`` over live sessions, forgetting closed ones."""
+
+        active = idle = 0
+        live_sources: list[ConnectionCountsSource] = []
+        for source in self._sources:
+            counts = source()
+            if counts is None:
+                continue
+            live_sources.append(source)
+            source_active, source_idle = counts()
+            active += source_active
+            idle += source_idle
+        self._sources = live_sources
+        return active, idle
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        active, idle = self.counts()
+        family = GaugeMetricFamily(
+            "group_inviter_http_connections",
+            "Bot API HTTP connections by state.",
+            labels=("state",),
+        )
+        family.add_metric(("active",), active)
+        family.add_metric(("idle",), idle)
+        yield family
+
+
+_CONNECTION_POOLS = _ConnectionPoolCollector()
+REGISTRY.register(_CONNECTION_POOLS)
+
+# Prefork workers copy the counts into this gauge, which the supervisor sums
+# across live workers. It stays out of REGISTRY, where the collector reports.
+_SHARED_HTTP_CONNECTIONS = Gauge(
+    "group_inviter_http_connections",
+    "Bot API HTTP connections by state.",
+    ("state",),
+    multiprocess_mode="livesum",
+    registry=None,
+)
+
+
+WsgiApp = Callable[[dict[str, Any], Callable[..., Any]], Iterable[bytes]]
+
+
+class _QuietHandler(WSGIRequestHandler):
+    """WSGI handler that does not log every request to stderr."""
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Log nothing."""
+
+
+def _route(metrics_app: WsgiApp, routes: Mapping[str, WsgiApp]) -> WsgiApp:
+    def app(environ: dict[str, Any], start_response: Callable[..., Any]) -> Iterable[bytes]:
+        handler = routes.get(environ.get("PATH_INFO", ""), metrics_app)
+        return handler(environ, start_response)
+
+    return app
+
+
+def start_metrics_server(
+    host: str,
+    port: int,
+    *,
+    logger: logging.Logger | None = None,
+    routes: Mapping[str, WsgiApp] | None = None,
+) -> None:
+    """Expose Prometheus metrics if not already running.
+
+    ``routes`` mounts extra WSGI applications (debug endpoints) next to
+    ``/metrics``; any other path serves the metrics page as before.
+    """
 
     global _SERVER_STARTED
     with _SERVER_LOCK:
         if _SERVER_STARTED:
             return
-        start_http_server(port, addr=host)
+        if routes:
+            httpd = make_server(
+                host,
+                port,
+                _route(make_wsgi_app(), routes),
+                ThreadingWSGIServer,
+                handler_class=_QuietHandler,
+            )
+            Thread(target=httpd.serve_forever, name="metrics-server", daemon=True).start()
+        else:
+            start_http_server(port, addr=host)
         _SERVER_STARTED = True
     (logger or LOGGER).info("Metrics server listening on %s:%s", host, port)
 
 
-def record_join_request_approval(user_id: int) -> None:
+def start_multiprocess_metrics_server(
+    host: str, port: int, *, logger: logging.Logger | None = None
+) -> None:
+    """Expose metrics aggregated across prefork workers.
+
+    Requires ``PROMETHEUS_MULTIPROC_DIR`` to be set before this module is
+    imported, in the supervisor and in every worker.
+    """
+
+    global _SERVER_STARTED
+    with _SERVER_LOCK:
+        if _SERVER_STARTED:
+            return
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+        start_http_server(port, addr=host, registry=registry)
+        _SERVER_STARTED = True
+    (logger or LOGGER).info("Multiprocess metrics server listening on %s:%s", host, port)
+
+
+def mark_worker_dead(pid: int) -> None:
+    """Drop live gauges of an exited worker from the aggregated view."""
+
+    multiprocess.mark_process_dead(pid)  # type: ignore[no-untyped-call]
+
+
+def record_join_request_approval(user_id: int, *, bot: str) -> None:
     """Increment join approval metric for the given user."""
 
-    APPROVED_JOIN_REQUESTS.labels(user_id=str(user_id)).inc()
+    APPROVED_JOIN_REQUESTS.labels(bot=bot, user_id=str(user_id)).inc()
 
 
-def record_unhandled_update() -> None:
+def record_unhandled_update(bot: str) -> None:
     """Increment counter for unhandled updates."""
 
-    UNHANDLED_UPDATES.inc()
+    UNHANDLED_UPDATES.labels(bot=bot).inc()
+
+
+def record_duplicate(kind: str, *, bot: str) -> None:
+    """Increment counter for skipped duplicates of the given kind."""
+
+    DUPLICATES_SKIPPED.labels(bot=bot, kind=kind).inc()
+
+
+def set_spool_size(size: int) -> None:
+    """Publish the number of spooled join request records."""
+
+    SPOOLED_JOIN_REQUESTS.set(size)
+
+
+def record_circuit_state(name: str, state: int) -> None:
+    """Publish the current state of a circuit breaker."""
+
+    CIRCUIT_STATE.labels(circuit=name).set(state)
+
+
+def record_bot_api_shed(method: str, *, bot: str) -> None:
+    """Increment counter for shed Bot API calls."""
+
+    BOT_API_SHED_REQUESTS.labels(bot=bot, method=method).inc()
+
+
+def record_bot_api_failure(method: str, reason: str, *, bot: str) -> None:
+    """Increment counter for failed Bot API calls."""
+
+    BOT_API_FAILURES.labels(bot=bot, method=method, reason=reason).inc()
+
+
+def observe_http_connect(seconds: float) -> None:
+    """Record how long opening a Bot API connection took."""
+
+    HTTP_CONNECT_SECONDS.observe(seconds)
+
+
+def register_connection_pool(source: ConnectionCountsSource) -> None:
+    """Expose connection counts of a session; ``source`` may return None once gone."""
+
+    _CONNECTION_POOLS.add(source)
+
+
+def publish_connection_counts() -> None:
+    """Copy the connection counts into the gauge aggregated by the prefork supervisor."""
+
+    active, idle = _CONNECTION_POOLS.counts()
+    _SHARED_HTTP_CONNECTIONS.labels(state="active").set(active)
+    _SHARED_HTTP_CONNECTIONS.labels(state="idle").set(idle)
+
+
+def set_live_objects(type_name: str, count: int) -> None:
+    """Publish the live object count for a type."""
+
+    LIVE_OBJECTS.labels(type=type_name).set(count)
+
+
+def observe_loop_lag(seconds: float) -> None:
+    """Record event loop scheduling lag."""
+
+    LOOP_LAG_SECONDS.observe(seconds)
+
+
+def record_loop_stall() -> None:
+    """Increment counter for detected event loop stalls."""
+
+    LOOP_STALLS.inc()
+
+
+def record_startup_phases(phases: Mapping[str, float], total: float) -> None:
+    """Publish startup phase durations of the current process."""
+
+    for phase, seconds in phases.items():
+        STARTUP_PHASE_SECONDS.labels(phase=phase).set(seconds)
+    STARTUP_PHASE_SECONDS.labels(phase="total").set(total)
+
+
+def record_drain(drained: int, abandoned: int) -> None:
+    """Count updates finished or cancelled during the shutdown drain."""
+
+    DRAINED_UPDATES.labels(outcome="drained").inc(drained)
+    DRAINED_UPDATES.labels(outcome="abandoned").inc(abandoned)
+
+
+def record_invite_link_event(event: str, *, bot: str) -> None:
+    """Increment counter for a managed invite link revocation or rotation."""
+
+    INVITE_LINK_EVENTS.labels(bot=bot, event=event).inc()
+
+
+def record_media_upload(reason: str) -> None:
+    """Increment counter for a media asset upload."""
+
+    MEDIA_UPLOADS.labels(reason=reason).inc()
+
+
+def record_config_reload(outcome: str, seconds: float) -> None:
+    """Count a configuration reload and record how long it took."""
+
+    CONFIG_RELOADS.labels(outcome=outcome).inc()
+    CONFIG_RELOAD_SECONDS.observe(seconds)
+
+
+def record_broadcast_messages(outcome: str, count: int = 1, *, bot: str) -> None:
+    """Count broadcast deliveries with the given outcome."""
+
+    BROADCAST_MESSAGES.labels(bot=bot, outcome=outcome).inc(count)
+
+
+def record_chat_admin_lookup(result: str) -> None:
+    """Count a chat administrator lookup answered from cache or the Bot API."""
+
+    CHAT_ADMIN_LOOKUPS.labels(result=result).inc()
+
+
+def record_whois_lookup(source: str, seconds: float) -> None:
+    """Observe how long a /whois lookup took and where it was answered."""
+
+    WHOIS_SECONDS.labels(source=source).observe(seconds)
+
+
+def record_review_event(event: str, count: int = 1, *, bot: str) -> None:
+    """Count join requests held for review or resolved from the queue."""
+
+    REVIEW_EVENTS.labels(bot=bot, event=event).inc(count)
+
+
+def record_update_delivery_lag(update_type: str, seconds: float, *, bot: str) -> None:
+    """Observe how late an update arrived relative to its Telegram date."""
+
+    UPDATE_DELIVERY_LAG_SECONDS.labels(bot=bot, update_type=update_type).observe(seconds)
+
+
+def record_update_stages(update_type: str, deltas: Iterable[tuple[str, float]]) -> None:
+    """Observe the time each handling stage of an update took."""
+
+    for stage, seconds in deltas:
+        UPDATE_STAGE_SECONDS.labels(update_type=update_type, stage=stage).observe(seconds)
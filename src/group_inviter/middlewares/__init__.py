@@ -2,6 +2,20 @@
 
 from __future__ import annotations
 
+from .config import ConfigMiddleware
+from .handler_tracking import HandlerTrackingMiddleware
+from .in_flight import InFlightMiddleware
+from .log_context import LogContextMiddleware
+from .timing import UpdateTimingMiddleware
+from .update_dedup import UpdateDedupMiddleware
 from .update_dump import UpdateDumpMiddleware
 
-__all__ = ["UpdateDumpMiddleware"]
+__all__ = [
+    "ConfigMiddleware",
+    "HandlerTrackingMiddleware",
+    "InFlightMiddleware",
+    "LogContextMiddleware",
+    "UpdateDedupMiddleware",
+    "UpdateDumpMiddleware",
+    "UpdateTimingMiddleware",
+]
@@ -0,0 +1,41 @@
+"""Middleware that hands the current configuration to every handler."""
+
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable
+
+from aiogram.dispatcher.middlewares.base import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from ..configuration import AppConfig
+
+
+def bot_label(data: dict[str, Any]) -> str:
+    """Metrics label of the bot handling the current update."""
+
+    config = data.get("config")
+    bot = data.get("bot")
+    if isinstance(config, AppConfig) and bot is not None:
+        return config.telegram.label_for(bot.token)
+    return "unknown"
+
+
+class ConfigMiddleware(BaseMiddleware):
+    """Inject ``config`` per update instead of relying on the startup snapshot.
+
+    Polling and webhook handlers receive a copy of ``workflow_data`` taken
+    when serving starts, so a reloaded configuration would otherwise never
+    reach them.
+    """
+
+    def __init__(self, source: Callable[[], AppConfig]) -> None:
+        self._source = source
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        data["config"] = self._source()
+        return await handler(event, data)
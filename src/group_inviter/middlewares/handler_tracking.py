@@ -0,0 +1,45 @@
+"""Middleware that tells the loop monitor which update and handler are running."""
+
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable
+
+from aiogram.dispatcher.middlewares.base import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from ..loop_monitor import track_handler, track_update
+
+
+def handler_name(data: dict[str, Any]) -> str | None:
+    """Qualified name of the handler aiogram resolved for the event, if any."""
+
+    handler = data.get("handler")
+    callback = getattr(handler, "callback", None)
+    if callback is None:
+        return None
+    return f"{callback.__module__}.{getattr(callback, '__qualname__', repr(callback))}"
+
+
+def update_type(event: Update) -> str:
+    try:
+        return event.event_type
+    except Exception:  # pragma: no cover - unknown update kinds
+        return "unknown"
+
+
+class HandlerTrackingMiddleware(BaseMiddleware):
+    """Record the update type (outer) and handler name (inner) per task."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if isinstance(event, Update):
+            track_update(update_type(event))
+        else:
+            name = handler_name(data)
+            if name:
+                track_handler(name)
+        return await handler(event, data)
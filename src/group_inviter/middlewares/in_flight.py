@@ -0,0 +1,37 @@
+"""Middleware that registers update tasks with the shutdown coordinator."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Awaitable, Callable
+
+from aiogram.dispatcher.middlewares.base import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from ..shutdown import ShutdownCoordinator
+
+LOGGER = logging.getLogger(__name__)
+
+
+class InFlightMiddleware(BaseMiddleware):
+    """Track in-flight updates and refuse new ones while shutting down."""
+
+    def __init__(self, coordinator: ShutdownCoordinator) -> None:
+        self._coordinator = coordinator
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if not isinstance(event, Update):
+            return await handler(event, data)
+        bot_id = getattr(data.get("bot"), "id", 0)
+        if not self._coordinator.begin(bot_id, event):
+            LOGGER.info("Refusing update %s while shutting down", event.update_id)
+            return None
+        try:
+            return await handler(event, data)
+        finally:
+            self._coordinator.end()
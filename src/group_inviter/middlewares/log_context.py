@@ -0,0 +1,48 @@
+"""Middleware that binds update identifiers to the logging context."""
+
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable
+
+from aiogram.dispatcher.middlewares.base import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from .. import log_context
+from .handler_tracking import handler_name, update_type
+
+
+def _ids(event: TelegramObject) -> tuple[int | None, int | None]:
+    """Chat and user ids of an update's payload, where it has them."""
+
+    chat = getattr(event, "chat", None)
+    if chat is None:
+        chat = getattr(getattr(event, "message", None), "chat", None)
+    user = getattr(event, "from_user", None)
+    return getattr(chat, "id", None), getattr(user, "id", None)
+
+
+class LogContextMiddleware(BaseMiddleware):
+    """Bind update/chat/user ids (outer) and the handler name (inner) for log records."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if isinstance(event, Update):
+            kind = update_type(event)
+            chat_id, user_id = _ids(event.event) if kind != "unknown" else (None, None)
+            token = log_context.bind(
+                update_id=event.update_id,
+                update_type=kind,
+                bot_id=getattr(data.get("bot"), "id", None),
+                chat_id=chat_id,
+                user_id=user_id,
+            )
+        else:
+            token = log_context.bind(handler=handler_name(data))
+        try:
+            return await handler(event, data)
+        finally:
+            log_context.reset(token)
@@ -0,0 +1,60 @@
+"""Middleware that measures update delivery lag and per-stage handling time."""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable
+
+from aiogram.dispatcher.middlewares.base import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from .. import timeline
+from ..metrics import record_update_delivery_lag, record_update_stages
+from .config import bot_label
+from .handler_tracking import update_type
+
+
+def _sent_at(event: TelegramObject) -> datetime | None:
+    """When Telegram says the payload happened; edits count from the edit."""
+
+    for name in ("edit_date", "date"):
+        value = getattr(event, name, None)
+        if isinstance(value, datetime):
+            return value
+    return None
+
+
+class UpdateTimingMiddleware(BaseMiddleware):
+    """Time updates from receipt (outer) through handler entry (inner).
+
+    The outer call compares the payload date with the wall clock and starts
+    the update's :class:`~group_inviter.timeline.UpdateTimeline`; handlers
+    add their own stages and the deltas are exported once the update is done.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if not isinstance(event, Update):
+            timeline.mark_stage("handler")
+            return await handler(event, data)
+
+        kind = update_type(event)
+        received_at = time.time()
+        sent_at = _sent_at(event.event) if kind != "unknown" else None
+        if sent_at is not None:
+            record_update_delivery_lag(
+                kind, max(0.0, received_at - sent_at.timestamp()), bot=bot_label(data)
+            )
+        current = timeline.UpdateTimeline(kind)
+        token = timeline.start(current)
+        try:
+            return await handler(event, data)
+        finally:
+            timeline.reset(token)
+            current.mark("done")
+            record_update_stages(kind, current.deltas())
@@ -0,0 +1,37 @@
+"""Middleware that drops updates the dispatcher has already seen."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Awaitable, Callable
+
+from aiogram.dispatcher.middlewares.base import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from ..cache import TTLCache
+from ..metrics import record_duplicate
+from .config import bot_label
+
+LOGGER = logging.getLogger(__name__)
+
+
+class UpdateDedupMiddleware(BaseMiddleware):
+    """Skip redelivered updates based on their ``update_id``."""
+
+    def __init__(self, *, ttl: float, maxsize: int) -> None:
+        self._seen: TTLCache[tuple[int, int], bool] = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if isinstance(event, Update):
+            bot = data.get("bot")
+            key = (getattr(bot, "id", 0), event.update_id)
+            if not self._seen.add(key, True):
+                LOGGER.debug("Skipping duplicate update %s", event.update_id)
+                record_duplicate("update", bot=bot_label(data))
+                return None
+        return await handler(event, data)
@@ -11,6 +11,7 @@ from aiogram.dispatcher.middlewares.base import BaseMiddleware
 from aiogram.types import TelegramObject
 
 from ..metrics import record_unhandled_update
+from .config import bot_label
 
 LOGGER = logging.getLogger(__name__)
 
@@ -28,7 +29,7 @@ class UpdateDumpMiddleware(BaseMiddleware):
         result = await handler(event, data)
         if result is UNHANDLED:
             LOGGER.info("Unhandled")
-            record_unhandled_update()
+            record_unhandled_update(bot_label(data))
         return result
 
     @staticmethod
@@ -0,0 +1,143 @@
+"""Cached administrator and bot rights of managed chats."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from .cache import TTLCache
+from .configuration import PermissionsConfig
+from .metrics import record_chat_admin_lookup
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class ChatRights:
+    """Who administers a chat and what the bot itself may do there."""
+
+    admin_ids: frozenset[int]
+    inviter_ids: frozenset[int]
+    bot_is_admin: bool
+    bot_can_invite: bool
+
+    def can_manage_invites(self, user_id: int) -> bool:
+        """Whether ``user_id`` may create invite links in this chat."""
+
+        return user_id in self.inviter_ids
+
+
+NO_RIGHTS = ChatRights(frozenset(), frozenset(), bot_is_admin=False, bot_can_invite=False)
+
+
+class ChatAdminCache:
+    """Remember ``getChatAdministrators`` results per (bot, chat).
+
+    One call returns every administrator, including the bot with its own
+    rights, so admin checks and permission pre-flights become local
+    lookups. Concurrent misses for the same chat share one request.
+    Entries expire after ``ttl_seconds``; ``my_chat_member`` updates drop
+    the entry at once when the bot's own status changes. Promotions of
+    other members are picked up when the entry expires, because
+    subscribing to ``chat_member`` would deliver every join as well.
+
+    It also remembers which chats each bot manages (it received a join
+    request there, was promoted there, or a lookup found it an admin), so
+    that arbitrary chat ids sent by strangers never reach the Bot API.
+    """
+
+    def __init__(self, config: PermissionsConfig) -> None:
+        self._entries: TTLCache[tuple[int, int], ChatRights] = TTLCache(
+            maxsize=config.max_chats, ttl=config.ttl_seconds
+        )
+        # Bounded by the same limit, least recently used first; membership never expires.
+        self._managed: TTLCache[tuple[int, int], bool] = TTLCache(
+            maxsize=config.max_chats, ttl=float("inf")
+        )
+        self._inflight: dict[tuple[int, int], asyncio.Future[ChatRights]] = {}
+
+    async def rights(self, bot: Bot, chat_id: int) -> ChatRights:
+        """Rights in ``chat_id``; :data:`NO_RIGHTS` if the chat is not reachable."""
+
+        key = (bot.id, chat_id)
+        cached = self._entries.get(key)
+        if cached is not None:
+            record_chat_admin_lookup("hit")
+            return cached
+        pending = self._inflight.get(key)
+        if pending is not None:
+            record_chat_admin_lookup("hit")
+            return await asyncio.shield(pending)
+        record_chat_admin_lookup("miss")
+        future: asyncio.Future[ChatRights] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            rights = await self._fetch(bot, chat_id)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Nobody else may be waiting; avoid "exception never retrieved".
+            future.exception()
+            raise
+        else:
+            future.set_result(rights)
+            self._entries.set(key, rights)
+            if rights.bot_is_admin:
+                self._managed.set(key, True)
+            return rights
+        finally:
+            self._inflight.pop(key, None)
+
+    async def is_chat_admin(self, bot: Bot, chat_id: int, user_id: int) -> bool:
+        return user_id in (await self.rights(bot, chat_id)).admin_ids
+
+    def invalidate(self, bot_id: int, chat_id: int) -> None:
+        self._entries.pop((bot_id, chat_id))
+
+    def mark_managed(self, bot_id: int, chat_id: int, *, managed: bool = True) -> None:
+        """Record whether the bot administers ``chat_id``."""
+
+        if managed:
+            self._managed.set((bot_id, chat_id), True)
+        else:
+            self._managed.pop((bot_id, chat_id))
+
+    def is_managed(self, bot_id: int, chat_id: int) -> bool:
+        return self._managed.get((bot_id, chat_id)) is not None
+
+    async def _fetch(self, bot: Bot, chat_id: int) -> ChatRights:
+        from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+        from aiogram.types import ChatMemberAdministrator, ChatMemberOwner
+
+        try:
+            members = await bot.get_chat_administrators(chat_id)
+        except (TelegramBadRequest, TelegramForbiddenError) as exc:
+            # Unknown chat or the bot was removed: nothing to manage there.
+            LOGGER.info("Chat %s is not accessible to bot %s: %s", chat_id, bot.id, exc)
+            return NO_RIGHTS
+        admin_ids: set[int] = set()
+        inviter_ids: set[int] = set()
+        bot_is_admin = bot_can_invite = False
+        for member in members:
+            if isinstance(member, ChatMemberOwner):
+                can_invite = True
+            elif isinstance(member, ChatMemberAdministrator):
+                can_invite = member.can_invite_users
+            else:  # pragma: no cover - Telegram only returns the two kinds above
+                continue
+            if member.user.id == bot.id:
+                bot_is_admin, bot_can_invite = True, can_invite
+                continue
+            admin_ids.add(member.user.id)
+            if can_invite:
+                inviter_ids.add(member.user.id)
+        return ChatRights(
+            frozenset(admin_ids), frozenset(inviter_ids), bot_is_admin, bot_can_invite
+        )
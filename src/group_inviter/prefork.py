@@ -0,0 +1,153 @@
+"""Prefork supervisor running several webhook workers behind one port."""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+from multiprocessing.process import BaseProcess
+from pathlib import Path
+from types import FrameType
+
+from .configuration import AppConfig
+
+LOGGER = logging.getLogger(__name__)
+
+MULTIPROC_ENV_VAR = "PROMETHEUS_MULTIPROC_DIR"
+# Time granted to workers on top of their drain deadline before SIGKILL.
+_STOP_MARGIN = 5.0
+
+
+def _suffixed(filename: str, name: str) -> str:
+    path = Path(filename)
+    return str(path.with_name(f"{path.stem}.{name}{path.suffix}"))
+
+
+def process_config(config: AppConfig, name: str) -> AppConfig:
+    """Copy of ``config`` whose log files and spool files are private to process ``name``."""
+
+    logging_config = config.logging.model_copy(
+        update={
+            "info_filename": _suffixed(config.logging.info_filename, name),
+            "debug_filename": _suffixed(config.logging.debug_filename, name),
+        }
+    )
+    spool_config = config.spool.model_copy(
+        update={"path": Path(_suffixed(str(config.spool.path), name))}
+    )
+    shutdown_config = config.shutdown.model_copy(
+        update={"abandoned_path": Path(_suffixed(str(config.shutdown.abandoned_path), name))}
+    )
+    return config.model_copy(
+        update={"logging": logging_config, "spool": spool_config, "shutdown": shutdown_config}
+    )
+
+
+def _prepare_multiprocess_dir(config: AppConfig) -> tuple[Path, bool]:
+    """Return an empty metrics directory and whether it is temporary."""
+
+    if config.metrics.multiprocess_dir is None:
+        return Path(tempfile.mkdtemp(prefix="group-inviter-metrics-")), True
+    directory = config.metrics.multiprocess_dir
+    directory.mkdir(parents=True, exist_ok=True)
+    for stale in directory.glob("*.db"):
+        stale.unlink()
+    return directory, False
+
+
+def _worker_main(config_path: str | None, index: int) -> None:
+    from .main import main
+
+    main(config_path, worker=index)
+
+
+def run_prefork(config_path: str | None, config: AppConfig, workers: int) -> None:
+    """Spawn ``workers`` webhook processes and supervise them until SIGTERM/SIGINT.
+
+    Each worker runs its own event loop, HTTP session and asyncpg pool and
+    binds the webhook port with ``SO_REUSEPORT`` so the kernel spreads
+    connections across them. Crashed workers are restarted. On stop every
+    worker receives SIGTERM and drains its in-flight updates.
+    """
+
+    if not config.telegram.webhook.enabled:
+        msg = "Running several workers requires telegram.webhook.enabled"
+        raise ValueError(msg)
+
+    from .logging_config import configure_logging
+
+    configure_logging(process_config(config, "main").logging)
+    metrics_dir, temporary = _prepare_multiprocess_dir(config)
+    # Must happen before group_inviter.metrics is imported here or in a worker.
+    os.environ[MULTIPROC_ENV_VAR] = str(metrics_dir)
+    from .metrics import mark_worker_dead, start_multiprocess_metrics_server
+
+    if config.metrics.enabled:
+        start_multiprocess_metrics_server(config.metrics.host, config.metrics.port, logger=LOGGER)
+
+    context = multiprocessing.get_context("spawn")
+
+    def spawn(index: int) -> BaseProcess:
+        process = context.Process(
+            target=_worker_main,
+            args=(config_path, index),
+            name=f"group-inviter-worker-{index}",
+        )
+        process.start()
+        LOGGER.info("Started worker %s (pid %s)", index, process.pid)
+        return process
+
+    stop = threading.Event()
+
+    def request_stop(signum: int, _frame: FrameType | None) -> None:
+        LOGGER.info("Received %s, stopping workers", signal.Signals(signum).name)
+        stop.set()
+
+    processes: dict[int, BaseProcess] = {}
+
+    def forward_reload(signum: int, _frame: FrameType | None) -> None:
+        LOGGER.info("Received SIGHUP, asking workers to reload the configuration")
+        for process in processes.values():
+            if process.is_alive() and process.pid is not None:
+                os.kill(process.pid, signal.SIGHUP)
+
+    previous = {sig: signal.signal(sig, request_stop) for sig in (signal.SIGTERM, signal.SIGINT)}
+    previous[signal.SIGHUP] = signal.signal(signal.SIGHUP, forward_reload)
+    processes.update({index: spawn(index) for index in range(workers)})
+    try:
+        while not stop.wait(1.0):
+            for index, process in list(processes.items()):
+                if process.is_alive():
+                    continue
+                LOGGER.warning(
+                    "Worker %s (pid %s) exited with code %s, restarting",
+                    index,
+                    process.pid,
+                    process.exitcode,
+                )
+                if process.pid is not None:
+                    mark_worker_dead(process.pid)
+                processes[index] = spawn(index)
+    finally:
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + config.shutdown.drain_timeout + _STOP_MARGIN
+        for index, process in processes.items():
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                LOGGER.error("Worker %s did not stop in time, killing it", index)
+                process.kill()
+                process.join()
+            if process.pid is not None:
+                mark_worker_dead(process.pid)
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+        if temporary:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+        LOGGER.info("All workers stopped")
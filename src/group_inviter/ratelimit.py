@@ -0,0 +1,75 @@
+"""Token bucket limiting the pace of bulk Bot API calls."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from types import TracebackType
+from typing import Callable
+
+
+class AsyncRateLimiter:
+    """Allow ``rate`` acquisitions per second with bursts of up to ``burst``.
+
+    Waiters are served in arrival order: the lock is held while sleeping
+    for the next token, so a late caller cannot overtake an earlier one.
+    :meth:`pause` stops every waiter, e.g. for the ``retry_after`` of a
+    flood-wait error.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate <= 0 or burst < 1:
+            msg = "rate must be positive and burst at least 1"
+            raise ValueError(msg)
+        self._rate = rate
+        self._capacity = float(burst)
+        self._tokens = float(burst)
+        self._clock = clock
+        self._updated_at = clock()
+        self._resume_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for the next ``seconds``."""
+
+        self._resume_at = max(self._resume_at, self._clock() + seconds)
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+
+        async with self._lock:
+            while True:
+                paused_for = self._resume_at - self._clock()
+                if paused_for > 0:
+                    await asyncio.sleep(paused_for)
+                    # Resume at the steady rate instead of a burst.
+                    self._tokens = 0.0
+                    self._updated_at = self._clock()
+                    continue
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        return None
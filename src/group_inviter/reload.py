@@ -0,0 +1,204 @@
+"""Configuration hot reload on SIGHUP or when the file changes."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import signal
+import time
+from contextlib import suppress
+from pathlib import Path
+from typing import Any, Callable
+
+from .configuration import AppConfig, load_config
+from .database import POOL_SETTINGS, SwappablePool
+from .metrics import record_config_reload
+
+LOGGER = logging.getLogger(__name__)
+
+# Settings read once while bootstrapping; changing them needs a restart.
+_RESTART_REQUIRED = (
+    "telegram.parse_mode",
+    "telegram.api",
+    "telegram.session",
+    "telegram.webhook",
+    "logging.structured",
+    "logging.directory",
+    "logging.info_filename",
+    "logging.debug_filename",
+    "logging.timezone",
+    "logging.max_bytes",
+    "logging.backup_count",
+    "logging.compress",
+    "logging.retention_days",
+    "logging.retention_max_bytes",
+    "metrics",
+    "database.call_timeout",
+    "database.breaker",
+    "dedup",
+    "spool",
+    "loop_monitor",
+    "shutdown",
+    "invites.revoke_rate",
+    "invites.revoke_burst",
+    "invites.batch_size",
+    "invites.retry_delay",
+    "media",
+    "broadcast",
+    "permissions",
+    "whois",
+    "review.rate",
+    "review.burst",
+    "review.concurrency",
+    "review.batch_size",
+    "review.progress_interval",
+    "reload",
+)
+# Upper bound for in-flight queries on a replaced pool before it is terminated.
+_POOL_CLOSE_TIMEOUT = 10.0
+
+
+def _setting(config: AppConfig, dotted: str) -> Any:
+    value: Any = config
+    for part in dotted.split("."):
+        value = getattr(value, part)
+    return value
+
+
+def _pool_settings(config: AppConfig) -> dict[str, Any]:
+    return config.database.model_dump(include=set(POOL_SETTINGS))
+
+
+def restart_required(old: AppConfig, new: AppConfig) -> list[str]:
+    """Changed settings that a reload cannot apply."""
+
+    changed = [name for name in _RESTART_REQUIRED if _setting(old, name) != _setting(new, name)]
+    if [p.bot_token for p in old.telegram.profiles()] != [
+        p.bot_token for p in new.telegram.profiles()
+    ]:
+        changed.insert(0, "telegram bot tokens")
+    return changed
+
+
+class ConfigReloader:
+    """Re-read, validate and apply ``config.yaml`` without restarting.
+
+    A reload builds the new :class:`AppConfig` off the event loop. It then
+    changes the root logging level in place and, when connection settings
+    differ, opens a new pool and swaps it into the shared
+    :class:`~group_inviter.database.SwappablePool`. Finally it publishes the
+    configuration to the subscribers in one step. Invalid files and failed
+    pool swaps leave the running configuration untouched. Settings consumed
+    at startup are reported as needing a restart.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        config: AppConfig,
+        *,
+        pool: SwappablePool | None = None,
+        transform: Callable[[AppConfig], AppConfig] | None = None,
+    ) -> None:
+        self._path = path
+        self._config = config
+        self._pool = pool
+        self._transform = transform
+        self._subscribers: list[Callable[[AppConfig], None]] = []
+        self._lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task[bool]] = set()
+        self._mtime = self._stat()
+
+    @property
+    def config(self) -> AppConfig:
+        return self._config
+
+    def subscribe(self, callback: Callable[[AppConfig], None]) -> None:
+        self._subscribers.append(callback)
+
+    def _stat(self) -> float | None:
+        try:
+            return self._path.stat().st_mtime
+        except OSError:
+            return None
+
+    def _load(self) -> AppConfig:
+        config = load_config(self._path)
+        return self._transform(config) if self._transform else config
+
+    async def reload(self) -> bool:
+        """Apply the file's current contents; ``False`` if it was rejected."""
+
+        async with self._lock:
+            started_at = time.perf_counter()
+            try:
+                new = await asyncio.to_thread(self._load)
+                await self._apply(new)
+            except Exception as exc:
+                record_config_reload("failure", time.perf_counter() - started_at)
+                LOGGER.error("Configuration reload failed, keeping the running one: %s", exc)
+                return False
+            elapsed = time.perf_counter() - started_at
+            record_config_reload("success", elapsed)
+            LOGGER.info("Configuration reloaded in %.3fs", elapsed)
+            return True
+
+    async def _apply(self, new: AppConfig) -> None:
+        old = self._config
+        if new == old:
+            return
+        pending = restart_required(old, new)
+        if pending:
+            LOGGER.warning("Changes to %s take effect after a restart", ", ".join(pending))
+        if self._pool is not None and _pool_settings(old) != _pool_settings(new):
+            await self._replace_pool(new)
+        if new.logging.level != old.logging.level:
+            from .logging_config import set_logging_level
+
+            set_logging_level(new.logging)
+            LOGGER.info("Log level changed to %s", new.logging.level)
+        self._config = new
+        for callback in self._subscribers:
+            callback(new)
+
+    async def _replace_pool(self, new: AppConfig) -> None:
+        from .database import create_pool
+
+        assert self._pool is not None  # noqa: S101 - checked by the caller
+        previous = self._pool.replace(await create_pool(new.database))
+        LOGGER.info(
+            "Database pool replaced (%s-%s connections)",
+            new.database.min_pool_size,
+            new.database.max_pool_size,
+        )
+        try:
+            await asyncio.wait_for(previous.close(), _POOL_CLOSE_TIMEOUT)
+        except TimeoutError:
+            LOGGER.warning("Previous database pool did not close in time, terminating it")
+            previous.terminate()
+
+    def _schedule_reload(self) -> None:
+        task = asyncio.create_task(self.reload())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def install_signal_handler(self) -> None:
+        """Reload on SIGHUP (no-op where the loop cannot handle signals)."""
+
+        with suppress(NotImplementedError, AttributeError, RuntimeError):
+            asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, self._schedule_reload)
+
+    def remove_signal_handler(self) -> None:
+        with suppress(NotImplementedError, AttributeError, RuntimeError):
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+
+    async def watch(self, interval: float) -> None:
+        """Reload whenever the file's modification time changes."""
+
+        while True:
+            await asyncio.sleep(interval)
+            mtime = self._stat()
+            if mtime is not None and mtime != self._mtime:
+                self._mtime = mtime
+                LOGGER.info("Configuration file %s changed, reloading", self._path)
+                await self.reload()
@@ -0,0 +1,122 @@
+"""Circuit breaker shared by calls to external dependencies."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Callable
+
+from .configuration import CircuitBreakerConfig
+
+LOGGER = logging.getLogger(__name__)
+
+
+class CircuitState(IntEnum):
+    """Breaker states; numeric values are exported as a gauge."""
+
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because the circuit is open."""
+
+
+class CircuitBreaker:
+    """Trip after the failure ratio over recent calls crosses a threshold.
+
+    Outcomes are tracked over a rolling window of the last ``window_size``
+    calls. Once tripped the breaker rejects calls for ``reset_timeout``
+    seconds, then lets a single probe through; its outcome decides whether
+    the circuit closes again or stays open for another period.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        config: CircuitBreakerConfig,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        on_state_change: Callable[[str, CircuitState], None] | None = None,
+    ) -> None:
+        self.name = name
+        self._config = config
+        self._clock = clock
+        self._on_state_change = on_state_change
+        self._outcomes: deque[bool] = deque(maxlen=config.window_size)
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state is CircuitState.OPEN and self._reset_due():
+            return CircuitState.HALF_OPEN
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Return whether a call may proceed right now."""
+
+        if self._state is CircuitState.CLOSED:
+            return True
+        if self._state is CircuitState.OPEN:
+            if not self._reset_due():
+                return False
+            self._transition(CircuitState.HALF_OPEN)
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self._probe_in_flight = False
+        if self._state is CircuitState.HALF_OPEN:
+            self._outcomes.clear()
+            self._transition(CircuitState.CLOSED)
+            return
+        self._outcomes.append(True)
+
+    def release(self) -> None:
+        """Forget an allowed call that ended without an outcome, e.g. cancelled.
+
+        Without this a cancelled half-open probe would keep every later call
+        out until some other call happened to report back.
+        """
+
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._probe_in_flight = False
+        if self._state is CircuitState.HALF_OPEN:
+            self._trip()
+            return
+        self._outcomes.append(False)
+        if self._state is CircuitState.CLOSED and self._threshold_crossed():
+            self._trip()
+
+    def _threshold_crossed(self) -> bool:
+        total = len(self._outcomes)
+        if total < self._config.min_calls:
+            return False
+        failures = total - sum(self._outcomes)
+        return failures / total >= self._config.failure_ratio
+
+    def _reset_due(self) -> bool:
+        return self._clock() - self._opened_at >= self._config.reset_timeout
+
+    def _trip(self) -> None:
+        self._opened_at = self._clock()
+        self._transition(CircuitState.OPEN)
+
+    def _transition(self, state: CircuitState) -> None:
+        if state is self._state:
+            return
+        LOGGER.warning(
+            "Circuit '%s' changed state %s -> %s", self.name, self._state.name, state.name
+        )
+        self._state = state
+        if self._on_state_change:
+            self._on_state_change(self.name, state)
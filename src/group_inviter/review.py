@@ -0,0 +1,259 @@
+"""Join requests held for review and bulk decisions on them."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Awaitable, Callable, Mapping, Sequence
+
+from .configuration import ReviewConfig
+from .database import PendingRequest, PendingRequestsRepository, UsersRepository
+from .metrics import record_review_event
+from .ratelimit import AsyncRateLimiter
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+    from aiogram.types import ChatJoinRequest
+
+LOGGER = logging.getLogger(__name__)
+
+# Telegram's answers for requests already resolved elsewhere (e.g. in a client).
+_GONE_MARKERS = ("HIDE_REQUESTER_MISSING", "USER_ALREADY_PARTICIPANT")
+_MAX_ATTEMPTS = 5
+
+
+@dataclass(slots=True)
+class BulkProgress:
+    """Running totals of an "approve/decline all" job."""
+
+    chat_id: int
+    approve: bool
+    total: int
+    resolved: int = 0
+    gone: int = 0
+    failed: int = 0
+    finished: bool = False
+
+    @property
+    def processed(self) -> int:
+        return self.resolved + self.gone + self.failed
+
+
+ProgressCallback = Callable[[BulkProgress], Awaitable[None]]
+
+
+class ReviewQueue:
+    """Hold join requests for manual review and resolve them, one or all at once.
+
+    Every decision goes through the deciding bot's token bucket with at
+    most ``concurrency`` calls in flight, and flood-wait errors pause that
+    bot's bucket. Bulk jobs take ``batch_size`` requests at a time from the
+    table, so an interrupted job leaves at most one batch to re-queue.
+    Requests that fail for any other reason go back to the queue.
+    """
+
+    def __init__(
+        self,
+        repository: PendingRequestsRepository,
+        config: ReviewConfig,
+        *,
+        users: UsersRepository | None = None,
+        limiters: Mapping[int, AsyncRateLimiter] | None = None,
+        labels: Mapping[int, str] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._repository = repository
+        self._config = config
+        self._users = users
+        # Telegram limits each token separately; buckets are created per bot on first use.
+        self._limiters = dict(limiters or {})
+        # Metrics label per bot id; bots missing here are labelled with their id.
+        self._labels = dict(labels or {})
+        self._clock = clock
+        self._jobs: dict[tuple[int, int], asyncio.Task[BulkProgress]] = {}
+
+    def _limiter(self, bot: Bot) -> AsyncRateLimiter:
+        limiter = self._limiters.get(bot.id)
+        if limiter is None:
+            limiter = self._limiters[bot.id] = AsyncRateLimiter(
+                self._config.rate, self._config.burst
+            )
+        return limiter
+
+    def _label(self, bot: Bot) -> str:
+        return self._labels.get(bot.id) or str(bot.id)
+
+    async def hold(self, bot: Bot, join_request: ChatJoinRequest) -> None:
+        await self._repository.add_many([PendingRequest.from_join_request(bot.id, join_request)])
+        record_review_event("held", bot=self._label(bot))
+
+    async def summary(self, bot_id: int) -> list[tuple[int, int]]:
+        return await self._repository.summary(bot_id)
+
+    async def page(self, bot_id: int, chat_id: int, page: int, size: int) -> list[PendingRequest]:
+        return await self._repository.page(bot_id, chat_id, page * size, size)
+
+    def running(self, bot_id: int, chat_id: int) -> bool:
+        return (bot_id, chat_id) in self._jobs
+
+    async def resolve(self, bot: Bot, chat_id: int, user_id: int, *, approve: bool) -> str | None:
+        """Approve or decline one request; ``None`` if it is no longer queued."""
+
+        taken = await self._repository.take(bot.id, chat_id, user_id=user_id)
+        if not taken:
+            return None
+        outcomes = await self._resolve_many(bot, taken, approve=approve)
+        await self._requeue(taken, outcomes)
+        return outcomes[0]
+
+    def start_bulk(
+        self, bot: Bot, chat_id: int, total: int, *, approve: bool, progress: ProgressCallback
+    ) -> bool:
+        """Resolve every queued request of ``chat_id`` in the background.
+
+        Returns ``False`` while another bulk job for the chat is running.
+        """
+
+        key = (bot.id, chat_id)
+        if key in self._jobs:
+            return False
+        task = asyncio.create_task(self._bulk(bot, BulkProgress(chat_id, approve, total), progress))
+        self._jobs[key] = task
+        task.add_done_callback(lambda _: self._jobs.pop(key, None))
+        return True
+
+    async def run(self) -> None:
+        """Keep bulk jobs running until cancelled, then stop them."""
+
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+
+    async def stop(self) -> None:
+        jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancel()
+        await asyncio.gather(*jobs, return_exceptions=True)
+
+    async def _bulk(
+        self, bot: Bot, state: BulkProgress, progress: ProgressCallback
+    ) -> BulkProgress:
+        retry: list[PendingRequest] = []
+        batch: list[PendingRequest] = []
+        reported_at = self._clock()
+        try:
+            while batch := await self._repository.take(
+                bot.id, state.chat_id, limit=self._config.batch_size
+            ):
+                outcomes = await self._resolve_many(bot, batch, approve=state.approve)
+                counts = Counter(outcomes)
+                state.gone += counts.pop("gone", 0)
+                state.failed += counts.pop("failed", 0)
+                state.resolved += sum(counts.values())
+                state.total = max(state.total, state.processed)
+                retry.extend(
+                    r for r, outcome in zip(batch, outcomes, strict=True) if outcome == "failed"
+                )
+                batch = []
+                if self._clock() - reported_at >= self._config.progress_interval:
+                    reported_at = self._clock()
+                    await self._report(progress, state)
+        except asyncio.CancelledError:
+            # Requests of the interrupted batch may or may not be resolved;
+            # re-queued ones that were are reported as "gone" next time.
+            await self._requeue(retry + batch)
+            raise
+        except Exception as exc:
+            LOGGER.error("Bulk review of chat %s interrupted: %s", state.chat_id, exc)
+            retry.extend(batch)
+        await self._requeue(retry)
+        state.finished = True
+        await self._report(progress, state)
+        LOGGER.info(
+            "Bulk %s in chat %s: %s resolved, %s already handled, %s failed",
+            "approval" if state.approve else "decline",
+            state.chat_id,
+            state.resolved,
+            state.gone,
+            state.failed,
+        )
+        return state
+
+    async def _report(self, progress: ProgressCallback, state: BulkProgress) -> None:
+        try:
+            await progress(state)
+        except Exception as exc:  # pragma: no cover - e.g. the message was deleted
+            LOGGER.debug("Failed to report bulk review progress: %s", exc)
+
+    async def _requeue(
+        self, requests: Sequence[PendingRequest], outcomes: Sequence[str] | None = None
+    ) -> None:
+        if outcomes is not None:
+            requests = [
+                r for r, outcome in zip(requests, outcomes, strict=True) if outcome == "failed"
+            ]
+        if not requests:
+            return
+        try:
+            await self._repository.add_many(requests)
+        except Exception as exc:  # pragma: no cover - database errors
+            LOGGER.error("Failed to re-queue %s join requests: %s", len(requests), exc)
+
+    async def _resolve_many(
+        self, bot: Bot, requests: Sequence[PendingRequest], *, approve: bool
+    ) -> list[str]:
+        semaphore = asyncio.Semaphore(self._config.concurrency)
+
+        async def resolve(request: PendingRequest) -> str:
+            async with semaphore:
+                return await self._resolve_one(bot, request, approve=approve)
+
+        outcomes = list(await asyncio.gather(*(resolve(request) for request in requests)))
+        for outcome, count in Counter(outcomes).items():
+            record_review_event(outcome, count, bot=self._label(bot))
+        approved = [
+            request.to_user_record(datetime.now(UTC))
+            for request, outcome in zip(requests, outcomes, strict=True)
+            if outcome == "approved"
+        ]
+        if approved and self._users is not None:
+            try:
+                await self._users.record_many(approved)
+            except Exception as exc:  # pragma: no cover - database errors
+                LOGGER.warning("Failed to persist %s approved users: %s", len(approved), exc)
+        return outcomes
+
+    async def _resolve_one(self, bot: Bot, request: PendingRequest, *, approve: bool) -> str:
+        from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+
+        limiter = self._limiter(bot)
+        for _ in range(_MAX_ATTEMPTS):
+            await limiter.acquire()
+            try:
+                if approve:
+                    await bot.approve_chat_join_request(request.chat_id, request.user_id)
+                else:
+                    await bot.decline_chat_join_request(request.chat_id, request.user_id)
+            except TelegramRetryAfter as exc:
+                LOGGER.warning("Flood wait while reviewing join requests: %ss", exc.retry_after)
+                limiter.pause(exc.retry_after)
+            except Exception as exc:
+                if isinstance(exc, TelegramBadRequest) and any(
+                    marker in str(exc) for marker in _GONE_MARKERS
+                ):
+                    return "gone"
+                LOGGER.warning(
+                    "Failed to resolve join request of %s in %s: %s",
+                    request.user_id,
+                    request.chat_id,
+                    exc,
+                )
+                return "failed"
+            else:
+                return "approved" if approve else "declined"
+        return "failed"
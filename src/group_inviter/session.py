@@ -0,0 +1,115 @@
+"""Aiohttp client session with tunable connection pooling."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import weakref
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
+
+from aiogram import __version__ as aiogram_version
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiohttp import ClientSession, ClientTimeout, TCPConnector, TraceConfig
+from aiohttp.hdrs import USER_AGENT
+from aiohttp.http import SERVER_SOFTWARE
+
+from .configuration import SessionConfig
+from .metrics import observe_http_connect, publish_connection_counts, register_connection_pool
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+    from aiogram.methods import TelegramMethod
+    from aiogram.methods.base import TelegramType
+
+
+async def _on_connection_create_start(
+    session: ClientSession, context: SimpleNamespace, params: Any
+) -> None:
+    context.connect_started_at = time.perf_counter()
+
+
+async def _on_connection_create_end(
+    session: ClientSession, context: SimpleNamespace, params: Any
+) -> None:
+    started_at = getattr(context, "connect_started_at", None)
+    if started_at is not None:
+        observe_http_connect(time.perf_counter() - started_at)
+
+
+def _connect_trace_config() -> TraceConfig:
+    trace_config = TraceConfig()
+    trace_config.on_connection_create_start.append(_on_connection_create_start)
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    return trace_config
+
+
+async def run_connection_gauge(interval: float) -> None:
+    """Publish connection counts every ``interval`` seconds for the prefork supervisor."""
+
+    while True:
+        publish_connection_counts()
+        await asyncio.sleep(interval)
+
+
+class TunedAiohttpSession(AiohttpSession):
+    """Aiogram session whose connector limits and timeouts come from configuration.
+
+    One instance may be shared by several bots, in which case they all reuse
+    the same keep-alive connection pool and DNS cache.
+    """
+
+    def __init__(self, config: SessionConfig) -> None:
+        super().__init__(limit=config.connection_limit, timeout=config.request_timeout)
+        self._connector_init.update(
+            {
+                "limit_per_host": config.limit_per_host,
+                "keepalive_timeout": config.keepalive_timeout,
+                "ttl_dns_cache": config.dns_cache_ttl,
+                "use_dns_cache": config.dns_cache_ttl > 0,
+                "enable_cleanup_closed": True,
+            }
+        )
+        self._connect_timeout = config.connect_timeout
+        if config.api_base_url:
+            self.api = TelegramAPIServer.from_base(config.api_base_url)
+        self._connector: TCPConnector | None = None
+        register_connection_pool(weakref.WeakMethod(self.connection_counts))
+
+    def connection_counts(self) -> tuple[int, int]:
+        """Return ``(active, idle)`` connection counts of the shared connector."""
+
+        connector = self._connector
+        if connector is None or connector.closed:
+            return 0, 0
+        active = len(getattr(connector, "_acquired", ()))
+        idle = sum(len(conns) for conns in getattr(connector, "_conns", {}).values())
+        return active, idle
+
+    async def create_session(self) -> ClientSession:
+        if self._should_reset_connector:
+            await self.close()
+
+        if self._session is None or self._session.closed:
+            self._connector = self._connector_type(**self._connector_init)
+            self._session = ClientSession(
+                connector=self._connector,
+                headers={USER_AGENT: f"{SERVER_SOFTWARE} aiogram/{aiogram_version}"},
+                trace_configs=[_connect_trace_config()],
+            )
+            self._should_reset_connector = False
+
+        return self._session
+
+    async def make_request(
+        self,
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+        timeout: int | None = None,
+    ) -> TelegramType:
+        request_timeout = ClientTimeout(
+            total=self.timeout if timeout is None else timeout,
+            sock_connect=self._connect_timeout,
+        )
+        return await super().make_request(bot, method, timeout=request_timeout)  # type: ignore[arg-type]
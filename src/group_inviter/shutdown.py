@@ -0,0 +1,188 @@
+"""Graceful shutdown: drain in-flight updates before releasing resources."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Sequence
+
+from .configuration import ShutdownConfig
+from .metrics import record_drain
+
+if TYPE_CHECKING:
+    from aiogram import Bot, Dispatcher
+    from aiogram.types import Update
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class DrainReport:
+    """Outcome of a shutdown drain."""
+
+    drained: int
+    abandoned: int
+    elapsed: float
+
+
+class ShutdownCoordinator:
+    """Track update-handling tasks and wait for them when the process stops.
+
+    :class:`~group_inviter.middlewares.InFlightMiddleware` registers every
+    update task through :meth:`begin`/:meth:`end`. Once :meth:`drain` is
+    called new updates are refused, tasks still running get up to
+    ``drain_timeout`` seconds to finish and the rest are cancelled.
+
+    Telegram considers an update delivered as soon as the bot has fetched
+    it (polling) or answered the webhook, so refused and cancelled updates
+    are not sent again. :meth:`save_abandoned` writes them to
+    ``abandoned_path`` and :meth:`redeliver` feeds them to the dispatcher
+    of the next process before it starts serving.
+    """
+
+    def __init__(self, config: ShutdownConfig) -> None:
+        self._config = config
+        self._in_flight: dict[asyncio.Task[object], tuple[int, Update]] = {}
+        self._abandoned: list[tuple[int, Update]] = []
+        self._draining = False
+        self._report: DrainReport | None = None
+
+    @property
+    def draining(self) -> bool:
+        return self._draining
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    @property
+    def abandoned(self) -> list[tuple[int, Update]]:
+        """``(bot_id, update)`` pairs refused or cancelled during shutdown."""
+
+        return list(self._abandoned)
+
+    def begin(self, bot_id: int, update: Update) -> bool:
+        """Register the current task as handling an update; ``False`` once draining."""
+
+        if self._draining:
+            self._abandoned.append((bot_id, update))
+            return False
+        task = asyncio.current_task()
+        if task is not None:
+            self._in_flight[task] = (bot_id, update)
+        return True
+
+    def end(self) -> None:
+        task = asyncio.current_task()
+        if task is not None:
+            self._in_flight.pop(task, None)
+
+    async def drain(self) -> DrainReport:
+        """Refuse new updates and wait for in-flight ones; safe to call twice."""
+
+        if self._report is not None:
+            return self._report
+        self._draining = True
+        started_at = time.monotonic()
+        pending = set(self._in_flight)
+        drained = len(pending)
+        if pending:
+            LOGGER.info("Draining %s in-flight update(s)", len(pending))
+            _, pending = await asyncio.wait(pending, timeout=self._config.drain_timeout)
+        for task in pending:
+            self._abandoned.append(self._in_flight.pop(task))
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        report = DrainReport(
+            drained=drained - len(pending),
+            abandoned=len(pending),
+            elapsed=time.monotonic() - started_at,
+        )
+        record_drain(report.drained, report.abandoned)
+        log = LOGGER.warning if report.abandoned else LOGGER.info
+        log(
+            "Shutdown drain finished in %.2fs: %s update(s) drained, %s abandoned",
+            report.elapsed,
+            report.drained,
+            report.abandoned,
+        )
+        self._report = report
+        return report
+
+    async def save_abandoned(self) -> int:
+        """Append refused and cancelled updates to ``abandoned_path``; return how many."""
+
+        if not self._config.redeliver_abandoned or not self._abandoned:
+            return 0
+        lines = [
+            json.dumps(
+                {"bot_id": bot_id, "update": update.model_dump(mode="json", exclude_none=True)},
+                ensure_ascii=True,
+            )
+            for bot_id, update in sorted(self._abandoned, key=lambda item: item[1].update_id)
+        ]
+        await asyncio.to_thread(self._append_lines, self._config.abandoned_path, lines)
+        LOGGER.warning(
+            "Saved %s abandoned update(s) to %s for redelivery",
+            len(lines),
+            self._config.abandoned_path,
+        )
+        self._abandoned.clear()
+        return len(lines)
+
+    async def redeliver(self, dispatcher: Dispatcher, bots: Sequence[Bot]) -> int:
+        """Feed updates saved by the previous process to ``dispatcher``; return how many.
+
+        The file is removed before feeding, so an update is redelivered at
+        most once; those of bots no longer configured are dropped.
+        """
+
+        from aiogram.types import Update
+
+        path = self._config.abandoned_path
+        if not self._config.redeliver_abandoned or not path.exists():
+            return 0
+        lines = await asyncio.to_thread(self._take_lines, path)
+        by_id = {bot.id: bot for bot in bots}
+        redelivered = 0
+        for line in lines:
+            try:
+                entry = json.loads(line)
+                bot = by_id.get(entry["bot_id"])
+                update = Update.model_validate(entry["update"])
+            except (ValueError, TypeError, KeyError) as exc:
+                LOGGER.warning("Dropping malformed abandoned update %r: %s", line, exc)
+                continue
+            if bot is None:
+                LOGGER.warning("Dropping abandoned update of unknown bot %s", entry["bot_id"])
+                continue
+            try:
+                await dispatcher.feed_update(bot, update)
+            except Exception as exc:
+                LOGGER.error("Failed to redeliver update %s: %s", update.update_id, exc)
+                continue
+            redelivered += 1
+        if redelivered:
+            LOGGER.info("Redelivered %s update(s) abandoned by the previous process", redelivered)
+        return redelivered
+
+    @staticmethod
+    def _append_lines(path: Path, lines: list[str]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as fh:
+            fh.write("\n".join(lines) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    @staticmethod
+    def _take_lines(path: Path) -> list[str]:
+        with path.open("r", encoding="utf-8") as fh:
+            lines = [line for line in (raw.strip() for raw in fh) if line]
+        path.unlink()
+        return lines
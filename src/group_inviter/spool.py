@@ -0,0 +1,247 @@
+"""Disk spool used to keep join request records while Postgres is unavailable."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from contextlib import suppress
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from aiogram.types import ChatJoinRequest
+
+from .configuration import SpoolConfig
+from .database import UserRecord, UsersRepository
+from .metrics import set_spool_size
+from .resilience import CircuitBreaker
+
+LOGGER = logging.getLogger(__name__)
+
+REPLAY_SUFFIX = ".replaying"
+
+
+class JoinRequestSpool:
+    """Append-only JSON-lines spool with batched fsync.
+
+    Appends are buffered in memory and written out by a single writer once
+    ``fsync_batch`` records are pending or ``fsync_interval`` has elapsed.
+    Replay moves the live file aside so that new appends keep going to a
+    fresh file while the old one is being drained.
+    """
+
+    def __init__(self, config: SpoolConfig) -> None:
+        self._config = config
+        self._path = config.path
+        self._replay_path = config.path.with_name(config.path.name + REPLAY_SUFFIX)
+        self._buffer: list[str] = []
+        self._lock = asyncio.Lock()
+        self._flush_requested = asyncio.Event()
+        self._writer: asyncio.Task[None] | None = None
+        self._size = 0
+
+    @property
+    def size(self) -> int:
+        """Number of records waiting to be replayed, including unflushed ones."""
+
+        return self._size
+
+    async def open(self) -> None:
+        """Count leftover records and start the background writer."""
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._size = await asyncio.to_thread(self._count_existing)
+        set_spool_size(self._size)
+        if self._size:
+            LOGGER.warning("Found %s spooled join requests from a previous run", self._size)
+        self._writer = asyncio.create_task(self._write_loop(), name="spool-writer")
+
+    async def close(self) -> None:
+        """Stop the writer and persist anything still buffered."""
+
+        if self._writer is not None:
+            self._writer.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._writer
+            self._writer = None
+        await self.flush()
+
+    async def append(self, record: UserRecord) -> None:
+        """Queue a record; it becomes durable on the next batched fsync."""
+
+        self._buffer.append(json.dumps(record.to_json(), ensure_ascii=True))
+        self._size += 1
+        set_spool_size(self._size)
+        if len(self._buffer) >= self._config.fsync_batch:
+            self._flush_requested.set()
+
+    async def flush(self) -> None:
+        """Write buffered records to disk and fsync the spool file."""
+
+        async with self._lock:
+            if not self._buffer:
+                return
+            lines, self._buffer = self._buffer, []
+            await asyncio.to_thread(self._write_lines, self._path, lines)
+
+    async def replay(
+        self,
+        apply: Callable[[list[UserRecord]], Awaitable[None]],
+        *,
+        batch_size: int,
+    ) -> int:
+        """Feed spooled records to ``apply`` in batches; return how many were replayed.
+
+        Failures propagate and leave the replay file in place, so the next
+        attempt starts over. Repeating an already applied batch is harmless:
+        the user upsert is idempotent, and the join history counts a join
+        only once per request date.
+        """
+
+        await self.flush()
+        async with self._lock:
+            if not self._replay_path.exists():
+                if not self._path.exists():
+                    return 0
+                self._path.replace(self._replay_path)
+
+        replayed = 0
+        batch: list[UserRecord] = []
+        lines = await asyncio.to_thread(self._read_lines, self._replay_path)
+        for line in lines:
+            try:
+                batch.append(UserRecord.from_json(json.loads(line)))
+            except (ValueError, TypeError, KeyError) as exc:
+                LOGGER.warning("Dropping malformed spool line %r: %s", line, exc)
+                continue
+            if len(batch) >= batch_size:
+                await apply(batch)
+                replayed += len(batch)
+                batch = []
+        if batch:
+            await apply(batch)
+            replayed += len(batch)
+
+        self._replay_path.unlink(missing_ok=True)
+        self._size = max(self._size - len(lines), 0)
+        set_spool_size(self._size)
+        return replayed
+
+    async def _write_loop(self) -> None:
+        while True:
+            with suppress(TimeoutError):
+                await asyncio.wait_for(
+                    self._flush_requested.wait(), timeout=self._config.fsync_interval
+                )
+            self._flush_requested.clear()
+            try:
+                await self.flush()
+            except OSError as exc:  # pragma: no cover - disk errors
+                LOGGER.error("Failed to write join request spool: %s", exc)
+
+    def _count_existing(self) -> int:
+        return sum(
+            len(self._read_lines(path)) for path in (self._replay_path, self._path) if path.exists()
+        )
+
+    @staticmethod
+    def _write_lines(path: Path, lines: list[str]) -> None:
+        with path.open("a", encoding="utf-8") as fh:
+            fh.write("\n".join(lines) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    @staticmethod
+    def _read_lines(path: Path) -> list[str]:
+        with path.open("r", encoding="utf-8") as fh:
+            return [line for line in (raw.strip() for raw in fh) if line]
+
+
+class SpoolingUsersRepository:
+    """Users repository guarded by a circuit breaker with a disk fallback.
+
+    Each database write gets a strict timeout. While the breaker is open,
+    records go straight to the spool so handlers never wait on Postgres;
+    :meth:`run_replay` drains the spool once the database answers again.
+    If the database was down at startup, ``prepare`` (schema creation) is
+    also run from there, without the per-write timeout, and records are
+    spooled until it has succeeded.
+    """
+
+    def __init__(
+        self,
+        repository: UsersRepository,
+        spool: JoinRequestSpool,
+        breaker: CircuitBreaker,
+        *,
+        call_timeout: float,
+        config: SpoolConfig,
+        prepare: Callable[[], Awaitable[None]] | None = None,
+    ) -> None:
+        self._repository = repository
+        self._spool = spool
+        self._breaker = breaker
+        self._call_timeout = call_timeout
+        self._config = config
+        self._prepare = prepare
+        self._prepare_lock = asyncio.Lock()
+
+    async def record_join_request(self, join_request: ChatJoinRequest, *, bot_id: int) -> None:
+        record = UserRecord.from_join_request(join_request, bot_id=bot_id)
+        if record is None:  # pragma: no cover - defensive guard
+            return
+        if self._prepare is None and self._breaker.allow_request():
+            try:
+                await asyncio.wait_for(self._repository.record(record), timeout=self._call_timeout)
+            except Exception as exc:
+                self._breaker.record_failure()
+                LOGGER.warning(
+                    "Database write failed for user %s, spooling: %s", record.telegram_id, exc
+                )
+            except BaseException:
+                self._breaker.release()
+                raise
+            else:
+                self._breaker.record_success()
+                return
+        await self._spool.append(record)
+
+    async def run_replay(self) -> None:
+        """Periodically replay spooled records while the circuit allows it."""
+
+        while True:
+            await asyncio.sleep(self._config.replay_interval)
+            await self.replay_once()
+
+    async def replay_once(self) -> None:
+        """Prepare the database if still needed, then replay the spool."""
+
+        if (not self._spool.size and self._prepare is None) or not self._breaker.allow_request():
+            return
+        try:
+            await self._ensure_prepared()
+            replayed = await asyncio.wait_for(
+                self._spool.replay(
+                    self._repository.record_many, batch_size=self._config.replay_batch_size
+                ),
+                timeout=self._config.replay_timeout,
+            )
+        except Exception as exc:
+            self._breaker.record_failure()
+            LOGGER.warning("Spool replay failed, will retry: %s", exc)
+            return
+        except BaseException:
+            self._breaker.release()
+            raise
+        self._breaker.record_success()
+        if replayed:
+            LOGGER.info("Replayed %s spooled join requests", replayed)
+
+    async def _ensure_prepared(self) -> None:
+        async with self._prepare_lock:
+            if self._prepare is None:
+                return
+            await self._prepare()
+            self._prepare = None
+            LOGGER.info("Database schema prepared, resuming direct writes")
@@ -0,0 +1,44 @@
+"""Startup phase timing."""
+
+from __future__ import annotations
+
+import json
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class StartupTimer:
+    """Collect wall-clock durations of named startup phases.
+
+    Phases may overlap (concurrent bootstrap steps are timed individually),
+    so the reported total is measured from construction rather than summed.
+    """
+
+    def __init__(self) -> None:
+        self._started_at = time.perf_counter()
+        self.phases: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - started_at
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self._started_at
+
+    def render(self) -> str:
+        """Human-readable table of phase durations."""
+
+        width = max([len(name) for name in self.phases] + [len("total")])
+        lines = [f"{'phase':<{width}}  seconds"]
+        lines.extend(f"{name:<{width}}  {seconds:7.3f}" for name, seconds in self.phases.items())
+        lines.append(f"{'total':<{width}}  {self.total:7.3f}")
+        return "\n".join(lines)
+
+    def to_json(self) -> str:
+        return json.dumps({"phases": self.phases, "total": self.total}, sort_keys=False)
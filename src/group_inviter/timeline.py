@@ -0,0 +1,59 @@
+"""Per-update stage timestamps carried in a context variable."""
+
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar, Token
+from typing import Callable
+
+
+class UpdateTimeline:
+    """Monotonic timestamps of the stages an update went through.
+
+    The first stage is ``received``; handlers add their own with
+    :func:`mark_stage`. :meth:`deltas` attributes the time between two
+    consecutive stages to the later one.
+    """
+
+    __slots__ = ("_clock", "stamps", "update_type")
+
+    def __init__(self, update_type: str, *, clock: Callable[[], float] = time.perf_counter) -> None:
+        self._clock = clock
+        self.update_type = update_type
+        self.stamps: list[tuple[str, float]] = [("received", clock())]
+
+    def mark(self, stage: str) -> None:
+        self.stamps.append((stage, self._clock()))
+
+    def deltas(self) -> list[tuple[str, float]]:
+        return [
+            (stage, max(0.0, at - previous))
+            for (_, previous), (stage, at) in zip(self.stamps, self.stamps[1:])
+        ]
+
+
+_TIMELINE: ContextVar[UpdateTimeline | None] = ContextVar(
+    "group_inviter_update_timeline", default=None
+)
+
+
+def current() -> UpdateTimeline | None:
+    """Timeline of the update handled by the running task, if any."""
+
+    return _TIMELINE.get()
+
+
+def start(timeline: UpdateTimeline) -> Token[UpdateTimeline | None]:
+    return _TIMELINE.set(timeline)
+
+
+def reset(token: Token[UpdateTimeline | None]) -> None:
+    _TIMELINE.reset(token)
+
+
+def mark_stage(stage: str) -> None:
+    """Timestamp ``stage`` of the current update; a no-op outside update handling."""
+
+    timeline = _TIMELINE.get()
+    if timeline is not None:
+        timeline.mark(stage)
@@ -0,0 +1,103 @@
+"""Webhook server delivering updates for every configured bot."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import signal
+from contextlib import suppress
+from typing import Awaitable, Callable, Sequence
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+from .configuration import WebhookConfig
+
+LOGGER = logging.getLogger(__name__)
+
+
+def webhook_path(config: WebhookConfig, bot: Bot) -> str:
+    """Route under which updates for ``bot`` are accepted."""
+
+    return f"{config.path.rstrip('/')}/{bot.id}"
+
+
+def build_webhook_app(
+    dispatcher: Dispatcher,
+    bots: Sequence[Bot],
+    config: WebhookConfig,
+    *,
+    lifecycle: bool = True,
+) -> web.Application:
+    """Create an aiohttp application with one route per bot.
+
+    ``lifecycle`` emits the dispatcher's startup/shutdown events (admin
+    notifications); prefork workers other than the first skip them.
+    """
+
+    app = web.Application()
+    for bot in bots:
+        SimpleRequestHandler(
+            dispatcher,
+            bot,
+            secret_token=config.secret_token,
+        ).register(app, path=webhook_path(config, bot))
+    if lifecycle:
+        setup_application(app, dispatcher, bot=bots[-1], bots=bots)
+    return app
+
+
+async def register_webhooks(
+    dispatcher: Dispatcher, bots: Sequence[Bot], config: WebhookConfig
+) -> None:
+    """Point Telegram at the webhook routes of all bots."""
+
+    allowed_updates = dispatcher.resolve_used_update_types()
+    for bot in bots:
+        await bot.set_webhook(
+            url=f"{(config.base_url or '').rstrip('/')}{webhook_path(config, bot)}",
+            secret_token=config.secret_token,
+            allowed_updates=allowed_updates,
+        )
+
+
+async def run_webhook(
+    dispatcher: Dispatcher,
+    bots: Sequence[Bot],
+    config: WebhookConfig,
+    *,
+    reuse_port: bool = False,
+    register: bool = True,
+    drain: Callable[[], Awaitable[object]] | None = None,
+) -> None:
+    """Serve webhook updates until SIGTERM/SIGINT is received.
+
+    On stop the listening socket is closed first, then ``drain`` waits for
+    updates still being handled in the background, and only then the
+    application shuts down and closes the bot sessions.
+    """
+
+    app = build_webhook_app(dispatcher, bots, config, lifecycle=register)
+    runner = web.AppRunner(app, access_log=None, handle_signals=False)
+    await runner.setup()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        with suppress(NotImplementedError):
+            loop.add_signal_handler(sig, stop.set)
+    try:
+        site = web.TCPSite(runner, config.host, config.port, reuse_port=reuse_port)
+        await site.start()
+        if register:
+            await register_webhooks(dispatcher, bots, config)
+        LOGGER.info("Serving webhooks on %s:%s for %s bot(s)", config.host, config.port, len(bots))
+        await stop.wait()
+        await site.stop()
+        if drain is not None:
+            await drain()
+    finally:
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            with suppress(NotImplementedError):
+                loop.remove_signal_handler(sig)
+        await runner.cleanup()
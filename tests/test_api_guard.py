@@ -0,0 +1,116 @@
+# ruff: noqa: S101
+"""Tests for the Bot API request guard."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiogram.exceptions import TelegramNetworkError
+from aiogram.methods import ApproveChatJoinRequest, SendMessage
+from prometheus_client import REGISTRY
+
+from group_inviter.api_guard import BotApiGuard
+from group_inviter.configuration import BotApiConfig, CircuitBreakerConfig
+from group_inviter.resilience import CircuitOpenError, CircuitState
+
+
+def _guard() -> BotApiGuard:
+    breaker = CircuitBreakerConfig(window_size=2, min_calls=2, failure_ratio=1, reset_timeout=60)
+    return BotApiGuard(
+        BotApiConfig(breaker=breaker, method_timeouts={"sendMessage": 0.01}),
+        labels={42: "main"},
+    )
+
+
+def _shed(bot: str) -> float:
+    labels = {"bot": bot, "method": "sendMessage"}
+    return REGISTRY.get_sample_value("group_inviter_bot_api_shed_total", labels) or 0.0
+
+
+def _send_message() -> SendMessage:
+    return SendMessage(chat_id=1, text="hi")
+
+
+def test_guard_enforces_method_timeout_budget() -> None:
+    guard = _guard()
+
+    async def slow(bot: Any, method: Any) -> None:
+        await asyncio.sleep(1)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(guard(slow, AsyncMock(), _send_message()))
+
+
+def test_guard_sheds_non_critical_calls_once_open() -> None:
+    guard = _guard()
+    failing = AsyncMock(side_effect=TelegramNetworkError(method=_send_message(), message="down"))
+    for _ in range(2):
+        with pytest.raises(TelegramNetworkError):
+            asyncio.run(guard(failing, AsyncMock(), _send_message()))
+    assert guard.breaker.state is CircuitState.OPEN
+
+    make_request = AsyncMock(return_value="ok")
+    shed_before = _shed("main")
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(guard(make_request, MagicMock(id=42), _send_message()))
+    assert make_request.await_count == 0
+    assert _shed("main") == shed_before + 1
+
+    approve = ApproveChatJoinRequest(chat_id=-100, user_id=1)
+    assert asyncio.run(guard(make_request, AsyncMock(), approve)) == "ok"
+    assert make_request.await_count == 1
+
+
+def test_guard_releases_a_cancelled_half_open_probe() -> None:
+    config = CircuitBreakerConfig(window_size=1, min_calls=1, failure_ratio=1, reset_timeout=0.01)
+    guard = BotApiGuard(BotApiConfig(breaker=config))
+    failing = AsyncMock(side_effect=TelegramNetworkError(method=_send_message(), message="down"))
+    with pytest.raises(TelegramNetworkError):
+        asyncio.run(guard(failing, AsyncMock(), _send_message()))
+
+    async def hang(bot: Any, method: Any) -> None:
+        await asyncio.sleep(10)
+
+    async def scenario() -> str:
+        await asyncio.sleep(0.02)
+        probe = asyncio.create_task(guard(hang, AsyncMock(), _send_message()))
+        await asyncio.sleep(0)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        return await guard(AsyncMock(return_value="ok"), AsyncMock(), _send_message())
+
+    assert asyncio.run(scenario()) == "ok"
+    assert guard.breaker.state is CircuitState.CLOSED
+
+
+def test_critical_calls_do_not_settle_a_half_open_probe() -> None:
+    config = CircuitBreakerConfig(window_size=1, min_calls=1, failure_ratio=1, reset_timeout=0.01)
+    guard = BotApiGuard(BotApiConfig(breaker=config))
+    failing = AsyncMock(side_effect=TelegramNetworkError(method=_send_message(), message="down"))
+    with pytest.raises(TelegramNetworkError):
+        asyncio.run(guard(failing, AsyncMock(), _send_message()))
+    probe_released = asyncio.Event()
+
+    async def slow_probe(bot: Any, method: Any) -> str:
+        await probe_released.wait()
+        return "ok"
+
+    async def scenario() -> CircuitState:
+        await asyncio.sleep(0.02)
+        probe = asyncio.create_task(guard(slow_probe, AsyncMock(), _send_message()))
+        await asyncio.sleep(0)
+        approve = ApproveChatJoinRequest(chat_id=-100, user_id=1)
+        assert await guard(AsyncMock(return_value="ok"), AsyncMock(), approve) == "ok"
+        state = guard.breaker.state
+        with pytest.raises(CircuitOpenError):
+            await guard(AsyncMock(return_value="ok"), AsyncMock(), _send_message())
+        probe_released.set()
+        assert await probe == "ok"
+        return state
+
+    assert asyncio.run(scenario()) is CircuitState.HALF_OPEN
+    assert guard.breaker.state is CircuitState.CLOSED
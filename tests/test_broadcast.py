@@ -0,0 +1,306 @@
+# ruff: noqa: S101, S105, S106
+"""Tests for resumable admin broadcasts."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Sequence
+from unittest.mock import AsyncMock, MagicMock
+
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+
+from group_inviter.broadcast import Broadcaster
+from group_inviter.configuration import AppConfig
+from group_inviter.database import BroadcastRecord, Recipient
+from group_inviter.ratelimit import AsyncRateLimiter
+
+
+class _Repository:
+    """In-memory stand-in for :class:`BroadcastsRepository`."""
+
+    def __init__(self, user_ids: Sequence[int]) -> None:
+        self.users = list(user_ids)
+        self.blocks: set[tuple[int, int]] = set()
+        self.records: dict[int, BroadcastRecord] = {}
+        self.status: dict[int, str] = {}
+        self.owners: dict[int, str | None] = {}
+        self.checkpoints: list[int] = []
+        self.renewals = 0
+
+    async def create(
+        self,
+        *,
+        bot_id: int,
+        source_chat_id: int,
+        message_id: int,
+        joined_chat_id: int | None,
+        owner: str,
+        lease_seconds: float,
+    ) -> BroadcastRecord:
+        record = BroadcastRecord(
+            len(self.records) + 1, bot_id, source_chat_id, message_id, joined_chat_id, 0, 0, 0, 0
+        )
+        self.records[record.id] = record
+        self.status[record.id] = "running"
+        self.owners[record.id] = owner
+        return record
+
+    async def claim_orphaned(
+        self, bot_ids: Sequence[int], owner: str, lease_seconds: float
+    ) -> list[BroadcastRecord]:
+        claimed = [
+            record
+            for record in self.records.values()
+            if self.status[record.id] == "running" and self.owners[record.id] is None
+        ]
+        for record in claimed:
+            self.owners[record.id] = owner
+        return claimed
+
+    async def recipients(
+        self, bot_id: int, after_user_id: int, joined_chat_id: int | None, limit: int
+    ) -> list[Recipient]:
+        reachable = sorted(
+            user_id
+            for user_id in self.users
+            if user_id > after_user_id and (bot_id, user_id) not in self.blocks
+        )
+        return [Recipient(user_id, user_id) for user_id in reachable[:limit]]
+
+    async def checkpoint(
+        self,
+        record: BroadcastRecord,
+        *,
+        owner: str,
+        lease_seconds: float,
+        blocked_user_ids: Sequence[int] = (),
+    ) -> bool:
+        self.blocks.update((record.bot_id, user_id) for user_id in blocked_user_ids)
+        if self.status[record.id] != "running" or self.owners[record.id] != owner:
+            return False
+        self.records[record.id] = record
+        self.checkpoints.append(record.last_user_id)
+        return True
+
+    async def renew(self, broadcast_id: int, owner: str, lease_seconds: float) -> bool:
+        self.renewals += 1
+        return self.status[broadcast_id] == "running" and self.owners[broadcast_id] == owner
+
+    async def finish(self, broadcast_id: int, owner: str) -> None:
+        self.status[broadcast_id] = "finished"
+
+    async def release(self, owner: str) -> None:
+        for broadcast_id, current in self.owners.items():
+            if current == owner:
+                self.owners[broadcast_id] = None
+
+    async def cancel(self, broadcast_id: int, bot_id: int) -> bool:
+        record = self.records.get(broadcast_id)
+        if record is None or record.bot_id != bot_id or self.status[broadcast_id] != "running":
+            return False
+        self.status[broadcast_id] = "cancelled"
+        return True
+
+
+def _config(**broadcast: Any) -> AppConfig:
+    return AppConfig.model_validate(
+        {
+            "telegram": {"bot_token": "42:abcdefghij", "admin_chat_id": 5},
+            "database": {"database": "db", "user": "user", "password": "secret"},
+            "broadcast": {"rate": 1000, "burst": 100, "batch_size": 2} | broadcast,
+        }
+    )
+
+
+def _bot() -> MagicMock:
+    bot = MagicMock()
+    bot.id = 42
+    bot.token = "42:abcdefghij"
+    bot.copy_message = AsyncMock()
+    bot.send_message = AsyncMock()
+    return bot
+
+
+async def _wait_for(predicate: Any, timeout: float = 1.0) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        assert loop.time() < deadline, "condition not reached in time"
+        await asyncio.sleep(0.005)
+
+
+def test_broadcast_checkpoints_every_page_and_marks_blocked_users() -> None:
+    repository = _Repository([1, 2, 3, 4, 5])
+    bot = _bot()
+
+    async def copy_message(*, chat_id: int, **kwargs: Any) -> None:
+        if chat_id == 4:
+            raise TelegramForbiddenError(MagicMock(), "bot was blocked by the user")
+
+    bot.copy_message.side_effect = copy_message
+    broadcaster = Broadcaster(repository, [bot], _config(), owner="a")  # type: ignore[arg-type]
+
+    async def scenario() -> None:
+        record = await broadcaster.start(bot, 5, 77)
+        await _wait_for(lambda: repository.status[record.id] == "finished")
+        await _wait_for(lambda: not broadcaster.active)
+
+    asyncio.run(scenario())
+
+    final = repository.records[1]
+    assert (final.sent, final.blocked, final.failed) == (4, 1, 0)
+    assert repository.checkpoints == [2, 4, 5]
+    assert repository.blocks == {(42, 4)}
+    assert bot.copy_message.await_args.kwargs == {"chat_id": 5, "from_chat_id": 5, "message_id": 77}
+    assert "Доставлено: 4" in bot.send_message.await_args.kwargs["text"]
+
+
+def test_blocks_only_hide_users_from_the_bot_that_hit_them() -> None:
+    repository = _Repository([1, 2, 3])
+    repository.blocks = {(42, 2), (43, 3)}
+    bot = _bot()
+    broadcaster = Broadcaster(repository, [bot], _config(), owner="a")  # type: ignore[arg-type]
+
+    async def scenario() -> None:
+        await broadcaster.start(bot, 5, 77)
+        await _wait_for(lambda: repository.status[1] == "finished")
+
+    asyncio.run(scenario())
+
+    assert [call.kwargs["chat_id"] for call in bot.copy_message.await_args_list] == [1, 3]
+
+
+def test_flood_wait_pauses_the_limiter_and_retries() -> None:
+    repository = _Repository([1, 2])
+    bot = _bot()
+    bot.copy_message.side_effect = [
+        TelegramRetryAfter(MagicMock(), "Too Many Requests", retry_after=0),
+        None,
+        None,
+    ]
+    limiter = MagicMock(acquire=AsyncMock())
+    broadcaster = Broadcaster(  # type: ignore[arg-type]
+        repository, [bot], _config(concurrency=1), owner="a", limiters={bot.id: limiter}
+    )
+
+    async def scenario() -> None:
+        await broadcaster.start(bot, 5, 77)
+        await _wait_for(lambda: repository.status[1] == "finished")
+
+    asyncio.run(scenario())
+
+    limiter.pause.assert_called_once_with(0)
+    assert bot.copy_message.await_count == 3
+    assert repository.records[1].sent == 2
+
+
+def test_orphaned_broadcast_resumes_after_last_checkpoint() -> None:
+    repository = _Repository([1, 2, 3, 4])
+    repository.records[1] = BroadcastRecord(1, 42, 5, 77, None, 2, 2, 0, 0)
+    repository.status[1] = "running"
+    repository.owners[1] = None
+    bot = _bot()
+    broadcaster = Broadcaster(repository, [bot], _config(), owner="b")  # type: ignore[arg-type]
+
+    async def scenario() -> None:
+        task = asyncio.create_task(broadcaster.run())
+        await _wait_for(lambda: repository.status[1] == "finished")
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+    assert [call.kwargs["chat_id"] for call in bot.copy_message.await_args_list] == [3, 4]
+    assert repository.records[1].sent == 4
+
+
+def test_each_bot_is_paced_and_paused_by_its_own_limiter() -> None:
+    repository = _Repository([1, 2])
+    flooded = _bot()
+    flooded.copy_message.side_effect = [
+        TelegramRetryAfter(MagicMock(), "Too Many Requests", retry_after=0),
+        None,
+        None,
+    ]
+    other = _bot()
+    other.id = 43
+    limiters = {bot.id: MagicMock(acquire=AsyncMock()) for bot in (flooded, other)}
+    broadcaster = Broadcaster(  # type: ignore[arg-type]
+        repository, [flooded, other], _config(concurrency=1), owner="a", limiters=limiters
+    )
+
+    async def scenario() -> None:
+        await broadcaster.start(flooded, 5, 77)
+        await broadcaster.start(other, 5, 78)
+        await _wait_for(lambda: set(repository.status.values()) == {"finished"})
+
+    asyncio.run(scenario())
+
+    limiters[42].pause.assert_called_once_with(0)
+    limiters[43].pause.assert_not_called()
+    assert limiters[42].acquire.await_count == 3
+    assert limiters[43].acquire.await_count == 2
+
+
+def test_cancel_is_limited_to_the_starting_bot_and_shutdown_releases_the_lease() -> None:
+    repository = _Repository(range(1, 50))
+    bot = _bot()
+    other_bot = _bot()
+    other_bot.id = 43
+    broadcaster = Broadcaster(  # type: ignore[arg-type]
+        repository, [bot], _config(rate=50, burst=1), owner="a"
+    )
+
+    async def scenario() -> None:
+        first = await broadcaster.start(bot, 5, 77)
+        await broadcaster.start(bot, 5, 78)
+        await asyncio.sleep(0.05)
+        assert await broadcaster.cancel(other_bot, first.id) is False
+        assert await broadcaster.cancel(bot, first.id) is True
+        await broadcaster.stop()
+
+    asyncio.run(scenario())
+
+    assert repository.status == {1: "cancelled", 2: "running"}
+    assert repository.owners[2] is None
+    assert bot.copy_message.await_count < 10
+
+
+def test_lease_is_renewed_during_a_page_and_a_lost_lease_stops_sending() -> None:
+    repository = _Repository([1, 2, 3])
+    bot = _bot()
+    taken_over = asyncio.Event()
+
+    async def copy_message(*, chat_id: int, **kwargs: Any) -> None:
+        if chat_id == 2:
+            await asyncio.sleep(0.05)
+            repository.owners[1] = "b"
+            await taken_over.wait()
+
+    bot.copy_message.side_effect = copy_message
+    broadcaster = Broadcaster(  # type: ignore[arg-type]
+        repository, [bot], _config(batch_size=10, lease_seconds=0.03, concurrency=1), owner="a"
+    )
+
+    async def scenario() -> None:
+        await broadcaster.start(bot, 5, 77)
+        await _wait_for(lambda: not broadcaster.active)
+
+    asyncio.run(scenario())
+
+    assert repository.renewals >= 2
+    assert [call.kwargs["chat_id"] for call in bot.copy_message.await_args_list] == [1, 2]
+    assert repository.checkpoints == []
+
+
+def test_rate_limiter_pause_holds_every_waiter() -> None:
+    limiter = AsyncRateLimiter(rate=1000, burst=10)
+
+    async def scenario() -> float:
+        loop = asyncio.get_running_loop()
+        limiter.pause(0.1)
+        started = loop.time()
+        await limiter.acquire()
+        return loop.time() - started
+
+    assert asyncio.run(scenario()) >= 0.09
@@ -0,0 +1,59 @@
+# ruff: noqa: S101, S106
+"""Tests for configuration models."""
+
+from __future__ import annotations
+
+import pytest
+from pydantic import ValidationError
+
+from group_inviter.configuration import TelegramConfig
+
+
+def test_single_token_yields_one_profile() -> None:
+    telegram = TelegramConfig(bot_token="123:abcdefghij", admin_chat_id=5)
+
+    (profile,) = telegram.profiles()
+
+    assert profile.admin_chat_id == 5
+    assert profile.label == "123"
+    assert telegram.profile_for("123:abcdefghij") == profile
+
+
+def test_bot_list_inherits_top_level_defaults() -> None:
+    telegram = TelegramConfig.model_validate(
+        {
+            "admin_chat_id": 5,
+            "texts": {"welcome_caption": "Hello"},
+            "bots": [
+                {"name": "brand-a", "bot_token": "1:aaaaaaaaaa"},
+                {
+                    "bot_token": "2:bbbbbbbbbb",
+                    "admin_chat_id": 9,
+                    "texts": {"welcome_caption": "Hi"},
+                },
+            ],
+        }
+    )
+
+    first, second = telegram.profiles()
+
+    assert (first.label, first.admin_chat_id, first.texts.welcome_caption) == (
+        "brand-a",
+        5,
+        "Hello",
+    )
+    assert (second.label, second.admin_chat_id, second.texts.welcome_caption) == ("2", 9, "Hi")
+
+
+def test_bot_tokens_are_required_and_unique() -> None:
+    with pytest.raises(ValidationError):
+        TelegramConfig()
+    with pytest.raises(ValidationError):
+        TelegramConfig.model_validate(
+            {"bots": [{"bot_token": "1:aaaaaaaaaa"}, {"bot_token": "1:aaaaaaaaaa"}]}
+        )
+
+
+def test_webhook_requires_base_url_when_enabled() -> None:
+    with pytest.raises(ValidationError):
+        TelegramConfig.model_validate({"bot_token": "1:aaaaaaaaaa", "webhook": {"enabled": True}})
@@ -0,0 +1,62 @@
+# ruff: noqa: S101, S106
+"""Tests for debug endpoints served on the metrics port."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+from group_inviter.configuration import MetricsConfig, ProfilerConfig
+from group_inviter.debug_http import build_debug_routes
+from group_inviter.profiling import StackSampler, render_collapsed
+
+TOKEN = "0123456789abcdef"  # noqa: S105 - test fixture
+
+
+def _call(app: Any, *, query: str = "", token: str | None = TOKEN) -> tuple[str, str]:
+    captured: dict[str, str] = {}
+
+    def start_response(status: str, headers: list[tuple[str, str]]) -> None:
+        captured["status"] = status
+
+    environ = {"QUERY_STRING": query}
+    if token is not None:
+        environ["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    body = b"".join(app(environ, start_response)).decode()
+    return captured["status"], body
+
+
+def _busy_worker(stop: threading.Event) -> None:
+    while not stop.is_set():
+        time.sleep(0.001)
+
+
+def test_sampler_collects_stacks_of_other_threads() -> None:
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_worker, args=(stop,), name="busy worker")
+    worker.start()
+    try:
+        stacks = StackSampler(interval=0.001).sample(0.05)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert stacks is not None
+    rendered = render_collapsed(stacks)
+    assert any(line.startswith("busy_worker;") for line in rendered.splitlines())
+    assert "test_debug_http:_busy_worker" in rendered
+
+
+def test_profile_endpoint_requires_token_and_validates_seconds() -> None:
+    config = MetricsConfig(debug_token=TOKEN, profiler=ProfilerConfig(enabled=True, max_seconds=1))
+    app = build_debug_routes(config)["/debug/profile"]
+
+    assert _call(app, query="seconds=0.01", token="wrong-token-value")[0] == "401 Unauthorized"
+    assert _call(app, query="seconds=5")[0] == "400 Bad Request"
+    status, _ = _call(app, query="seconds=0.01")
+    assert status == "200 OK"
+
+
+def test_debug_routes_are_absent_when_disabled() -> None:
+    assert build_debug_routes(MetricsConfig()) == {}
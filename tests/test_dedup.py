@@ -0,0 +1,83 @@
+# ruff: noqa: S101
+"""Tests for duplicate suppression helpers."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock
+
+from aiogram.types import Update
+
+from group_inviter.cache import TTLCache
+from group_inviter.configuration import DedupConfig
+from group_inviter.dedup import JoinRequestDeduplicator
+from group_inviter.middlewares.update_dedup import UpdateDedupMiddleware
+
+
+class _Clock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_cache_expires_entries() -> None:
+    clock = _Clock()
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=5, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 4.9
+    assert cache.get("a") == 1
+
+    clock.now = 5.0
+    assert cache.get("a") is None
+    assert cache.add("a", 2) is True
+
+
+def test_ttl_cache_evicts_least_recently_used() -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert len(cache) == 2
+
+
+def test_deduplicator_rejects_repeats_and_allows_after_release() -> None:
+    dedup = JoinRequestDeduplicator(DedupConfig())
+
+    async def scenario() -> list[bool]:
+        first = await dedup.claim(-100, 1)
+        second = await dedup.claim(-100, 1)
+        await dedup.release(-100, 1)
+        third = await dedup.claim(-100, 1)
+        return [first, second, third]
+
+    assert asyncio.run(scenario()) == [True, False, True]
+
+
+def test_deduplicator_respects_repository_verdict() -> None:
+    repository = AsyncMock()
+    repository.claim.return_value = False
+    dedup = JoinRequestDeduplicator(DedupConfig(ttl_seconds=30), repository)
+
+    assert asyncio.run(dedup.claim(-100, 2)) is False
+    repository.claim.assert_awaited_once_with(-100, 2, 30)
+
+
+def test_update_dedup_middleware_skips_redelivered_updates() -> None:
+    middleware = UpdateDedupMiddleware(ttl=60, maxsize=100)
+    handler = AsyncMock(return_value="ok")
+    update = Update(update_id=10)
+
+    async def scenario() -> list[object]:
+        return [await middleware(handler, update, {}), await middleware(handler, update, {})]
+
+    assert asyncio.run(scenario()) == ["ok", None]
+    assert handler.await_count == 1
@@ -0,0 +1,134 @@
+# ruff: noqa: S101
+"""Tests for the bulk member import."""
+
+from __future__ import annotations
+
+import asyncio
+import io
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+import pytest
+
+from group_inviter.importer import IMPORT_COLUMNS, CsvUserReader, ImportProgress, import_users
+from group_inviter.main import _parse_args
+
+_JOINED_AT = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+def _reader(text: str, **kwargs: Any) -> CsvUserReader:
+    return CsvUserReader(io.StringIO(text), joined_at=_JOINED_AT, **kwargs)
+
+
+class _Connection:
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+        self.copied: list[tuple[Any, ...]] = []
+
+    async def execute(self, sql: str, *args: Any) -> None:
+        self.statements.append(" ".join(sql.split()))
+
+    async def copy_records_to_table(
+        self, table: str, *, records: AsyncIterator[tuple[Any, ...]], columns: tuple[str, ...]
+    ) -> None:
+        assert (table, columns) == ("users_import", IMPORT_COLUMNS)
+        self.copied.extend([record async for record in records])
+
+    async def fetchrow(self, sql: str, *args: Any) -> dict[str, int]:
+        self.statements.append("MERGE")
+        return {"inserted": 2, "updated": 1}
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        yield
+
+
+class _Pool:
+    def __init__(self) -> None:
+        self.connection = _Connection()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[_Connection]:
+        yield self.connection
+
+
+def test_reader_maps_aliases_and_converts_values() -> None:
+    reader = _reader(
+        "ID,First_Name,username,is_premium,joined_at,notes\n"
+        "1,Ann,ann,yes,2025-05-01T10:00:00,x\n"
+        "2,,,0,,\n",
+        chat_id=-100,
+    )
+
+    first, second = reader.batch(10)
+
+    assert dict(zip(IMPORT_COLUMNS, first, strict=True)) == {
+        "telegram_id": 1,
+        "first_name": "Ann",
+        "last_name": None,
+        "username": "ann",
+        "phone_number": None,
+        "language_code": None,
+        "is_premium": True,
+        "is_bot": None,
+        "joined_chat_id": -100,
+        "user_chat_id": None,
+        "joined_at": datetime(2025, 5, 1, 10, tzinfo=UTC),
+    }
+    assert second[0] == 2 and second[6] is False and second[-1] == _JOINED_AT
+    assert reader.batch(10) == []
+
+
+def test_reader_rejects_bad_rows_and_reads_in_bounded_batches() -> None:
+    reader = _reader("user_id\n1\nabc\n\n2\n3\n,\n4\n")
+
+    batches = [reader.batch(2), reader.batch(2), reader.batch(2)]
+
+    assert [[record[0] for record in batch] for batch in batches] == [[1, 2], [3, 4], []]
+    assert (reader.read, reader.rejected) == (5, 1)
+
+
+def test_reader_requires_an_id_column() -> None:
+    with pytest.raises(ValueError, match="telegram_id"):
+        _reader("name\nAnn\n")
+    with pytest.raises(ValueError, match="empty"):
+        _reader("")
+
+
+def test_import_streams_into_staging_then_merges_once() -> None:
+    pool = _Pool()
+    progress: list[ImportProgress] = []
+    reader = _reader("telegram_id\n" + "".join(f"{n}\n" for n in range(1, 6)))
+
+    report = asyncio.run(import_users(pool, reader, batch_size=2, progress=progress.append))  # type: ignore[arg-type]
+
+    connection = pool.connection
+    assert [record[0] for record in connection.copied] == [1, 2, 3, 4, 5]
+    assert [item.read for item in progress] == [2, 4, 5]
+    assert connection.statements[0].startswith("CREATE TEMPORARY TABLE IF NOT EXISTS users_import")
+    assert connection.statements[1:] == [
+        "TRUNCATE users_import",
+        "MERGE",
+        "INSERT INTO user_joins (telegram_id, chat_id, first_joined_at, last_joined_at)"
+        " SELECT telegram_id, joined_chat_id, min(joined_at), max(joined_at) FROM users_import"
+        " WHERE joined_chat_id IS NOT NULL GROUP BY telegram_id, joined_chat_id"
+        " ON CONFLICT (telegram_id, chat_id) DO UPDATE"
+        " SET first_joined_at = LEAST(user_joins.first_joined_at, EXCLUDED.first_joined_at)",
+        "DROP TABLE IF EXISTS users_import",
+    ]
+    assert (report.read, report.inserted, report.updated) == (5, 2, 1)
+
+
+def test_import_subcommand_arguments() -> None:
+    args = _parse_args(["import", "members.csv", "--chat-id", "-100", "--config", "c.yaml"])
+    default = _parse_args(["--config", "c.yaml"])
+
+    assert (args.command, args.csv, args.chat_id, args.config) == (
+        "import",
+        Path("members.csv"),
+        -100,
+        "c.yaml",
+    )
+    assert default.command is None
@@ -0,0 +1,249 @@
+# ruff: noqa: S101, S106
+"""Tests for the invite link lifecycle scheduler."""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+from datetime import UTC, datetime, timedelta
+from typing import Any, Sequence
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from group_inviter.configuration import AppConfig, InvitesConfig
+from group_inviter.database import ManagedInvite
+from group_inviter.invites import InviteLinkScheduler, InviteOptions, parse_duration
+from group_inviter.ratelimit import AsyncRateLimiter
+
+
+class _Repository:
+    """In-memory stand-in for :class:`InviteLinksRepository`."""
+
+    def __init__(self, *invites: ManagedInvite) -> None:
+        self.rows = {invite.invite_link: invite for invite in invites}
+        self.revoked: set[str] = set()
+
+    async def add(self, invite: ManagedInvite) -> None:
+        self.rows[invite.invite_link] = invite
+
+    async def active(self) -> list[ManagedInvite]:
+        return [row for link, row in self.rows.items() if link not in self.revoked]
+
+    async def record_usage(self, invite_link: str) -> ManagedInvite | None:
+        row = self.rows.get(invite_link)
+        if row is None or invite_link in self.revoked:
+            return None
+        row = dataclasses.replace(row, usage_count=row.usage_count + 1)
+        self.rows[invite_link] = row
+        return row
+
+    async def exists(self, invite_link: str) -> bool:
+        return invite_link in self.rows
+
+    async def claim(self, invite_links: Sequence[str]) -> list[ManagedInvite]:
+        claimed = [self.rows[link] for link in invite_links if link not in self.revoked]
+        self.revoked.update(invite.invite_link for invite in claimed)
+        return claimed
+
+    async def unclaim(self, invite_links: Sequence[str]) -> None:
+        self.revoked.difference_update(invite_links)
+
+
+def _config(*, admin_chat_id: int = 5, **invites: Any) -> AppConfig:
+    return AppConfig.model_validate(
+        {
+            "telegram": {"bot_token": "42:abcdefghij", "admin_chat_id": admin_chat_id},
+            "database": {"database": "db", "user": "user", "password": "secret"},
+            "invites": invites,
+        }
+    )
+
+
+def _bot() -> MagicMock:
+    bot = MagicMock()
+    bot.id = 42
+    bot.revoke_chat_invite_link = AsyncMock()
+    bot.send_message = AsyncMock()
+    links = iter(range(1, 100))
+    bot.create_chat_invite_link = AsyncMock(
+        side_effect=lambda **kwargs: MagicMock(invite_link=f"https://t.me/+new{next(links)}")
+    )
+    return bot
+
+
+def _invite(link: str, *, expires_in: float | None = None, **fields: Any) -> ManagedInvite:
+    expire_at = None if expires_in is None else datetime.now(UTC) + timedelta(seconds=expires_in)
+    defaults: dict[str, Any] = {
+        "bot_id": 42,
+        "chat_id": -100,
+        "name": None,
+        "expire_after": expires_in,
+        "usage_limit": None,
+        "rotate": False,
+    }
+    return ManagedInvite(invite_link=link, expire_at=expire_at, **(defaults | fields))
+
+
+async def _run_briefly(scheduler: InviteLinkScheduler, seconds: float) -> None:
+    task = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(seconds)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+def test_parse_duration_understands_units() -> None:
+    assert parse_duration("90") == 90
+    assert parse_duration("30m") == 1800
+    assert parse_duration("12H") == 43200
+    assert parse_duration("1.5d") == 129600
+    for invalid in ("", "0", "-5m", "3w"):
+        with pytest.raises(ValueError, match="Invalid duration"):
+            parse_duration(invalid)
+
+
+def test_invite_options_fall_back_to_configured_defaults() -> None:
+    defaults = InvitesConfig(default_expire=3600, rotate=True)
+
+    assert InviteOptions.parse([], defaults) == InviteOptions(3600, None, rotate=True)
+    assert InviteOptions.parse(["limit=5", "expire=never"], defaults) == InviteOptions(
+        None, 5, rotate=True
+    )
+    assert InviteOptions.parse(["norotate"], defaults).rotate is False
+    for invalid in (["limit=0"], ["colour=red"], ["expire=never", "rotate"]):
+        with pytest.raises(ValueError):
+            InviteOptions.parse(invalid, InvitesConfig())
+
+
+def test_scheduler_revokes_links_when_their_deadline_passes() -> None:
+    repository = _Repository(
+        _invite("https://t.me/+late", expires_in=30),
+        _invite("https://t.me/+soon", expires_in=0.05),
+        _invite("https://t.me/+forever"),
+    )
+    bot = _bot()
+    scheduler = InviteLinkScheduler(repository, [bot], _config())  # type: ignore[arg-type]
+
+    asyncio.run(_run_briefly(scheduler, 0.3))
+
+    bot.revoke_chat_invite_link.assert_awaited_once_with(-100, "https://t.me/+soon")
+    assert repository.revoked == {"https://t.me/+soon"}
+    assert scheduler.scheduled == 1
+
+
+def test_scheduler_rotates_exhausted_links_and_notifies_admin() -> None:
+    repository = _Repository(
+        _invite("https://t.me/+limited", expires_in=3600, usage_limit=2, rotate=True)
+    )
+    bot = _bot()
+    scheduler = InviteLinkScheduler(repository, [bot], _config())  # type: ignore[arg-type]
+    scheduler.update_config(_config(admin_chat_id=6))
+
+    async def scenario() -> None:
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0.01)
+        await scheduler.record_usage("https://t.me/+limited")
+        await asyncio.sleep(0.01)
+        bot.revoke_chat_invite_link.assert_not_awaited()
+        await scheduler.record_usage("https://t.me/+limited")
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+    bot.revoke_chat_invite_link.assert_awaited_once_with(-100, "https://t.me/+limited")
+    create_kwargs = bot.create_chat_invite_link.await_args.kwargs
+    assert create_kwargs["chat_id"] == -100
+    assert create_kwargs["creates_join_request"] is True
+    assert create_kwargs["expire_date"] > datetime.now(UTC) + timedelta(minutes=59)
+    replacement = repository.rows["https://t.me/+new1"]
+    assert (replacement.usage_limit, replacement.rotate) == (2, True)
+    assert scheduler.scheduled == 1
+    assert "https://t.me/+new1" in bot.send_message.await_args.kwargs["text"]
+    assert bot.send_message.await_args.kwargs["chat_id"] == 6
+
+
+def test_scheduler_skips_links_claimed_elsewhere_and_retries_failures() -> None:
+    repository = _Repository(
+        _invite("https://t.me/+taken", expires_in=0.01),
+        _invite("https://t.me/+flaky", expires_in=0.01),
+    )
+    repository.revoked.add("https://t.me/+taken")
+    bot = _bot()
+    bot.revoke_chat_invite_link.side_effect = RuntimeError("network")
+    scheduler = InviteLinkScheduler(repository, [bot], _config())  # type: ignore[arg-type]
+
+    async def scenario() -> None:
+        scheduler.schedule(repository.rows["https://t.me/+taken"])
+        scheduler.schedule(repository.rows["https://t.me/+flaky"])
+        await asyncio.sleep(0.02)
+        await scheduler.process(["https://t.me/+taken", "https://t.me/+flaky"])
+
+    asyncio.run(scenario())
+
+    bot.revoke_chat_invite_link.assert_awaited_once_with(-100, "https://t.me/+flaky")
+    assert repository.revoked == {"https://t.me/+taken"}
+    deadline = scheduler.next_deadline()
+    assert deadline is not None and deadline > datetime.now(UTC).timestamp() + 30
+
+
+def test_create_tracks_only_links_with_a_lifecycle() -> None:
+    repository = _Repository()
+    bot = _bot()
+    scheduler = InviteLinkScheduler(repository, [bot], _config())  # type: ignore[arg-type]
+
+    async def scenario() -> None:
+        await scheduler.create(bot, -100, InviteOptions(), name="plain")
+        await scheduler.create(bot, -100, InviteOptions(expire_after=60), name="timed")
+
+    asyncio.run(scenario())
+
+    assert list(repository.rows) == ["https://t.me/+new2"]
+    assert bot.create_chat_invite_link.await_args_list[0].kwargs["expire_date"] is None
+    assert scheduler.scheduled == 1
+
+
+def test_rate_limiter_spaces_out_calls_beyond_the_burst() -> None:
+    limiter = AsyncRateLimiter(rate=50, burst=2)
+
+    async def scenario() -> float:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for _ in range(5):
+            await limiter.acquire()
+        return loop.time() - started
+
+    elapsed = asyncio.run(scenario())
+
+    assert 0.05 <= elapsed < 0.5
+
+
+def test_unmanaged_links_are_looked_up_once() -> None:
+    repository = _Repository()
+    repository.record_usage = AsyncMock(return_value=None)  # type: ignore[method-assign]
+    scheduler = InviteLinkScheduler(repository, [_bot()], _config())  # type: ignore[arg-type]
+
+    async def scenario() -> None:
+        for _ in range(3):
+            await scheduler.record_usage("https://t.me/+external")
+
+    asyncio.run(scenario())
+
+    repository.record_usage.assert_awaited_once_with("https://t.me/+external")
+
+
+def test_links_held_by_a_revocation_are_not_cached_as_unmanaged() -> None:
+    invite = _invite("https://t.me/+held", usage_limit=5)
+    repository = _Repository(invite)
+    scheduler = InviteLinkScheduler(repository, [_bot()], _config())  # type: ignore[arg-type]
+
+    async def scenario() -> None:
+        await repository.claim([invite.invite_link])
+        await scheduler.record_usage(invite.invite_link)
+        await repository.unclaim([invite.invite_link])
+        await scheduler.record_usage(invite.invite_link)
+
+    asyncio.run(scenario())
+
+    assert repository.rows[invite.invite_link].usage_count == 1
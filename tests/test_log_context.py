@@ -0,0 +1,94 @@
+# ruff: noqa: S101
+"""Tests for context-enriched JSON logging."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from datetime import UTC
+from typing import Any
+from unittest.mock import MagicMock
+
+from aiogram.types import Update
+
+from group_inviter import log_context
+from group_inviter.logging_config import JsonFormatter
+from group_inviter.middlewares import LogContextMiddleware
+
+
+def _record(created: float = 1_700_000_000.25) -> logging.LogRecord:
+    record = logging.makeLogRecord(
+        {"name": "test", "levelname": "INFO", "msg": "hello %s", "args": ("world",)}
+    )
+    record.created = created
+    return record
+
+
+def test_json_formatter_adds_bound_context() -> None:
+    formatter = JsonFormatter(tzinfo=UTC)
+
+    token = log_context.bind(update_id=7, chat_id=-100, user_id=None)
+    try:
+        payload = json.loads(formatter.format(_record()))
+    finally:
+        log_context.reset(token)
+
+    assert payload == {
+        "level": "INFO",
+        "name": "test",
+        "message": "hello world",
+        "time": "2023-11-14T22:13:20+0000",
+        "update_id": 7,
+        "chat_id": -100,
+    }
+    assert "update_id" not in json.loads(formatter.format(_record()))
+
+
+def test_json_formatter_caches_time_per_second() -> None:
+    formatter = JsonFormatter(tzinfo=UTC)
+
+    first = json.loads(formatter.format(_record(1_700_000_000.1)))["time"]
+    same_second = json.loads(formatter.format(_record(1_700_000_000.9)))["time"]
+    next_second = json.loads(formatter.format(_record(1_700_000_001.0)))["time"]
+
+    assert first == same_second == "2023-11-14T22:13:20+0000"
+    assert next_second == "2023-11-14T22:13:21+0000"
+
+
+def test_middleware_binds_update_and_handler_fields() -> None:
+    middleware = LogContextMiddleware()
+    bot = MagicMock()
+    bot.id = 42
+    update = Update.model_validate(
+        {
+            "update_id": 5,
+            "chat_join_request": {
+                "chat": {"id": -100, "type": "supergroup", "title": "Chat"},
+                "from": {"id": 9, "is_bot": False, "first_name": "User"},
+                "user_chat_id": 9,
+                "date": 0,
+            },
+        }
+    )
+    seen: dict[str, Any] = {}
+
+    async def handle_join_request() -> None:
+        seen.update(log_context.current())
+
+    async def inner(event: Any, data: dict[str, Any]) -> None:
+        await middleware(lambda *_: handle_join_request(), event.chat_join_request, data)
+
+    asyncio.run(
+        middleware(inner, update, {"bot": bot, "handler": MagicMock(callback=handle_join_request)})
+    )
+
+    assert seen == {
+        "update_id": 5,
+        "update_type": "chat_join_request",
+        "bot_id": 42,
+        "chat_id": -100,
+        "user_id": 9,
+        "handler": f"{__name__}.test_middleware_binds_update_and_handler_fields.<locals>.handle_join_request",
+    }
+    assert log_context.current() == {}
@@ -3,11 +3,15 @@
 
 from __future__ import annotations
 
+import gzip
 import logging
+import os
+import time
 from datetime import UTC, datetime
 from pathlib import Path
 
 from group_inviter import logging_config as logging_module
+from group_inviter.configuration import LoggingConfig
 
 
 def test_resolve_timezone_direct_utc() -> None:
@@ -30,3 +34,83 @@ def test_timestamped_log_path_preserves_nested_structure() -> None:
 
     expected = base_dir / "nested" / "info-20240102T030405+0000.log"
     assert result == expected
+
+
+def _logging_config(tmp_path: Path, **overrides: object) -> LoggingConfig:
+    return LoggingConfig.model_validate({"directory": str(tmp_path), **overrides})
+
+
+def test_rotation_compresses_in_background_and_prunes_backups(tmp_path: Path) -> None:
+    config = _logging_config(tmp_path, max_bytes=200, backup_count=2)
+    active = tmp_path / "info-20240102T030405+0000.log"
+    maintenance = logging_module.LogMaintenance(config, [active])
+    handler = logging_module.CompressingRotatingFileHandler(
+        active,
+        max_bytes=config.max_bytes,
+        backup_count=config.backup_count,
+        maintenance=maintenance,
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    maintenance.start()
+    try:
+        for index in range(40):
+            handler.emit(logging.makeLogRecord({"msg": f"line {index:03d} " + "x" * 40}))
+            time.sleep(0.002)  # distinct rotation timestamps
+        assert maintenance.wait(timeout=5)
+    finally:
+        handler.close()
+        maintenance.stop()
+
+    backups = sorted(tmp_path.glob(f"{active.name}.*"))
+    assert len(backups) == 2
+    assert all(backup.suffix == ".gz" for backup in backups)
+    with gzip.open(backups[-1], "rt", encoding="utf-8") as fh:
+        assert "line" in fh.read()
+    assert "line 039" in active.read_text(encoding="utf-8")
+
+
+def test_previous_runs_are_compressed_and_retention_applied(tmp_path: Path) -> None:
+    active = tmp_path / "info-20240301T000000+0000.log"
+    active.write_text("current\n", encoding="utf-8")
+    previous = tmp_path / "info-20240201T000000+0000.log"
+    previous.write_text("previous run\n" * 100, encoding="utf-8")
+    expired = tmp_path / "debug-20230101T000000+0000.log.gz"
+    expired.write_bytes(b"old")
+    month_ago = time.time() - 40 * 86400
+    os.utime(expired, (month_ago, month_ago))
+    unrelated = tmp_path / "other.log"
+    unrelated.write_text("keep", encoding="utf-8")
+
+    config = _logging_config(tmp_path, retention_days=30)
+    maintenance = logging_module.LogMaintenance(config, [active])
+    maintenance.start()
+    assert maintenance.wait(timeout=5)
+    maintenance.stop()
+
+    assert active.exists()
+    assert not previous.exists()
+    with gzip.open(previous.with_name(previous.name + ".gz"), "rt", encoding="utf-8") as fh:
+        assert fh.read().startswith("previous run")
+    assert not expired.exists()
+    assert unrelated.exists()
+
+
+def test_size_budget_removes_oldest_inactive_files(tmp_path: Path) -> None:
+    active = tmp_path / "info-20240301T000000+0000.log"
+    active.write_bytes(b"a" * 100)
+    files = []
+    for day in range(1, 4):
+        path = tmp_path / f"info-202402{day:02d}T000000+0000.log.gz"
+        path.write_bytes(b"b" * 100)
+        stamp = time.time() - (10 - day) * 3600
+        os.utime(path, (stamp, stamp))
+        files.append(path)
+
+    config = _logging_config(tmp_path, retention_days=0, retention_max_bytes=250)
+    maintenance = logging_module.LogMaintenance(config, [active])
+    maintenance.start()
+    assert maintenance.wait(timeout=5)
+    maintenance.stop()
+
+    assert [path.exists() for path in files] == [False, False, True]
+    assert active.exists()
@@ -0,0 +1,74 @@
+# ruff: noqa: S101
+"""Tests for the event loop monitor."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from unittest.mock import MagicMock
+
+from aiogram.types import Update
+
+from group_inviter.configuration import LoopMonitorConfig
+from group_inviter.loop_monitor import LoopMonitor, describe_task, track_update
+from group_inviter.middlewares.handler_tracking import HandlerTrackingMiddleware
+
+
+def test_monitor_reports_blocking_step_with_context(caplog) -> None:
+    config = LoopMonitorConfig(interval=0.01, slow_callback_threshold=0.05)
+
+    async def blocking_step() -> None:
+        track_update("chat_join_request")
+        time.sleep(0.3)  # noqa: ASYNC251 - simulates a blocking call
+
+    async def scenario() -> None:
+        monitor = LoopMonitor(config)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        await asyncio.create_task(blocking_step(), name="blocker")
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    with caplog.at_level(logging.WARNING, logger="group_inviter.loop_monitor"):
+        asyncio.run(scenario())
+
+    blocked = [record for record in caplog.records if "Event loop blocked" in record.message]
+    assert len(blocked) == 1
+    assert "task blocker update=chat_join_request" in blocked[0].message
+    assert "blocking_step" in blocked[0].message
+
+
+def test_tracking_middleware_records_update_and_handler() -> None:
+    middleware = HandlerTrackingMiddleware()
+    seen: list[str] = []
+
+    async def inner(event: object, data: dict[str, object]) -> None:
+        seen.append(describe_task(asyncio.current_task()))
+
+    async def outer(event: object, data: dict[str, object]) -> None:
+        handler = MagicMock()
+        handler.callback = handle_join_request
+        await middleware(inner, object(), {"handler": handler})
+
+    async def handle_join_request() -> None:  # pragma: no cover - referenced only
+        return None
+
+    update = Update.model_validate(
+        {
+            "update_id": 1,
+            "message": {
+                "message_id": 1,
+                "date": 0,
+                "chat": {"id": 1, "type": "private"},
+            },
+        }
+    )
+
+    async def scenario() -> None:
+        await asyncio.create_task(middleware(outer, update, {}), name="worker")
+
+    asyncio.run(scenario())
+
+    assert seen[0].startswith("task worker update=message handler=")
+    assert seen[0].endswith("handle_join_request")
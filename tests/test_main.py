@@ -5,8 +5,11 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
+import pytest
+
+from group_inviter import database
 from group_inviter import main as main_module
 
 
@@ -26,3 +29,23 @@ def test_notify_admin_logs_warning_on_failure(caplog) -> None:
         asyncio.run(main_module._notify_admin(bot, 123, "hello"))
 
     assert "Failed to notify admin" in caplog.text
+
+
+def test_deferred_schema_starts_the_search_index_build(monkeypatch: pytest.MonkeyPatch) -> None:
+    ensure_schema = AsyncMock(side_effect=[OSError("down"), None])
+    ensure_search_indexes = AsyncMock()
+    monkeypatch.setattr(database, "ensure_schema", ensure_schema)
+    monkeypatch.setattr(database, "ensure_search_indexes", ensure_search_indexes)
+    runtime = main_module._Runtime(config=MagicMock())
+    pool = MagicMock()
+
+    async def scenario() -> None:
+        with pytest.raises(OSError, match="down"):
+            await main_module._prepare_deferred_schema(runtime, pool, build_indexes=True)
+        assert runtime.tasks == []
+        await main_module._prepare_deferred_schema(runtime, pool, build_indexes=True)
+        await asyncio.gather(*runtime.tasks)
+
+    asyncio.run(scenario())
+
+    ensure_search_indexes.assert_awaited_once_with(pool.pool)
@@ -0,0 +1,133 @@
+# ruff: noqa: S101
+"""Tests for the media file_id registry."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import SendPhoto
+from aiogram.types import FSInputFile
+
+from group_inviter.configuration import MediaConfig
+from group_inviter.database import MediaFileRecord
+from group_inviter.media import MediaRegistry, _hash_file
+
+
+class _Repository:
+    def __init__(self, *records: MediaFileRecord) -> None:
+        self.records = {(record.bot_id, record.name): record for record in records}
+
+    async def load(self) -> list[MediaFileRecord]:
+        return list(self.records.values())
+
+    async def save(self, record: MediaFileRecord) -> None:
+        self.records[(record.bot_id, record.name)] = record
+
+    async def forget(self, bot_id: int, name: str) -> None:
+        self.records.pop((bot_id, name), None)
+
+
+def _wrong_file_id() -> TelegramBadRequest:
+    return TelegramBadRequest(
+        method=SendPhoto(chat_id=1, photo="x"),
+        message="Bad Request: wrong file identifier/HTTP URL specified",
+    )
+
+
+def _bot(bot_id: int = 42) -> MagicMock:
+    bot = MagicMock()
+    bot.id = bot_id
+    uploads = iter(range(1, 100))
+
+    async def send_photo(chat_id: int, *, photo: object, **kwargs: object) -> MagicMock:
+        file_id = f"uploaded-{next(uploads)}" if isinstance(photo, FSInputFile) else photo
+        return MagicMock(photo=[MagicMock(file_id="thumb"), MagicMock(file_id=file_id)])
+
+    bot.send_photo = AsyncMock(side_effect=send_photo)
+    bot.get_file = AsyncMock()
+    return bot
+
+
+def _asset(tmp_path: Path, content: bytes = b"jpeg") -> MediaConfig:
+    path = tmp_path / "welcome.jpg"
+    path.write_bytes(content)
+    return MediaConfig(assets={"welcome": path})
+
+
+def test_registry_uploads_once_per_bot_and_reuses_file_id(tmp_path: Path) -> None:
+    repository = _Repository()
+    registry = MediaRegistry(_asset(tmp_path), repository)  # type: ignore[arg-type]
+    first, second = _bot(1), _bot(2)
+
+    async def scenario() -> None:
+        await asyncio.gather(*(registry.send_photo(first, 10, "welcome") for _ in range(3)))
+        await registry.send_photo(second, 10, "welcome", caption="hi")
+
+    asyncio.run(scenario())
+
+    uploads = [
+        call
+        for bot in (first, second)
+        for call in bot.send_photo.await_args_list
+        if isinstance(call.kwargs["photo"], FSInputFile)
+    ]
+    assert len(uploads) == 2
+    assert [call.kwargs["photo"] for call in first.send_photo.await_args_list[1:]] == [
+        "uploaded-1",
+        "uploaded-1",
+    ]
+    assert second.send_photo.await_args.kwargs["caption"] == "hi"
+    assert repository.records[(1, "welcome")].file_id == "uploaded-1"
+    assert repository.records[(1, "welcome")].content_hash == _hash_file(tmp_path / "welcome.jpg")
+    assert "welcome" in registry
+    assert "AgAC-file-id" not in registry
+
+
+def test_prepare_keeps_matching_ids_and_drops_changed_or_invalid_ones(tmp_path: Path) -> None:
+    config = _asset(tmp_path)
+    content_hash = _hash_file(tmp_path / "welcome.jpg")
+    repository = _Repository(
+        MediaFileRecord(1, "welcome", content_hash, "good"),
+        MediaFileRecord(2, "welcome", content_hash, "expired"),
+        MediaFileRecord(3, "welcome", "old-hash", "outdated"),
+    )
+    bots = [_bot(1), _bot(2), _bot(3)]
+    bots[1].get_file.side_effect = _wrong_file_id()
+    registry = MediaRegistry(config, repository)  # type: ignore[arg-type]
+
+    asyncio.run(registry.prepare(bots))
+
+    assert registry.file_id(1, "welcome") == "good"
+    assert registry.file_id(2, "welcome") is None
+    assert registry.file_id(3, "welcome") is None
+    assert (2, "welcome") not in repository.records
+
+
+def test_rejected_file_id_is_uploaded_again(tmp_path: Path) -> None:
+    config = _asset(tmp_path)
+    repository = _Repository(
+        MediaFileRecord(42, "welcome", _hash_file(tmp_path / "welcome.jpg"), "stale")
+    )
+    bot = _bot()
+    send_photo = bot.send_photo.side_effect
+
+    async def reject_stale(chat_id: int, *, photo: object, **kwargs: object) -> MagicMock:
+        if photo == "stale":
+            raise _wrong_file_id()
+        return await send_photo(chat_id, photo=photo, **kwargs)
+
+    bot.send_photo.side_effect = reject_stale
+    registry = MediaRegistry(config, repository)  # type: ignore[arg-type]
+
+    async def scenario() -> None:
+        registry.start([])
+        await registry.send_photo(bot, 10, "welcome")
+
+    asyncio.run(scenario())
+
+    assert bot.send_photo.await_args_list[0].kwargs["photo"] == "stale"
+    assert isinstance(bot.send_photo.await_args_list[1].kwargs["photo"], FSInputFile)
+    assert repository.records[(42, "welcome")].file_id == "uploaded-1"
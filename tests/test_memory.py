@@ -0,0 +1,47 @@
+# ruff: noqa: S101
+"""Tests for memory diagnostics."""
+
+from __future__ import annotations
+
+import pytest
+
+from group_inviter.memory import SnapshotNotFoundError, TracemallocController, count_live_objects
+
+
+class _Leaky:
+    """Object type counted by the census test."""
+
+
+def test_tracemalloc_controller_reports_top_and_diff() -> None:
+    controller = TracemallocController(max_snapshots=2, frames=1)
+    controller.start()
+    try:
+        controller.snapshot("before")
+        retained = [bytearray(4096) for _ in range(64)]
+        controller.snapshot("after")
+        controller.snapshot("latest")
+    finally:
+        controller.stop()
+
+    assert controller.names() == ["after", "latest"]
+    assert "test_memory.py" in controller.top("after", limit=5)
+    assert controller.diff("after", "latest", limit=5).startswith("top 5 changes")
+    with pytest.raises(SnapshotNotFoundError):
+        controller.top("before", limit=5)
+    assert len(retained) == 64
+
+
+def test_snapshot_requires_tracing() -> None:
+    with pytest.raises(RuntimeError):
+        TracemallocController(max_snapshots=2, frames=1).snapshot("x")
+
+
+def test_count_live_objects_matches_qualified_type_names() -> None:
+    keep = [_Leaky() for _ in range(3)]
+    name = f"{__name__}._Leaky"
+
+    counts = count_live_objects([name, "logging.NotARealType"])
+
+    assert counts[name] == 3
+    assert counts["logging.NotARealType"] == 0
+    assert len(keep) == 3
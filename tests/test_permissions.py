@@ -0,0 +1,192 @@
+# ruff: noqa: S101, S105, S106
+"""Tests for the cached chat administrator lookups."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+from aiogram.exceptions import TelegramForbiddenError
+from aiogram.filters.command import CommandObject
+from aiogram.types import ChatMemberAdministrator, ChatMemberOwner, User
+
+from group_inviter.configuration import AppConfig, PermissionsConfig
+from group_inviter.handlers.invite import handle_generate_invite
+from group_inviter.permissions import NO_RIGHTS, ChatAdminCache
+
+BOT_ID = 42
+
+
+def _administrator(user_id: int, *, can_invite_users: bool, is_bot: bool = False) -> Any:
+    # The set of required rights grows with Bot API versions; only these matter here.
+    return ChatMemberAdministrator.model_construct(
+        user=User(id=user_id, is_bot=is_bot, first_name="Admin"),
+        can_invite_users=can_invite_users,
+    )
+
+
+def _bot(*, bot_can_invite: bool = True) -> MagicMock:
+    bot = MagicMock()
+    bot.id = BOT_ID
+    bot.token = "42:abcdefghij"
+    bot.get_chat_administrators = AsyncMock(
+        return_value=[
+            ChatMemberOwner(user=User(id=1, is_bot=False, first_name="Owner"), is_anonymous=False),
+            _administrator(2, can_invite_users=True),
+            _administrator(3, can_invite_users=False),
+            _administrator(BOT_ID, can_invite_users=bot_can_invite, is_bot=True),
+        ]
+    )
+    bot.create_chat_invite_link = AsyncMock(
+        return_value=MagicMock(invite_link="https://t.me/+abc", name="n", expire_date=None)
+    )
+    return bot
+
+
+def _config() -> AppConfig:
+    return AppConfig.model_validate(
+        {
+            "telegram": {"bot_token": "42:abcdefghij", "admin_chat_id": 5},
+            "database": {"database": "db", "user": "user", "password": "secret"},
+        }
+    )
+
+
+def _managed_cache() -> ChatAdminCache:
+    cache = ChatAdminCache(PermissionsConfig())
+    cache.mark_managed(BOT_ID, -100)
+    return cache
+
+
+def _message(user_id: int) -> MagicMock:
+    message = MagicMock()
+    message.from_user = User(id=user_id, is_bot=False, first_name="User")
+    message.chat.type = "private"
+    message.answer = AsyncMock()
+    return message
+
+
+def test_rights_are_fetched_once_and_shared_by_concurrent_callers() -> None:
+    cache = ChatAdminCache(PermissionsConfig())
+    bot = _bot()
+
+    async def scenario() -> list[Any]:
+        return list(await asyncio.gather(*(cache.rights(bot, -100) for _ in range(5))))
+
+    results = asyncio.run(scenario())
+
+    bot.get_chat_administrators.assert_awaited_once_with(-100)
+    rights = results[0]
+    assert all(result is rights for result in results)
+    assert rights.admin_ids == {1, 2, 3}
+    assert rights.inviter_ids == {1, 2}
+    assert (rights.bot_is_admin, rights.bot_can_invite) == (True, True)
+    assert asyncio.run(cache.is_chat_admin(bot, -100, 3)) is True
+    bot.get_chat_administrators.assert_awaited_once()
+
+
+def test_invalidate_forces_a_fresh_lookup() -> None:
+    cache = ChatAdminCache(PermissionsConfig())
+    bot = _bot()
+
+    asyncio.run(cache.rights(bot, -100))
+    cache.invalidate(BOT_ID, -100)
+    asyncio.run(cache.rights(bot, -100))
+
+    assert bot.get_chat_administrators.await_count == 2
+
+
+def test_inaccessible_chat_has_no_rights() -> None:
+    cache = ChatAdminCache(PermissionsConfig())
+    bot = _bot()
+    bot.get_chat_administrators.side_effect = TelegramForbiddenError(
+        MagicMock(), "bot was kicked from the supergroup chat"
+    )
+
+    assert asyncio.run(cache.rights(bot, -100)) is NO_RIGHTS
+
+
+def test_co_admin_with_invite_right_can_generate_links() -> None:
+    bot = _bot()
+    message = _message(2)
+
+    asyncio.run(
+        handle_generate_invite(
+            message,
+            bot,
+            _config(),
+            CommandObject(command="generate_invite", args="-100"),
+            chat_admins=_managed_cache(),
+        )
+    )
+
+    bot.create_chat_invite_link.assert_awaited_once()
+    assert "https://t.me/+abc" in message.answer.await_args.args[0]
+
+
+def test_admin_without_invite_right_is_refused() -> None:
+    bot = _bot()
+    message = _message(3)
+
+    asyncio.run(
+        handle_generate_invite(
+            message,
+            bot,
+            _config(),
+            CommandObject(command="generate_invite", args="-100"),
+            chat_admins=_managed_cache(),
+        )
+    )
+
+    bot.create_chat_invite_link.assert_not_awaited()
+    assert "только администраторам" in message.answer.await_args.args[0]
+
+
+def test_missing_bot_rights_are_reported_before_calling_telegram() -> None:
+    bot = _bot(bot_can_invite=False)
+    message = _message(5)
+
+    asyncio.run(
+        handle_generate_invite(
+            message,
+            bot,
+            _config(),
+            CommandObject(command="generate_invite", args="-100"),
+            chat_admins=ChatAdminCache(PermissionsConfig()),
+        )
+    )
+
+    bot.create_chat_invite_link.assert_not_awaited()
+    assert "Бот не может создавать ссылки" in message.answer.await_args.args[0]
+
+
+def test_strangers_cannot_make_the_bot_look_up_unknown_chats() -> None:
+    bot = _bot()
+    message = _message(2)
+    cache = ChatAdminCache(PermissionsConfig())
+
+    asyncio.run(
+        handle_generate_invite(
+            message,
+            bot,
+            _config(),
+            CommandObject(command="generate_invite", args="-100"),
+            chat_admins=cache,
+        )
+    )
+
+    bot.get_chat_administrators.assert_not_awaited()
+    assert "только администраторам" in message.answer.await_args.args[0]
+    assert cache.is_managed(BOT_ID, -100) is False
+
+
+def test_lookups_by_the_configured_admin_mark_the_chat_as_managed() -> None:
+    cache = ChatAdminCache(PermissionsConfig())
+
+    asyncio.run(cache.rights(_bot(), -100))
+    cache.mark_managed(BOT_ID, -200)
+    cache.mark_managed(BOT_ID, -200, managed=False)
+
+    assert cache.is_managed(BOT_ID, -100) is True
+    assert cache.is_managed(BOT_ID, -200) is False
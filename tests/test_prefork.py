@@ -0,0 +1,44 @@
+# ruff: noqa: S101, S106
+"""Tests for the prefork supervisor helpers."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+from group_inviter.configuration import AppConfig, WebhookConfig
+from group_inviter.prefork import process_config, run_prefork
+
+
+def _config(**webhook: object) -> AppConfig:
+    return AppConfig.model_validate(
+        {
+            "telegram": {"bot_token": "123:abcdefghij", "webhook": webhook},
+            "database": {"database": "db", "user": "user", "password": "secret"},
+            "logging": {"info_filename": "info.log", "debug_filename": "nested/debug.log"},
+            "spool": {"path": "spool/join_requests.jsonl"},
+        }
+    )
+
+
+def test_process_config_gives_each_process_its_own_files() -> None:
+    config = _config()
+
+    worker = process_config(config, "worker-1")
+
+    assert worker.logging.info_filename == "info.worker-1.log"
+    assert worker.logging.debug_filename == str(Path("nested/debug.worker-1.log"))
+    assert worker.spool.path == Path("spool/join_requests.worker-1.jsonl")
+    assert worker.shutdown.abandoned_path == Path("spool/abandoned_updates.worker-1.jsonl")
+    assert config.spool.path == Path("spool/join_requests.jsonl")
+    assert worker.telegram is config.telegram
+
+
+def test_several_workers_require_webhooks() -> None:
+    with pytest.raises(ValidationError, match="requires webhooks"):
+        WebhookConfig(workers=2)
+
+    with pytest.raises(ValueError, match="webhook.enabled"):
+        run_prefork(None, _config(), 2)
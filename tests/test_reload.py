@@ -0,0 +1,141 @@
+# ruff: noqa: S101, S106
+"""Tests for configuration hot reload."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import yaml
+
+from group_inviter import database
+from group_inviter.configuration import AppConfig, load_config
+from group_inviter.database import SwappablePool
+from group_inviter.middlewares import ConfigMiddleware
+from group_inviter.reload import ConfigReloader, restart_required
+
+
+def _raw(**overrides: Any) -> dict[str, Any]:
+    raw: dict[str, Any] = {
+        "telegram": {"bot_token": "123:abcdefghij", "admin_chat_id": 5},
+        "database": {"database": "db", "user": "user", "password": "secret"},
+        "logging": {"level": "INFO"},
+    }
+    for section, values in overrides.items():
+        raw[section] = {**raw.get(section, {}), **values}
+    return raw
+
+
+def _write(path: Path, raw: dict[str, Any]) -> None:
+    path.write_text(yaml.safe_dump(raw), encoding="utf-8")
+
+
+@pytest.fixture
+def root_level() -> Any:
+    root = logging.getLogger()
+    level = root.level
+    yield root
+    root.setLevel(level)
+
+
+def test_reload_swaps_config_and_changes_log_level_in_place(
+    tmp_path: Path, root_level: logging.Logger
+) -> None:
+    path = tmp_path / "config.yaml"
+    _write(path, _raw())
+    reloader = ConfigReloader(path, load_config(path))
+    published: list[AppConfig] = []
+    reloader.subscribe(published.append)
+    handlers = list(root_level.handlers)
+    _write(path, _raw(telegram={"admin_chat_id": 7}, logging={"level": "DEBUG"}))
+
+    assert asyncio.run(reloader.reload()) is True
+
+    assert reloader.config.telegram.admin_chat_id == 7
+    assert published == [reloader.config]
+    assert root_level.level == logging.DEBUG
+    assert root_level.handlers == handlers
+
+
+def test_invalid_file_keeps_running_config(tmp_path: Path) -> None:
+    path = tmp_path / "config.yaml"
+    _write(path, _raw())
+    config = load_config(path)
+    reloader = ConfigReloader(path, config)
+    _write(path, _raw(telegram={"admin_chat_id": -1}))
+
+    assert asyncio.run(reloader.reload()) is False
+    assert reloader.config is config
+
+
+def test_pool_is_replaced_only_when_connection_settings_change(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / "config.yaml"
+    _write(path, _raw())
+    old_pool = MagicMock(close=AsyncMock())
+    new_pool = MagicMock(close=AsyncMock())
+    create_pool = AsyncMock(return_value=new_pool)
+    monkeypatch.setattr(database, "create_pool", create_pool)
+    pool = SwappablePool(old_pool)
+    reloader = ConfigReloader(path, load_config(path), pool=pool)
+
+    _write(path, _raw(database={"call_timeout": 3.0}))
+    asyncio.run(reloader.reload())
+    assert pool.pool is old_pool
+    create_pool.assert_not_awaited()
+
+    _write(path, _raw(database={"call_timeout": 3.0, "max_pool_size": 20}))
+    asyncio.run(reloader.reload())
+    assert pool.pool is new_pool
+    assert create_pool.await_args.args[0].max_pool_size == 20
+    old_pool.close.assert_awaited_once()
+
+
+def test_restart_required_lists_settings_read_at_startup() -> None:
+    old = AppConfig.model_validate(_raw())
+    new = AppConfig.model_validate(
+        _raw(
+            telegram={"bot_token": "456:abcdefghij", "admin_chat_id": 9},
+            logging={"level": "DEBUG", "json": True},
+        )
+    )
+
+    assert restart_required(old, new) == ["telegram bot tokens", "logging.structured"]
+    assert restart_required(old, old) == []
+
+
+def test_watch_reloads_when_the_file_changes(tmp_path: Path) -> None:
+    path = tmp_path / "config.yaml"
+    _write(path, _raw())
+    reloader = ConfigReloader(path, load_config(path))
+
+    async def scenario() -> None:
+        task = asyncio.create_task(reloader.watch(0.01))
+        _write(path, _raw(telegram={"admin_chat_id": 8}))
+        stat = path.stat()
+        os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+    assert reloader.config.telegram.admin_chat_id == 8
+
+
+def test_config_middleware_injects_the_current_config() -> None:
+    configs = [AppConfig.model_validate(_raw())]
+    middleware = ConfigMiddleware(lambda: configs[-1])
+    handler = AsyncMock(return_value="ok")
+
+    configs.append(AppConfig.model_validate(_raw(telegram={"admin_chat_id": 6})))
+    data: dict[str, Any] = {"config": configs[0]}
+    asyncio.run(middleware(handler, MagicMock(), data))
+
+    assert handler.await_args.args[1]["config"] is configs[-1]
@@ -0,0 +1,67 @@
+# ruff: noqa: S101
+"""Tests for the circuit breaker."""
+
+from __future__ import annotations
+
+from group_inviter.configuration import CircuitBreakerConfig
+from group_inviter.resilience import CircuitBreaker, CircuitState
+
+
+class _Clock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _breaker(clock: _Clock) -> CircuitBreaker:
+    config = CircuitBreakerConfig(window_size=4, min_calls=4, failure_ratio=0.5, reset_timeout=10)
+    return CircuitBreaker("test", config, clock=clock)
+
+
+def test_breaker_trips_once_failure_ratio_is_reached() -> None:
+    breaker = _breaker(_Clock())
+    breaker.record_success()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state is CircuitState.CLOSED
+
+    breaker.record_failure()
+
+    assert breaker.state is CircuitState.OPEN
+    assert breaker.allow_request() is False
+
+
+def test_breaker_allows_single_probe_after_reset_timeout() -> None:
+    clock = _Clock()
+    breaker = _breaker(clock)
+    for _ in range(4):
+        breaker.record_failure()
+
+    clock.now = 10
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False
+
+    breaker.record_success()
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_breaker_reopens_when_probe_fails() -> None:
+    clock = _Clock()
+    changes: list[CircuitState] = []
+    config = CircuitBreakerConfig(window_size=2, min_calls=2, failure_ratio=1, reset_timeout=5)
+    breaker = CircuitBreaker(
+        "db", config, clock=clock, on_state_change=lambda _, s: changes.append(s)
+    )
+    breaker.record_failure()
+    breaker.record_failure()
+
+    clock.now = 5
+    assert breaker.allow_request() is True
+    breaker.record_failure()
+
+    assert breaker.state is CircuitState.OPEN
+    assert changes == [CircuitState.OPEN, CircuitState.HALF_OPEN, CircuitState.OPEN]
@@ -0,0 +1,208 @@
+# ruff: noqa: S101, S105, S106
+"""Tests for the review queue of held join requests."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from typing import Any, Sequence
+from unittest.mock import AsyncMock, MagicMock
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import Chat, ChatInviteLink, ChatJoinRequest, User
+
+from group_inviter.configuration import AppConfig, ReviewConfig
+from group_inviter.database import PendingRequest, UserRecord
+from group_inviter.handlers.invite import handle_join_request
+from group_inviter.handlers.review import PendingCallback, _format_progress
+from group_inviter.review import BulkProgress, ReviewQueue
+
+_NOW = datetime(2026, 3, 1, tzinfo=UTC)
+
+
+def _request(user_id: int, chat_id: int = -100) -> PendingRequest:
+    return PendingRequest(
+        bot_id=42,
+        chat_id=chat_id,
+        user_id=user_id,
+        first_name="Ann",
+        last_name=None,
+        username=None,
+        language_code="en",
+        is_premium=False,
+        user_chat_id=user_id,
+        invite_link=None,
+        requested_at=_NOW + timedelta(seconds=user_id),
+    )
+
+
+class _Repository:
+    """In-memory stand-in for :class:`PendingRequestsRepository`."""
+
+    def __init__(self, *requests: PendingRequest) -> None:
+        self.rows = {(r.bot_id, r.chat_id, r.user_id): r for r in requests}
+        self.takes: list[int] = []
+
+    async def add_many(self, requests: Sequence[PendingRequest]) -> None:
+        for request in requests:
+            self.rows[(request.bot_id, request.chat_id, request.user_id)] = request
+
+    async def summary(self, bot_id: int) -> list[tuple[int, int]]:
+        chats = sorted({chat_id for (bot, chat_id, _) in self.rows if bot == bot_id})
+        return [(chat, sum(1 for key in self.rows if key[1] == chat)) for chat in chats]
+
+    async def page(self, bot_id: int, chat_id: int, offset: int, limit: int) -> list[Any]:
+        return self._queued(bot_id, chat_id, None)[offset : offset + limit]
+
+    async def take(
+        self, bot_id: int, chat_id: int, *, user_id: int | None = None, limit: int = 1
+    ) -> list[PendingRequest]:
+        taken = self._queued(bot_id, chat_id, user_id)[:limit]
+        for request in taken:
+            del self.rows[(bot_id, chat_id, request.user_id)]
+        self.takes.append(len(taken))
+        return taken
+
+    def _queued(self, bot_id: int, chat_id: int, user_id: int | None) -> list[PendingRequest]:
+        return sorted(
+            (
+                r
+                for r in self.rows.values()
+                if (r.bot_id, r.chat_id) == (bot_id, chat_id) and user_id in (None, r.user_id)
+            ),
+            key=lambda r: r.requested_at,
+        )
+
+
+def _bot() -> MagicMock:
+    bot = MagicMock()
+    bot.id = 42
+    bot.token = "42:abcdefghij"
+    bot.approve_chat_join_request = AsyncMock()
+    bot.decline_chat_join_request = AsyncMock()
+    return bot
+
+
+def _queue(repository: _Repository, **config: Any) -> tuple[ReviewQueue, MagicMock]:
+    users = MagicMock(record_many=AsyncMock())
+    limiter = MagicMock(acquire=AsyncMock())
+    queue = ReviewQueue(
+        repository,  # type: ignore[arg-type]
+        ReviewConfig(**({"batch_size": 3} | config)),
+        users=users,
+        limiters={42: limiter},
+    )
+    return queue, users
+
+
+def test_bulk_approval_runs_in_batches_and_requeues_failures() -> None:
+    repository = _Repository(*(_request(user_id) for user_id in range(1, 8)), _request(9, -200))
+    bot = _bot()
+
+    async def approve(chat_id: int, user_id: int) -> None:
+        if user_id == 2:
+            raise TelegramBadRequest(MagicMock(), "Bad Request: HIDE_REQUESTER_MISSING")
+        if user_id == 5:
+            raise TelegramBadRequest(MagicMock(), "Bad Request: CHAT_ADMIN_REQUIRED")
+
+    bot.approve_chat_join_request.side_effect = approve
+    queue, users = _queue(repository, progress_interval=1e-9)
+    reports: list[tuple[int, bool]] = []
+
+    async def progress(state: BulkProgress) -> None:
+        reports.append((state.processed, state.finished))
+
+    async def scenario() -> BulkProgress:
+        assert queue.start_bulk(bot, -100, 7, approve=True, progress=progress)
+        assert not queue.start_bulk(bot, -100, 7, approve=True, progress=progress)
+        return await queue._jobs[(42, -100)]
+
+    state = asyncio.run(scenario())
+
+    assert (state.resolved, state.gone, state.failed, state.finished) == (5, 1, 1, True)
+    assert repository.takes == [3, 3, 1, 0]
+    assert reports == [(3, False), (6, False), (7, False), (7, True)]
+    assert set(repository.rows) == {(42, -100, 5), (42, -200, 9)}
+    recorded: list[UserRecord] = [
+        record for call in users.record_many.await_args_list for record in call.args[0]
+    ]
+    assert sorted(record.telegram_id for record in recorded) == [1, 3, 4, 6, 7]
+    assert "ошибок: 1" in _format_progress(state)
+
+
+def test_single_decision_reports_missing_requests() -> None:
+    repository = _Repository(_request(1))
+    bot = _bot()
+    queue, users = _queue(repository)
+
+    assert asyncio.run(queue.resolve(bot, -100, 1, approve=False)) == "declined"
+    assert asyncio.run(queue.resolve(bot, -100, 1, approve=False)) is None
+    bot.decline_chat_join_request.assert_awaited_once_with(-100, 1)
+    users.record_many.assert_not_awaited()
+
+
+def test_stop_requeues_the_interrupted_batch() -> None:
+    repository = _Repository(*(_request(user_id) for user_id in range(1, 5)))
+    bot = _bot()
+    started = asyncio.Event()
+
+    async def approve(chat_id: int, user_id: int) -> None:
+        started.set()
+        await asyncio.sleep(10)
+
+    bot.approve_chat_join_request.side_effect = approve
+    queue, _ = _queue(repository)
+
+    async def scenario() -> None:
+        queue.start_bulk(bot, -100, 4, approve=True, progress=AsyncMock())
+        await started.wait()
+        await queue.stop()
+
+    asyncio.run(scenario())
+
+    assert len(repository.rows) == 4
+
+
+def test_external_link_requests_are_held_for_review() -> None:
+    config = AppConfig.model_validate(
+        {
+            "telegram": {"bot_token": "42:abcdefghij", "admin_chat_id": 5},
+            "database": {"database": "db", "user": "user", "password": "secret"},
+        }
+    )
+    creator = User(id=1, is_bot=False, first_name="Owner")
+    join_request = ChatJoinRequest(
+        chat=Chat(id=-100, type="supergroup"),
+        from_user=User(id=7, is_bot=False, first_name="Ann"),
+        user_chat_id=7,
+        date=_NOW,
+        invite_link=ChatInviteLink(
+            invite_link="https://t.me/+x",
+            creator=creator,
+            creates_join_request=True,
+            is_primary=False,
+            is_revoked=False,
+        ),
+    )
+    repository = _Repository()
+    queue, _ = _queue(repository)
+    bot = _bot()
+    user_repository = MagicMock(record_join_request=AsyncMock())
+
+    asyncio.run(handle_join_request(join_request, bot, config, user_repository, review_queue=queue))
+
+    bot.approve_chat_join_request.assert_not_awaited()
+    held = repository.rows[(42, -100, 7)]
+    assert (held.first_name, held.invite_link, held.requested_at) == (
+        "Ann",
+        "https://t.me/+x",
+        _NOW,
+    )
+
+
+def test_callback_data_fits_telegram_limit() -> None:
+    packed = PendingCallback(
+        action="ask_all", chat_id=-1001234567890, user_id=9_999_999_999, page=999, approve=False
+    ).pack()
+
+    assert len(packed.encode()) <= 64
@@ -0,0 +1,57 @@
+# ruff: noqa: S101
+"""Tests for the tunable aiohttp session."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Callable
+
+from prometheus_client import CollectorRegistry
+
+from group_inviter import metrics
+from group_inviter.configuration import SessionConfig
+from group_inviter.session import TunedAiohttpSession
+
+
+def test_session_applies_connector_settings() -> None:
+    config = SessionConfig(connection_limit=7, limit_per_host=3, keepalive_timeout=12)
+
+    async def scenario() -> tuple[int, int, tuple[int, int]]:
+        session = TunedAiohttpSession(config)
+        client = await session.create_session()
+        connector = client.connector
+        assert connector is not None
+        try:
+            return connector.limit, connector.limit_per_host, session.connection_counts()
+        finally:
+            await session.close()
+
+    assert asyncio.run(scenario()) == (7, 3, (0, 0))
+
+
+def test_connection_counts_are_zero_before_first_request() -> None:
+    session = TunedAiohttpSession(SessionConfig())
+
+    assert session.connection_counts() == (0, 0)
+    assert session.timeout == 60.0
+
+
+def test_connection_counts_are_published_for_the_prefork_supervisor() -> None:
+    registry = CollectorRegistry()
+    registry.register(metrics._SHARED_HTTP_CONNECTIONS)
+    alive = True
+
+    def source() -> Callable[[], tuple[int, int]] | None:
+        return (lambda: (2, 3)) if alive else None
+
+    def published() -> list[float | None]:
+        metrics.publish_connection_counts()
+        return [
+            registry.get_sample_value("group_inviter_http_connections", {"state": state})
+            for state in ("active", "idle")
+        ]
+
+    metrics.register_connection_pool(source)
+    assert published() == [2.0, 3.0]
+    alive = False
+    assert published() == [0.0, 0.0]
@@ -0,0 +1,112 @@
+# ruff: noqa: S101
+"""Tests for the graceful shutdown drain."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+from aiogram.types import Chat, Message, Update
+
+from group_inviter.configuration import ShutdownConfig
+from group_inviter.middlewares import InFlightMiddleware
+from group_inviter.shutdown import ShutdownCoordinator
+
+
+def _bot(bot_id: int = 42) -> MagicMock:
+    bot = MagicMock()
+    bot.id = bot_id
+    return bot
+
+
+def _config(tmp_path: Path, **overrides: Any) -> ShutdownConfig:
+    return ShutdownConfig(abandoned_path=tmp_path / "abandoned.jsonl", **overrides)
+
+
+def test_drain_waits_for_in_flight_updates_and_refuses_new_ones(tmp_path: Path) -> None:
+    coordinator = ShutdownCoordinator(_config(tmp_path, drain_timeout=1.0))
+    middleware = InFlightMiddleware(coordinator)
+    bot = _bot()
+    finished: list[int] = []
+
+    async def slow_handler(event: Any, data: dict[str, Any]) -> str:
+        await asyncio.sleep(0.05)
+        finished.append(event.update_id)
+        return "handled"
+
+    async def scenario() -> Any:
+        task = asyncio.create_task(middleware(slow_handler, Update(update_id=10), {"bot": bot}))
+        await asyncio.sleep(0)
+        report = await coordinator.drain()
+        refused = await middleware(slow_handler, Update(update_id=11), {"bot": bot})
+        return report, await task, refused
+
+    report, result, refused = asyncio.run(scenario())
+
+    assert (report.drained, report.abandoned) == (1, 0)
+    assert result == "handled"
+    assert refused is None
+    assert finished == [10]
+    assert [(bot_id, update.update_id) for bot_id, update in coordinator.abandoned] == [(42, 11)]
+
+
+def test_drain_abandons_updates_past_deadline_and_redelivers_them_next_start(
+    tmp_path: Path,
+) -> None:
+    coordinator = ShutdownCoordinator(_config(tmp_path, drain_timeout=0.05))
+    middleware = InFlightMiddleware(coordinator)
+    bot = _bot()
+
+    async def handler(event: Any, data: dict[str, Any]) -> None:
+        await asyncio.sleep(0.01 if event.update_id == 5 else 10)
+
+    message = Message.model_validate(
+        {"message_id": 1, "date": 1700000000, "chat": Chat(id=1, type="private"), "text": "hi"}
+    )
+
+    async def scenario() -> Any:
+        tasks = [
+            asyncio.create_task(
+                middleware(handler, Update(update_id=update_id, message=message), {"bot": bot})
+            )
+            for update_id in (5, 6, 7)
+        ]
+        await asyncio.sleep(0)
+        report = await coordinator.drain()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        saved = await coordinator.save_abandoned()
+        return report, tasks, saved
+
+    report, tasks, saved = asyncio.run(scenario())
+
+    assert (report.drained, report.abandoned, saved) == (1, 2, 2)
+    assert [task.cancelled() for task in tasks] == [False, True, True]
+    assert coordinator.in_flight == 0
+
+    dispatcher = MagicMock(feed_update=AsyncMock())
+    successor = ShutdownCoordinator(_config(tmp_path))
+    assert asyncio.run(successor.redeliver(dispatcher, [bot, _bot(7)])) == 2
+    fed = [call.args for call in dispatcher.feed_update.await_args_list]
+    assert [(fed_bot.id, update.update_id) for fed_bot, update in fed] == [(42, 6), (42, 7)]
+    assert fed[0][1].message.text == "hi"
+    assert not (tmp_path / "abandoned.jsonl").exists()
+    assert asyncio.run(successor.redeliver(dispatcher, [bot])) == 0
+
+
+def test_drain_is_idempotent_and_saves_nothing_without_abandoned_updates(
+    tmp_path: Path,
+) -> None:
+    coordinator = ShutdownCoordinator(_config(tmp_path))
+
+    async def scenario() -> Any:
+        first = await coordinator.drain()
+        second = await coordinator.drain()
+        return first, second, await coordinator.save_abandoned()
+
+    first, second, saved = asyncio.run(scenario())
+
+    assert first is second
+    assert (first.drained, first.abandoned, saved) == (0, 0, 0)
+    assert not (tmp_path / "abandoned.jsonl").exists()
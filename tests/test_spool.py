@@ -0,0 +1,177 @@
+# ruff: noqa: S101
+"""Tests for the join request disk spool."""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, AsyncIterator
+from unittest.mock import AsyncMock
+
+from aiogram.types import Chat, ChatJoinRequest, User
+
+from group_inviter.configuration import CircuitBreakerConfig, SpoolConfig
+from group_inviter.database import UserRecord, UsersRepository
+from group_inviter.resilience import CircuitBreaker
+from group_inviter.spool import JoinRequestSpool, SpoolingUsersRepository
+
+
+def _record(telegram_id: int) -> UserRecord:
+    return UserRecord(
+        telegram_id=telegram_id,
+        first_name="Tester",
+        last_name=None,
+        username=None,
+        phone_number=None,
+        language_code="en",
+        is_premium=False,
+        is_bot=False,
+        joined_chat_id=-100,
+        user_chat_id=telegram_id,
+        joined_at=datetime(2024, 1, 2, tzinfo=UTC),
+    )
+
+
+def test_spool_survives_restart_and_replays_in_batches(tmp_path: Path) -> None:
+    config = SpoolConfig(path=tmp_path / "spool.jsonl")
+    batches: list[list[int]] = []
+
+    async def apply(records: list[UserRecord]) -> None:
+        batches.append([record.telegram_id for record in records])
+
+    async def write() -> None:
+        spool = JoinRequestSpool(config)
+        await spool.open()
+        for telegram_id in range(5):
+            await spool.append(_record(telegram_id))
+        await spool.close()
+
+    async def replay() -> tuple[int, int, int]:
+        spool = JoinRequestSpool(config)
+        await spool.open()
+        pending = spool.size
+        replayed = await spool.replay(apply, batch_size=2)
+        await spool.close()
+        return pending, replayed, spool.size
+
+    asyncio.run(write())
+
+    assert asyncio.run(replay()) == (5, 5, 0)
+    assert batches == [[0, 1], [2, 3], [4]]
+    assert not list(tmp_path.iterdir())
+
+
+def test_spool_keeps_file_when_replay_fails(tmp_path: Path) -> None:
+    config = SpoolConfig(path=tmp_path / "spool.jsonl")
+
+    async def scenario() -> int:
+        spool = JoinRequestSpool(config)
+        await spool.open()
+        await spool.append(_record(1))
+        try:
+            await spool.replay(AsyncMock(side_effect=OSError("down")), batch_size=10)
+        except OSError:
+            pass
+        replayed = await spool.replay(AsyncMock(), batch_size=10)
+        await spool.close()
+        return replayed
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_spooling_repository_falls_back_to_spool_on_failure(tmp_path: Path) -> None:
+    config = SpoolConfig(path=tmp_path / "spool.jsonl")
+    repository = AsyncMock()
+    repository.record.side_effect = TimeoutError()
+    breaker = CircuitBreaker("database", CircuitBreakerConfig(min_calls=1, window_size=1))
+    join_request = ChatJoinRequest(
+        chat=Chat(id=-100, type="supergroup"),
+        from_user=User(id=7, is_bot=False, first_name="Tester"),
+        user_chat_id=7,
+        date=datetime.now(UTC),
+    )
+
+    async def scenario() -> int:
+        spool = JoinRequestSpool(config)
+        await spool.open()
+        store = SpoolingUsersRepository(repository, spool, breaker, call_timeout=0.1, config=config)
+        await store.record_join_request(join_request, bot_id=1)
+        await store.record_join_request(join_request, bot_id=1)
+        await spool.close()
+        return spool.size
+
+    assert asyncio.run(scenario()) == 2
+    assert repository.record.await_count == 1
+
+
+def test_spooling_repository_prepares_the_schema_from_replay_only(tmp_path: Path) -> None:
+    config = SpoolConfig(path=tmp_path / "spool.jsonl")
+    repository = AsyncMock()
+    prepare = AsyncMock(side_effect=[OSError("down"), None])
+    breaker = CircuitBreaker("database", CircuitBreakerConfig(min_calls=10, window_size=10))
+    join_request = ChatJoinRequest(
+        chat=Chat(id=-100, type="supergroup"),
+        from_user=User(id=7, is_bot=False, first_name="Tester"),
+        user_chat_id=7,
+        date=datetime.now(UTC),
+    )
+
+    async def scenario() -> int:
+        spool = JoinRequestSpool(config)
+        await spool.open()
+        store = SpoolingUsersRepository(
+            repository, spool, breaker, call_timeout=0.1, config=config, prepare=prepare
+        )
+        await store.record_join_request(join_request, bot_id=1)
+        await store.replay_once()
+        await store.replay_once()
+        await store.record_join_request(join_request, bot_id=1)
+        await spool.close()
+        return spool.size
+
+    assert asyncio.run(scenario()) == 0
+    assert prepare.await_count == 2
+    assert [len(call.args[0]) for call in repository.record_many.await_args_list] == [1]
+    # The approving bot survives the round trip, so only its block is cleared.
+    assert repository.record_many.await_args_list[0].args[0][0].bot_id == 1
+    repository.record.assert_awaited_once()
+
+
+class _Connection:
+    def __init__(self) -> None:
+        self.batches: list[tuple[str, list[tuple[Any, ...]]]] = []
+
+    async def executemany(self, sql: str, rows: list[tuple[Any, ...]]) -> None:
+        self.batches.append((" ".join(sql.split()), rows))
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        yield
+
+
+class _Pool:
+    def __init__(self, connection: _Connection) -> None:
+        self.connection = connection
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[_Connection]:
+        yield self.connection
+
+
+def test_replaying_an_old_record_does_not_overwrite_a_newer_row() -> None:
+    connection = _Connection()
+    old = _record(7)
+
+    asyncio.run(UsersRepository(_Pool(connection)).record_many([old]))
+
+    [(sql, rows)] = connection.batches
+    # The spooled join time is compared with the row written live since then.
+    assert rows == [old.as_row()]
+    assert rows[0][10] == old.joined_at
+    assert "WHERE users.updated_at <= EXCLUDED.updated_at" in sql
+    assert (
+        "DELETE FROM user_blocks WHERE bot_id = $12 AND telegram_id = $1 AND blocked_at <= $11"
+        " AND NOT EXISTS ( SELECT 1 FROM users WHERE telegram_id = $1 AND updated_at > $11 )"
+    ) in sql
@@ -0,0 +1,99 @@
+# ruff: noqa: S101
+"""Tests for startup phase timing and the start-bot CLI."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from group_inviter import main as main_module
+from group_inviter import metrics
+from group_inviter.configuration import AppConfig
+from group_inviter.startup import StartupTimer
+
+
+def test_timer_records_phases_and_renders_table() -> None:
+    timer = StartupTimer()
+    with timer.phase("config"):
+        pass
+    with timer.phase("database"):
+        pass
+
+    assert list(timer.phases) == ["config", "database"]
+    lines = timer.render().splitlines()
+    assert lines[0].startswith("phase")
+    assert lines[1].startswith("config")
+    assert lines[-1].startswith("total")
+    payload = json.loads(timer.to_json())
+    assert set(payload["phases"]) == {"config", "database"}
+    assert payload["total"] >= sum(payload["phases"].values())
+
+
+def test_timer_records_phase_that_raises() -> None:
+    timer = StartupTimer()
+    try:
+        with timer.phase("broken"):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+
+    assert "broken" in timer.phases
+
+
+def test_parse_args_check_startup() -> None:
+    args = main_module._parse_args(["--config", "cfg.yaml", "--check-startup", "--json"])
+
+    assert args.config == "cfg.yaml"
+    assert args.check_startup is True
+    assert args.json is True
+
+
+def test_main_module_defers_heavy_imports() -> None:
+    code = (
+        "import sys, group_inviter.main; "
+        "print(sorted(m for m in ('aiogram', 'asyncpg', 'prometheus_client') if m in sys.modules))"
+    )
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", code],
+        capture_output=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        text=True,
+    )
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_check_startup_starts_no_server_handlers_or_tasks(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    config = AppConfig.model_validate(
+        {
+            "telegram": {"bot_token": "42:abcdefghij", "admin_chat_id": 5},
+            "database": {"database": "db", "user": "user", "password": "secret"},
+            "metrics": {"enabled": True, "memory": {"census_interval": 1}},
+            "loop_monitor": {"enabled": True},
+            "reload": {"watch": True},
+            "spool": {"path": str(tmp_path / "spool.jsonl")},
+        }
+    )
+    metrics_server = MagicMock()
+    monkeypatch.setattr(metrics, "start_metrics_server", metrics_server)
+    monkeypatch.setattr(main_module, "_open_database", AsyncMock(return_value=(MagicMock(), True)))
+    monkeypatch.setattr(main_module, "_check_bots", AsyncMock())
+    runtime = main_module._Runtime(config=config)
+
+    asyncio.run(main_module._bootstrap(runtime, StartupTimer(), check_startup=True))
+
+    metrics_server.assert_not_called()
+    assert runtime.tasks == []
+    assert runtime.loop_monitor is None
+    assert runtime.reloader is None
+    assert runtime.dispatcher is not None
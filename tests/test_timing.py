@@ -0,0 +1,74 @@
+# ruff: noqa: S101, S106
+"""Tests for update delivery lag and per-stage timing."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from typing import Any
+from unittest.mock import MagicMock
+
+from aiogram.types import Chat, ChatJoinRequest, TelegramObject, Update, User
+from prometheus_client import REGISTRY
+
+from group_inviter import timeline
+from group_inviter.configuration import AppConfig
+from group_inviter.middlewares import UpdateTimingMiddleware
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_timeline_attributes_gaps_to_the_later_stage() -> None:
+    ticks = iter([10.0, 10.5, 12.0, 11.0])
+    current = timeline.UpdateTimeline("message", clock=lambda: next(ticks))
+
+    current.mark("handler")
+    current.mark("approved")
+    current.mark("done")
+
+    assert current.deltas() == [("handler", 0.5), ("approved", 1.5), ("done", 0.0)]
+    timeline.mark_stage("ignored")  # no active timeline
+
+
+def test_middleware_exports_delivery_lag_and_stages() -> None:
+    update = Update(
+        update_id=1,
+        chat_join_request=ChatJoinRequest(
+            chat=Chat(id=-100, type="supergroup"),
+            from_user=User(id=7, is_bot=False, first_name="Ann"),
+            user_chat_id=7,
+            date=datetime.now(UTC) - timedelta(seconds=4),
+        ),
+    )
+    middleware = UpdateTimingMiddleware()
+    lag = "group_inviter_update_delivery_lag_seconds"
+    stages = "group_inviter_update_stage_seconds"
+    labels = {"update_type": "chat_join_request"}
+    config = AppConfig.model_validate(
+        {
+            "telegram": {"bot_token": "42:abcdefghij", "admin_chat_id": 5},
+            "database": {"database": "db", "user": "user", "password": "secret"},
+        }
+    )
+    data = {"config": config, "bot": MagicMock(token="42:abcdefghij")}
+    lag_before = _sample(f"{lag}_sum", bot="42", **labels)
+    count_before = {
+        stage: _sample(f"{stages}_count", stage=stage, **labels)
+        for stage in ("handler", "approved", "done")
+    }
+
+    async def inner(event: TelegramObject, data: dict[str, Any]) -> str:
+        timeline.mark_stage("approved")
+        return "ok"
+
+    async def outer(event: TelegramObject, data: dict[str, Any]) -> str:
+        return await middleware(inner, update.chat_join_request, data)  # type: ignore[arg-type]
+
+    assert asyncio.run(middleware(outer, update, data)) == "ok"
+
+    assert 3.0 <= _sample(f"{lag}_sum", bot="42", **labels) - lag_before < 10.0
+    for stage, before in count_before.items():
+        assert _sample(f"{stages}_count", stage=stage, **labels) == before + 1
+    assert timeline.current() is None
@@ -55,7 +55,7 @@ def test_middleware_tracks_unhandled_results() -> None:
         asyncio.run(middleware(handler, event, {}))
 
     assert handler.await_count == 1
-    record_unhandled.assert_called_once_with()
+    record_unhandled.assert_called_once_with("unknown")
 
 
 def test_middleware_handles_objects_without_model_dump() -> None:
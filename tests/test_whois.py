@@ -0,0 +1,211 @@
+# ruff: noqa: S101, S106
+"""Tests for the /whois user lookup."""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from typing import Any, AsyncIterator, Sequence
+from unittest.mock import AsyncMock, MagicMock
+
+import asyncpg  # type: ignore[import-untyped]
+import pytest
+from aiogram.filters.command import CommandObject
+from aiogram.types import User
+
+from group_inviter.configuration import AppConfig, WhoisConfig
+from group_inviter.database import (
+    PREFIX_INDEX_STATEMENTS,
+    JoinHistoryEntry,
+    UserLookupRepository,
+    UserMatch,
+    ensure_schema,
+    ensure_search_indexes,
+)
+from group_inviter.directory import UserDirectory
+from group_inviter.handlers.whois import handle_whois
+
+_NOW = datetime(2026, 3, 1, 12, 0, tzinfo=UTC)
+
+
+def _user(telegram_id: int, username: str | None = None) -> UserMatch:
+    return UserMatch(telegram_id, "Ann", "Lee", username, -100, _NOW, _NOW, None)
+
+
+class _Repository:
+    """In-memory stand-in for :class:`UserLookupRepository`."""
+
+    def __init__(self, *, trigram: bool = True) -> None:
+        self.trigram = trigram
+        self.searches: list[tuple[str, bool]] = []
+        self.trigram_checks = 0
+
+    async def trigram_available(self) -> bool:
+        self.trigram_checks += 1
+        return self.trigram
+
+    async def by_id(self, telegram_id: int) -> list[UserMatch]:
+        return [_user(telegram_id)] if telegram_id == 7 else []
+
+    async def search(self, query: str, limit: int, *, substring: bool) -> list[UserMatch]:
+        self.searches.append((query, substring))
+        return [_user(7, "ann_lee"), _user(8)]
+
+    async def history(self, telegram_ids: Sequence[int]) -> list[JoinHistoryEntry]:
+        return [JoinHistoryEntry(7, -100, _NOW, _NOW, 2), JoinHistoryEntry(7, -200, _NOW, _NOW, 1)]
+
+
+def test_lookup_matches_names_and_caches_repeated_queries() -> None:
+    repository = _Repository()
+    directory = UserDirectory(repository, WhoisConfig())  # type: ignore[arg-type]
+
+    async def scenario() -> tuple[Any, Any]:
+        first = await directory.lookup("@Ann_Lee ")
+        second = await directory.lookup("ann_lee")
+        await directory.lookup("lee")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first is second
+    assert repository.searches == [("ann_lee", True), ("lee", True)]
+    assert repository.trigram_checks == 1
+    assert [result.user.telegram_id for result in first] == [7, 8]
+    assert [join.chat_id for join in first[0].joins] == [-100, -200]
+    assert first[1].joins == ()
+
+
+def test_numeric_query_looks_up_the_id_and_short_queries_are_rejected() -> None:
+    repository = _Repository(trigram=False)
+    directory = UserDirectory(repository, WhoisConfig())  # type: ignore[arg-type]
+
+    results = asyncio.run(directory.lookup("7"))
+
+    assert [result.user.telegram_id for result in results] == [7]
+    assert repository.searches == []
+    with pytest.raises(ValueError, match="at least 3"):
+        asyncio.run(directory.lookup("@an"))
+
+
+def test_missing_trigram_indexes_are_rechecked_after_a_while() -> None:
+    repository = _Repository(trigram=False)
+    now = [0.0]
+    directory = UserDirectory(repository, WhoisConfig(), clock=lambda: now[0])  # type: ignore[arg-type]
+
+    asyncio.run(directory.lookup("ann"))
+    asyncio.run(directory.lookup("lee"))
+    assert repository.trigram_checks == 1
+
+    now[0] = 301.0
+    repository.trigram = True
+    asyncio.run(directory.lookup("bob"))
+
+    assert repository.trigram_checks == 2
+    assert repository.searches == [("ann", False), ("lee", False), ("bob", True)]
+
+
+class _Connection:
+    def __init__(
+        self, *, fail_trigram: bool = False, locked: bool = False, invalid: Sequence[str] = ()
+    ) -> None:
+        self.fail_trigram = fail_trigram
+        self.locked = locked
+        self.invalid = invalid
+        self.statements: list[str] = []
+        self.fetched: list[tuple[str, tuple[Any, ...]]] = []
+
+    async def execute(self, sql: str, *args: Any) -> None:
+        if self.fail_trigram and "pg_trgm" in sql:
+            raise asyncpg.InsufficientPrivilegeError("permission denied to create extension")
+        self.statements.append(sql)
+
+    async def fetch(self, sql: str, *args: Any) -> list[Any]:
+        self.fetched.append((" ".join(sql.split()), args))
+        return [(name,) for name in self.invalid] if "indisvalid" in sql else []
+
+    async def fetchval(self, sql: str, *args: Any) -> Any:
+        return not self.locked
+
+
+class _Pool:
+    def __init__(self, connection: _Connection) -> None:
+        self.connection = connection
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[_Connection]:
+        yield self.connection
+
+
+def test_schema_is_one_script_without_the_search_indexes() -> None:
+    connection = _Connection()
+
+    asyncio.run(ensure_schema(_Pool(connection)))
+
+    assert len(connection.statements) == 1
+    assert "CREATE TABLE IF NOT EXISTS user_joins" in connection.statements[0]
+    assert "CREATE INDEX IF NOT EXISTS users_username" not in connection.statements[0]
+
+
+def test_search_indexes_fall_back_to_prefix_indexes_without_pg_trgm() -> None:
+    connection = _Connection(fail_trigram=True, invalid=["users_username_prefix_idx"])
+
+    asyncio.run(ensure_search_indexes(_Pool(connection)))
+
+    assert connection.statements == [
+        'DROP INDEX CONCURRENTLY IF EXISTS "users_username_prefix_idx"',
+        *PREFIX_INDEX_STATEMENTS,
+        "SELECT pg_advisory_unlock($1)",
+    ]
+    assert all("CONCURRENTLY" in statement for statement in PREFIX_INDEX_STATEMENTS)
+
+
+def test_search_indexes_are_left_to_the_process_holding_the_lock() -> None:
+    connection = _Connection(locked=True)
+
+    asyncio.run(ensure_search_indexes(_Pool(connection)))
+
+    assert connection.statements == []
+
+
+def test_search_escapes_like_wildcards() -> None:
+    connection = _Connection()
+    repository = UserLookupRepository(_Pool(connection))
+
+    asyncio.run(repository.search("50%_off", 10, substring=True))
+    asyncio.run(repository.search("ann", 10, substring=False))
+
+    (substring_sql, substring_args), (prefix_sql, prefix_args) = connection.fetched
+    assert substring_args == ("%50\\%\\_off%", "50%_off", 10)
+    assert "lower(last_name)" not in substring_sql
+    assert prefix_args == ("ann%", "ann", 10)
+    assert "lower(last_name) LIKE $1" in prefix_sql
+
+
+def test_handler_lists_users_with_their_chats() -> None:
+    config = AppConfig.model_validate(
+        {
+            "telegram": {"bot_token": "42:abcdefghij", "admin_chat_id": 5},
+            "database": {"database": "db", "user": "user", "password": "secret"},
+        }
+    )
+    message = MagicMock()
+    message.from_user = User(id=5, is_bot=False, first_name="Admin")
+    message.chat.type = "private"
+    message.answer = AsyncMock()
+    bot = MagicMock(token="42:abcdefghij")
+    directory = UserDirectory(_Repository(), WhoisConfig())  # type: ignore[arg-type]
+
+    asyncio.run(
+        handle_whois(
+            message,
+            bot,
+            config,
+            CommandObject(command="whois", args="ann"),
+            user_directory=directory,
+        )
+    )
+
+    text = message.answer.await_args.args[0]
+    assert "<b>Ann Lee</b> @ann_lee (id <code>7</code>)" in text
+    assert "Чат <code>-100</code>: 2026-03-01 12:00+00:00, последний раз" in text